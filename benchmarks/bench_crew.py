@@ -0,0 +1,403 @@
+"""End-to-end benchmark of research jobs against a stub LLM and stub search.
+
+Runs the real FinancialResearcher crew, run_crew_with_logging, LogParser
+and the Flask routes, with OpenAI and Serper replaced by local stubs of
+configurable latency, so no API key or network is needed. Measures:
+
+- jobs/hour and p50/p95/p99 end-to-end job times at each concurrency,
+  submitting jobs with POST /research and following them on /stream
+- SSE latency: from the crew recording an event to a /stream client
+  receiving it
+- peak Python heap per job (tracemalloc), running jobs one at a time
+  through run_crew_with_logging
+- LogParser lines/sec on the synthetic log from bench_log_parser.py
+
+Each concurrency level runs in a fresh interpreter, since the worker pool
+is sized at import, in a scratch directory so output/ is left alone.
+Results are printed and written as JSON, with the git commit, so runs on
+different commits can be compared.
+
+    python benchmarks/bench_crew.py [--concurrency 1,4] [--jobs N] [--llm-latency S]
+                                    [--search-latency S] [--fan-out] [--output PATH]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from crewai.events import crewai_event_bus
+from crewai.events.types.llm_events import LLMCallType, LLMStreamChunkEvent
+from crewai.llms.base_llm import BaseLLM
+
+
+SEARCH_TOOL_NAME = "Search the internet with Serper"
+
+# Frames of /stream that are not crew events
+STATUS_FRAMES = ('status', 'complete', 'error')
+
+STUB_REPORT = """# {title}
+
+## Executive summary
+
+{filler}
+
+## Financial performance
+
+| Metric | Value |
+|--------|-------|
+| Revenue | $12.4B |
+| Operating margin | 14.2% |
+
+{filler}
+
+## Outlook
+
+{filler}
+"""
+
+FILLER = (
+    "Revenue grew steadily on demand in the core segments while margins held up "
+    "despite higher input costs and a stronger dollar. "
+) * 6
+
+
+class StubLLM(BaseLLM):
+    """
+    Answers like a ReAct agent after ``latency`` seconds, without a network.
+
+    An agent that has the search tool searches once and then answers;
+    one without tools answers straight away. Streaming instances emit the
+    answer as chunk events, spread over the latency, like a real model.
+    """
+
+    def __init__(self, model: str, latency: float, jitter: float, stream: bool = False):
+        super().__init__(model=model)
+        self.latency = latency
+        self.jitter = jitter
+        self.stream = stream
+        self._random = random.Random(model)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        self._emit_call_started_event(messages=messages, from_task=from_task, from_agent=from_agent)
+        response = self._respond(messages if isinstance(messages, list) else [{'role': 'user', 'content': messages}])
+
+        latency = self.latency * (1 + self._random.uniform(-self.jitter, self.jitter))
+        if self.stream:
+            chunks = [response[i:i + 40] for i in range(0, len(response), 40)]
+            for chunk in chunks:
+                time.sleep(latency / len(chunks))
+                crewai_event_bus.emit(self, event=LLMStreamChunkEvent(
+                    chunk=chunk, from_task=from_task, from_agent=from_agent, call_type=LLMCallType.LLM_CALL
+                ))
+        else:
+            time.sleep(latency)
+
+        self._emit_call_completed_event(
+            response=response, call_type=LLMCallType.LLM_CALL,
+            from_task=from_task, from_agent=from_agent, messages=messages
+        )
+        return response
+
+    def _respond(self, messages: List[Dict[str, Any]]) -> str:
+        prompt = '\n'.join(str(message.get('content', '')) for message in messages)
+        last = str(messages[-1].get('content', ''))
+        if SEARCH_TOOL_NAME in prompt and 'Observation:' not in last:
+            request = next(str(m['content']) for m in messages if m.get('role') == 'user')
+            query = ' '.join(request.split())[:100]
+            return (
+                "Thought: I need current information first.\n"
+                f"Action: {SEARCH_TOOL_NAME}\n"
+                f"Action Input: {json.dumps({'search_query': query})}"
+            )
+        title = ' '.join(last.split()[:8])
+        return f"Thought: I now know the final answer\nFinal Answer: {STUB_REPORT.format(title=title, filler=FILLER)}"
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return True
+
+    def get_context_window_size(self) -> int:
+        return 128000
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99 and max of ``samples``."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+
+    def at(fraction: float) -> float:
+        return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+    return {'p50': at(0.5), 'p95': at(0.95), 'p99': at(0.99), 'max': ordered[-1]}
+
+
+def install_stubs(args):
+    """Point every agent's LLM and the search tool at the stubs."""
+    from financial_researcher import llm_cache
+    from financial_researcher.tools.cached_search_tool import StubSearchBackend, shared_search_tool
+
+    llm_cache._template_llm = lambda model, stream: StubLLM(model, args.llm_latency, args.jitter, stream=stream)
+    shared_search_tool().backend = StubSearchBackend(latency_seconds=args.search_latency)
+
+
+def follow_stream(client, job_id: str, event_times: Dict[str, List[float]], latencies: List[float], lock):
+    """Read a job's /stream to the end, recording how late each crew event arrives."""
+    started = time.perf_counter()
+    response = client.get(f'/stream/{job_id}', buffered=False)
+    received = 0
+    for frame in response.response:
+        now = time.perf_counter()
+        frame = frame.decode('utf-8') if isinstance(frame, bytes) else frame
+        name = next((line[len('event: '):] for line in frame.split('\n') if line.startswith('event: ')), None)
+        if name is None:
+            continue  # Keepalive comment or retry hint
+        if name in STATUS_FRAMES:
+            continue
+        with lock:
+            recorded = event_times[job_id][received]
+            # Events from before the client connected were never waited for
+            if recorded >= started:
+                latencies.append(now - recorded)
+        received += 1
+    response.close()
+
+
+def run_level(args) -> Dict[str, Any]:
+    """Run ``args.jobs`` jobs through the Flask routes with ``args.level`` workers."""
+    install_stubs(args)
+    from financial_researcher import crew_runner
+    from financial_researcher.research_service import job_manager
+    from financial_researcher.web_app import app
+
+    crew_runner.warm_up()
+
+    # When the crew recorded each event, by job
+    event_times: Dict[str, List[float]] = {}
+    lock = threading.Lock()
+    add_event = job_manager.add_event
+
+    def timed_add_event(job_id, event):
+        with lock:
+            event_times.setdefault(job_id, []).append(time.perf_counter())
+        return add_event(job_id, event)
+
+    job_manager.add_event = timed_add_event
+
+    finished_at: Dict[str, float] = {}
+    all_done = threading.Event()
+
+    def on_state(job):
+        if job.state.value in ('completed', 'failed'):
+            with lock:
+                finished_at[job.job_id] = time.perf_counter()
+                if len(finished_at) == args.jobs:
+                    all_done.set()
+
+    job_manager.add_state_listener(on_state)
+
+    client = app.test_client()
+    submitted_at: Dict[str, float] = {}
+    sse_latencies: List[float] = []
+    readers = []
+    started = time.perf_counter()
+    for i in range(args.jobs):
+        submitted = time.perf_counter()
+        response = client.post('/research', json={'company': f"Benchmark Company {i}", 'force_refresh': True})
+        job_id = response.get_json()['job_id']
+        submitted_at[job_id] = submitted
+        with lock:
+            event_times.setdefault(job_id, [])
+        reader = threading.Thread(
+            target=follow_stream, args=(app.test_client(), job_id, event_times, sse_latencies, lock), daemon=True
+        )
+        reader.start()
+        readers.append(reader)
+
+    all_done.wait()
+    elapsed = time.perf_counter() - started
+    for reader in readers:
+        reader.join(timeout=30)
+
+    failed = [job_id for job_id in submitted_at if job_manager.get_job(job_id).state.value != 'completed']
+    return {
+        'concurrency': args.level,
+        'jobs': args.jobs,
+        'failed': len(failed),
+        'errors': sorted({job_manager.get_job(job_id).error_message for job_id in failed}),
+        'seconds': elapsed,
+        'jobs_per_hour': args.jobs / elapsed * 3600,
+        'job_seconds': percentiles([finished_at[job_id] - submitted_at[job_id] for job_id in submitted_at]),
+        'sse_events': len(sse_latencies),
+        'sse_latency_ms': {name: value * 1000 for name, value in percentiles(sse_latencies).items()},
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run_memory(args) -> Dict[str, Any]:
+    """Peak traced heap of single jobs run one after another through run_crew_with_logging."""
+    install_stubs(args)
+    from financial_researcher import crew_runner
+    from financial_researcher.job_manager import JobManager
+    from financial_researcher.job_store import MemoryJobStore
+
+    crew_runner.warm_up()
+    job_manager = JobManager(MemoryJobStore(spill_dir=None))
+    peaks = []
+    tracemalloc.start()
+    for i in range(args.memory_jobs):
+        job_id = job_manager.create_job(f"Memory Company {i}")
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        if crew_runner.run_crew_with_logging(f"Memory Company {i}", job_manager, job_id) is None:
+            raise RuntimeError(job_manager.get_job(job_id).error_message)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+    return {
+        'jobs': args.memory_jobs,
+        'peak_heap_mb': {name: value / 1024 / 1024 for name, value in percentiles(peaks).items()},
+    }
+
+
+def run_parser(lines: int) -> Dict[str, Any]:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from bench_log_parser import bench, make_corpus
+    from financial_researcher.log_parser import LogParser
+
+    corpus = make_corpus(lines)
+    return {
+        'lines': len(corpus),
+        'lines_per_sec': bench(lambda batch: list(LogParser().parse_lines(batch)), corpus, 3),
+    }
+
+
+def run_child(phase: str, args, workdir: str) -> Dict[str, Any]:
+    """Run one phase in a fresh interpreter and return its JSON result."""
+    env = dict(
+        os.environ,
+        OPENAI_API_KEY=os.environ.get('OPENAI_API_KEY', 'benchmark-placeholder'),
+        CREWAI_DISABLE_TELEMETRY='true',
+        OTEL_SDK_DISABLED='true',
+        CREWAI_TRACING_ENABLED='false',
+        CREW_PRELOAD='false',
+        JOB_STORE='memory',
+        REPORT_CACHE_TTL='0',
+        LLM_CACHE_AGENTS='',
+        SEARCH_CACHE_PATH=os.path.join(workdir, 'search_cache.sqlite3'),
+        RESEARCH_MAX_WORKERS=str(args.level),
+        RESEARCH_MAX_QUEUE_DEPTH=str(args.jobs),
+        RESEARCH_EXECUTOR='thread',
+        RESEARCH_FAN_OUT='true' if args.fan_out else 'false',
+        RETENTION_SWEEP_SECONDS='3600',
+    )
+    command = [
+        sys.executable, os.path.abspath(__file__), '--phase', phase,
+        '--level', str(args.level), '--jobs', str(args.jobs), '--memory-jobs', str(args.memory_jobs),
+        '--llm-latency', str(args.llm_latency), '--search-latency', str(args.search_latency),
+        '--jitter', str(args.jitter),
+    ]
+    if args.fan_out:
+        command.append('--fan-out')
+    result = subprocess.run(
+        command, env=env, cwd=workdir, capture_output=True, text=True, stdin=subprocess.DEVNULL
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{phase} run failed:\n{result.stderr[-4000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=Path(__file__).parent,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--concurrency', default='1,4', help="Comma-separated worker counts to run")
+    parser.add_argument('--jobs', type=int, default=8, help="Jobs per concurrency level")
+    parser.add_argument('--memory-jobs', type=int, default=3, help="Jobs run one at a time for peak memory")
+    parser.add_argument('--llm-latency', type=float, default=0.2, help="Seconds per stub LLM call")
+    parser.add_argument('--search-latency', type=float, default=0.1, help="Seconds per stub search")
+    parser.add_argument('--jitter', type=float, default=0.2, help="Random +/- fraction of the LLM latency")
+    parser.add_argument('--parser-lines', type=int, default=20000)
+    parser.add_argument('--fan-out', action='store_true', help="Run crews with RESEARCH_FAN_OUT")
+    parser.add_argument('--output', help="JSON results file (default output/benchmarks/crew-<commit>-<time>.json)")
+    # Used by the child interpreters
+    parser.add_argument('--phase', choices=('level', 'memory'), help=argparse.SUPPRESS)
+    parser.add_argument('--level', type=int, default=1, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.phase == 'level':
+        print(json.dumps(run_level(args)))
+        sys.stdout.flush()
+        os._exit(0)  # Skip draining the scheduler and joining daemon threads
+    if args.phase == 'memory':
+        print(json.dumps(run_memory(args)))
+        return
+
+    commit = git_commit()
+    results: Dict[str, Any] = {
+        'benchmark': 'bench_crew',
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'settings': {
+            'jobs': args.jobs,
+            'llm_latency': args.llm_latency,
+            'search_latency': args.search_latency,
+            'jitter': args.jitter,
+            'fan_out': args.fan_out,
+        },
+        'parser': run_parser(args.parser_lines),
+        'levels': [],
+    }
+    print(f"LogParser: {results['parser']['lines_per_sec']:,.0f} lines/sec")
+
+    with tempfile.TemporaryDirectory(prefix='bench_crew_') as workdir:
+        for level in (int(value) for value in args.concurrency.split(',')):
+            args.level = level
+            result = run_child('level', args, workdir)
+            results['levels'].append(result)
+            times = result['job_seconds']
+            sse = result['sse_latency_ms']
+            print(
+                f"concurrency {level:>2}: {result['jobs_per_hour']:8,.0f} jobs/hour, "
+                f"job p50 {times['p50']:.2f}s p95 {times['p95']:.2f}s p99 {times['p99']:.2f}s, "
+                f"SSE p50 {sse['p50']:.1f}ms p99 {sse['p99']:.1f}ms over {result['sse_events']} events, "
+                f"{result['failed']} failed"
+            )
+
+        args.level = 1
+        results['memory'] = run_child('memory', args, workdir)
+        peak = results['memory']['peak_heap_mb']
+        print(f"peak heap per job: p50 {peak['p50']:.1f} MB, max {peak['max']:.1f} MB")
+
+    output = Path(args.output or (
+        f"output/benchmarks/crew-{commit or 'unknown'}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    ))
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2), encoding='utf-8')
+    print(f"Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""Benchmark JobManager under contention from concurrent writers and readers.
+
+N writer threads each stream events and log lines into their own job,
+like crews running side by side. M reader threads poll random jobs the
+way ``/stream`` connections do: a status snapshot plus the events since
+their last read. Each thread pauses between operations, so the offered
+load is fixed and the numbers show how long operations wait on each
+other rather than how the GIL shares out a saturated CPU.
+
+Runs the per-job locked MemoryJobStore against a copy guarded by one
+global lock, the previous design, and prints latency percentiles for
+each. Pass ``--write-interval 0 --read-interval 0`` for a saturation run.
+
+    python benchmarks/bench_job_manager.py [--writers N] [--readers M] [--seconds S]
+"""
+import argparse
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from financial_researcher.job_manager import JobManager
+from financial_researcher.job_store import JobStatus, JobStore, MemoryJobStore
+
+
+class GlobalLockJobStore(JobStore):
+    """MemoryJobStore with every call, reads included, behind one lock."""
+
+    def __init__(self):
+        self._inner = MemoryJobStore()
+        self._lock = threading.Lock()
+
+    def _locked(self, method: Callable, *args) -> Any:
+        with self._lock:
+            return method(*args)
+
+    def insert(self, job: JobStatus):
+        return self._locked(self._inner.insert, job)
+
+    def get_or_insert_active(self, job: JobStatus) -> Tuple[JobStatus, bool]:
+        return self._locked(self._inner.get_or_insert_active, job)
+
+    def get(self, job_id: str) -> Optional[JobStatus]:
+        return self._locked(self._inner.get, job_id)
+
+    def list_jobs(self) -> List[JobStatus]:
+        return self._locked(self._inner.list_jobs)
+
+    def update(self, job_id: str, changes: Dict[str, Any], log: Optional[str] = None) -> bool:
+        return self._locked(self._inner.update, job_id, changes, log)
+
+    def append_log(self, job_id: str, line: str, changes: Dict[str, Any]) -> bool:
+        return self._locked(self._inner.append_log, job_id, line, changes)
+
+    def append_event(self, job_id: str, event: Dict, changes: Dict[str, Any]) -> bool:
+        return self._locked(self._inner.append_event, job_id, event, changes)
+
+    def read_logs(self, job_id: str) -> List[str]:
+        return self._locked(self._inner.read_logs, job_id)
+
+    def read_events(self, job_id: str, since_index: int = 0) -> Tuple[List[Dict], int]:
+        return self._locked(self._inner.read_events, job_id, since_index)
+
+    def delete(self, job_id: str) -> bool:
+        return self._locked(self._inner.delete, job_id)
+
+    def delete_created_before(self, cutoff: datetime) -> List[str]:
+        return self._locked(self._inner.delete_created_before, cutoff)
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    """Percentile of already sorted samples, in microseconds."""
+    if not samples:
+        return 0.0
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)] * 1e6
+
+
+def run(
+    store: JobStore,
+    writers: int,
+    readers: int,
+    seconds: float,
+    write_interval: float,
+    read_interval: float,
+) -> Dict[str, float]:
+    """Run the workload once and return throughput and latency figures."""
+    job_manager = JobManager(store)
+    job_ids = [job_manager.create_job(f"Company {i}") for i in range(writers)]
+    stop = threading.Event()
+    writes = [0] * writers
+    reads = [0] * readers
+    write_latencies: List[List[float]] = [[] for _ in range(writers)]
+    read_latencies: List[List[float]] = [[] for _ in range(readers)]
+
+    def write(slot: int):
+        job_id = job_ids[slot]
+        samples = write_latencies[slot]
+        count = 0
+        while not stop.is_set():
+            started = time.perf_counter()
+            job_manager.add_event(job_id, {
+                'type': 'tool_use',
+                'timestamp': '12:00:00',
+                'data': {'tool': 'Search the internet with Serper', 'agent': 'Researcher'},
+            })
+            job_manager.add_log(job_id, "Using tool: Search the internet with Serper")
+            samples.append(time.perf_counter() - started)
+            count += 1
+            if write_interval:
+                time.sleep(write_interval)
+        writes[slot] = count
+
+    def read(slot: int):
+        rng = random.Random(slot)
+        positions = dict.fromkeys(job_ids, 0)
+        samples = read_latencies[slot]
+        count = 0
+        while not stop.is_set():
+            job_id = rng.choice(job_ids)
+            started = time.perf_counter()
+            job_manager.get_job(job_id)
+            _, positions[job_id] = job_manager.read_events(job_id, positions[job_id])
+            samples.append(time.perf_counter() - started)
+            count += 1
+            if read_interval:
+                time.sleep(read_interval)
+        reads[slot] = count
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=read, args=(i,)) for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    write_samples = sorted(sample for samples in write_latencies for sample in samples)
+    read_samples = sorted(sample for samples in read_latencies for sample in samples)
+    return {
+        'writes_per_sec': sum(writes) / seconds,
+        'reads_per_sec': sum(reads) / seconds,
+        'write_p50_us': _percentile(write_samples, 0.5),
+        'write_p99_us': _percentile(write_samples, 0.99),
+        'read_p50_us': _percentile(read_samples, 0.5),
+        'read_p99_us': _percentile(read_samples, 0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=32)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--write-interval', type=float, default=0.001,
+                        help="Pause in seconds between a writer's operations")
+    parser.add_argument('--read-interval', type=float, default=0.005,
+                        help="Pause in seconds between a reader's polls")
+    args = parser.parse_args()
+
+    print(f"{args.writers} writers, {args.readers} readers, {args.seconds:g}s per run")
+    for name, store in (('global lock', GlobalLockJobStore()), ('per-job locks', MemoryJobStore())):
+        result = run(
+            store, args.writers, args.readers, args.seconds, args.write_interval, args.read_interval
+        )
+        print(
+            f"{name:>14}: {result['writes_per_sec']:>8,.0f} writes/s "
+            f"(p50 {result['write_p50_us']:>6.1f}us, p99 {result['write_p99_us']:>8.1f}us)  "
+            f"{result['reads_per_sec']:>8,.0f} reads/s "
+            f"(p50 {result['read_p50_us']:>6.1f}us, p99 {result['read_p99_us']:>8.1f}us)"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,346 @@
+"""Benchmark LogParser throughput against the original implementation.
+
+Generates a synthetic CrewAI verbose log, checks that both parsers emit
+identical events (ignoring timestamps) and prints lines/sec for each.
+
+    python benchmarks/bench_log_parser.py [--lines N] [--repeat R]
+"""
+import argparse
+import random
+import re
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from financial_researcher.log_parser import EventType, LogParser
+
+
+SAMPLE_LINES = [
+    "# Agent: Senior Financial Researcher for Acme Corp",
+    "## Task: Conduct a thorough research on Acme Corp. Focus on:",
+    "Thought: I need to gather the latest financial results for Acme Corp.",
+    "Using tool: Search the internet with Serper",
+    "Action: Search the internet with Serper",
+    "Action Input: {\"search_query\": \"Acme Corp 2025 revenue\"}",
+    "Observation: Acme Corp reported revenue of $12.4B for fiscal 2025.",
+    "## Final Answer:",
+    "Acme Corp is a diversified industrial company with operations in 40 countries.",
+    "Revenue grew 8% year over year, driven by strong demand in the aerospace segment.",
+    "The company completed the acquisition of Beta Systems in Q2.",
+    "- Operating margin: 14.2% (up from 12.9%)",
+    "- Free cash flow: $1.8B",
+    "I will now summarize the key findings for the analyst.",
+    "Reasoning: The margin expansion suggests pricing power.",
+    "Result: Found 10 relevant news articles.",
+    "# Agent: Market Analyst and Report Writer focused on Acme Corp",
+    "Task output saved to output/report_Acme Corp.md",
+    "Crew execution finished.",
+    "",
+    "| Metric | 2024 | 2025 |",
+    "Überblick: Umsatzwachstum im Geschäftsjahr, Agent: Müller",
+]
+
+FILLER_WORDS = (
+    "revenue margin growth outlook segment quarterly demand pricing guidance "
+    "competition regulation supply chain earnings dividend debt capex"
+).split()
+
+
+class LegacyLogParser:
+    """The original LogParser: 17 uncompiled re.search calls per line."""
+    
+    # Patterns for different event types
+    AGENT_PATTERNS = [
+        r'# Agent:\s*(.+?)(?:\n|$)',
+        r'Agent:\s*(.+?)(?:\n|$)',
+        r'Working Agent:\s*(.+?)(?:\n|$)',
+    ]
+    
+    TASK_PATTERNS = [
+        r'# Task:\s*(.+?)(?:\n|$)',
+        r'## Task:\s*(.+?)(?:\n|$)',
+        r'Beginning:\s*(.+?)(?:\n|$)',
+    ]
+    
+    TOOL_PATTERNS = [
+        r'Using tool:\s*(.+?)(?:\n|$)',
+        r'Tool:\s*(.+?)(?:\n|$)',
+        r'Action:\s*(.+?)(?:\n|$)',
+    ]
+    
+    THINKING_PATTERNS = [
+        r'Thought:\s*(.+?)(?:\n|$)',
+        r'Reasoning:\s*(.+?)(?:\n|$)',
+        r'I need to\s*(.+?)(?:\n|$)',
+        r'I will\s*(.+?)(?:\n|$)',
+    ]
+    
+    OBSERVATION_PATTERNS = [
+        r'Observation:\s*(.+?)(?:\n|$)',
+        r'Result:\s*(.+?)(?:\n|$)',
+    ]
+    
+    def __init__(self):
+        self.current_agent = None
+        self.current_task = None
+        self.last_event_type = None
+    
+    def parse_line(self, line: str) -> List[Dict]:
+        """
+        Parse a single log line and return structured events.
+        
+        Returns a list because one line might generate multiple events.
+        """
+        if not line or not line.strip():
+            return []
+        
+        events = []
+        line = line.strip()
+        
+        # Check for agent
+        agent_event = self._parse_agent(line)
+        if agent_event:
+            events.append(agent_event)
+        
+        # Check for task
+        task_event = self._parse_task(line)
+        if task_event:
+            events.append(task_event)
+        
+        # Check for tool usage
+        tool_event = self._parse_tool(line)
+        if tool_event:
+            events.append(tool_event)
+        
+        # Check for thinking
+        thinking_event = self._parse_thinking(line)
+        if thinking_event:
+            events.append(thinking_event)
+        
+        # Check for observation
+        observation_event = self._parse_observation(line)
+        if observation_event:
+            events.append(observation_event)
+        
+        # If no specific event, treat as regular log
+        if not events:
+            events.append(self._create_log_event(line))
+        
+        return events
+    
+    def _parse_agent(self, line: str) -> Optional[Dict]:
+        """Extract agent information from line."""
+        for pattern in self.AGENT_PATTERNS:
+            match = re.search(pattern, line, re.IGNORECASE)
+            if match:
+                agent_name = match.group(1).strip()
+                
+                # Determine agent role
+                role = self._determine_agent_role(agent_name)
+                
+                # Check if this is a change or start
+                event_type = EventType.AGENT_START if not self.current_agent else EventType.AGENT_CHANGE
+                self.current_agent = agent_name
+                
+                return {
+                    'type': event_type.value,
+                    'timestamp': self._get_timestamp(),
+                    'data': {
+                        'agent': agent_name,
+                        'role': role,
+                        'raw_line': line
+                    }
+                }
+        return None
+    
+    def _parse_task(self, line: str) -> Optional[Dict]:
+        """Extract task information from line."""
+        for pattern in self.TASK_PATTERNS:
+            match = re.search(pattern, line, re.IGNORECASE)
+            if match:
+                task_name = match.group(1).strip()
+                self.current_task = task_name
+                
+                return {
+                    'type': EventType.TASK_START.value,
+                    'timestamp': self._get_timestamp(),
+                    'data': {
+                        'task': task_name,
+                        'agent': self.current_agent,
+                        'raw_line': line
+                    }
+                }
+        
+        # Check for task completion indicators
+        if re.search(r'task output|completed|finished', line, re.IGNORECASE):
+            return {
+                'type': EventType.TASK_COMPLETE.value,
+                'timestamp': self._get_timestamp(),
+                'data': {
+                    'task': self.current_task,
+                    'agent': self.current_agent,
+                    'raw_line': line
+                }
+            }
+        
+        return None
+    
+    def _parse_tool(self, line: str) -> Optional[Dict]:
+        """Extract tool usage information from line."""
+        for pattern in self.TOOL_PATTERNS:
+            match = re.search(pattern, line, re.IGNORECASE)
+            if match:
+                tool_info = match.group(1).strip()
+                
+                # Try to extract tool name and action
+                tool_name = tool_info
+                action = None
+                
+                # Common tool names
+                if 'serper' in tool_info.lower():
+                    tool_name = 'SerperDevTool'
+                    action = 'Search'
+                elif 'search' in tool_info.lower():
+                    tool_name = 'Search'
+                    action = 'Query'
+                
+                return {
+                    'type': EventType.TOOL_USE.value,
+                    'timestamp': self._get_timestamp(),
+                    'data': {
+                        'tool': tool_name,
+                        'action': action,
+                        'agent': self.current_agent,
+                        'raw_line': line
+                    }
+                }
+        return None
+    
+    def _parse_thinking(self, line: str) -> Optional[Dict]:
+        """Extract thinking/reasoning information from line."""
+        for pattern in self.THINKING_PATTERNS:
+            match = re.search(pattern, line, re.IGNORECASE)
+            if match:
+                thought = match.group(1).strip()
+                
+                return {
+                    'type': EventType.THINKING.value,
+                    'timestamp': self._get_timestamp(),
+                    'data': {
+                        'thought': thought,
+                        'agent': self.current_agent,
+                        'raw_line': line
+                    }
+                }
+        return None
+    
+    def _parse_observation(self, line: str) -> Optional[Dict]:
+        """Extract observation/result information from line."""
+        for pattern in self.OBSERVATION_PATTERNS:
+            match = re.search(pattern, line, re.IGNORECASE)
+            if match:
+                observation = match.group(1).strip()
+                
+                return {
+                    'type': EventType.OBSERVATION.value,
+                    'timestamp': self._get_timestamp(),
+                    'data': {
+                        'observation': observation,
+                        'agent': self.current_agent,
+                        'raw_line': line
+                    }
+                }
+        return None
+    
+    def _create_log_event(self, line: str) -> Dict:
+        """Create a generic log event."""
+        return {
+            'type': EventType.LOG.value,
+            'timestamp': self._get_timestamp(),
+            'data': {
+                'message': line,
+                'agent': self.current_agent,
+                'task': self.current_task
+            }
+        }
+    
+    def _determine_agent_role(self, agent_name: str) -> str:
+        """Determine the role identifier from agent name."""
+        agent_lower = agent_name.lower()
+        
+        if 'research' in agent_lower:
+            return 'researcher'
+        elif 'analyst' in agent_lower or 'analysis' in agent_lower:
+            return 'analyst'
+        else:
+            return 'unknown'
+    
+    def _get_timestamp(self) -> str:
+        """Get formatted timestamp."""
+        return datetime.now().strftime('%H:%M:%S')
+    
+    def reset(self):
+        """Reset parser state."""
+        self.current_agent = None
+        self.current_task = None
+        self.last_event_type = None
+
+
+def make_corpus(n_lines: int, seed: int = 7) -> List[str]:
+    """Mix sample lines with plain prose lines, like a real verbose run."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(n_lines):
+        if rng.random() < 0.35:
+            corpus.append(rng.choice(SAMPLE_LINES))
+        else:
+            corpus.append(' '.join(rng.choice(FILLER_WORDS) for _ in range(rng.randint(5, 30))).capitalize() + '.')
+    return corpus
+
+
+def strip_timestamps(events: List[Dict]) -> List[Dict]:
+    return [{k: v for k, v in event.items() if k != 'timestamp'} for event in events]
+
+
+def check_equivalence(corpus: List[str]):
+    """Both parsers must produce the same events for every line."""
+    legacy, current = LegacyLogParser(), LogParser()
+    for line in corpus:
+        expected = strip_timestamps(legacy.parse_line(line))
+        actual = strip_timestamps(current.parse_line(line))
+        if expected != actual:
+            raise AssertionError(f"Parsers disagree on {line!r}:\n{expected}\n{actual}")
+
+
+def bench(parse, corpus: List[str], repeat: int) -> float:
+    """Best lines/sec over ``repeat`` runs."""
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(corpus)
+        elapsed = time.perf_counter() - start
+        best = max(best, len(corpus) / elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lines', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.lines)
+    check_equivalence(corpus)
+
+    before = bench(lambda lines: [LegacyLogParser().parse_line(line) for line in lines], corpus, args.repeat)
+    after = bench(lambda lines: [LogParser().parse_line(line) for line in lines], corpus, args.repeat)
+    batch = bench(lambda lines: list(LogParser().parse_lines(lines)), corpus, args.repeat)
+
+    print(f"lines:                  {len(corpus)}")
+    print(f"before (legacy):        {before:12,.0f} lines/sec")
+    print(f"after (parse_line):     {after:12,.0f} lines/sec  ({after / before:.1f}x)")
+    print(f"after (parse_lines):    {batch:12,.0f} lines/sec  ({batch / before:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark web server import time and per-job crew setup time.
+
+Imports are timed in fresh interpreters: the web app (which should not
+load crewAI), and crew_runner, which is what the first job or the
+background preload pays for. Crew setup is timed as jobs do it,
+``FinancialResearcher(...).crew()``, with the YAML, LLM and search tool
+templates cleared before every build (as every job used to start) and
+then kept, as they are now.
+
+Building LLMs needs an API key but makes no requests, so a placeholder
+is used if none is set.
+
+    python benchmarks/bench_startup.py [--imports N] [--builds N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, List
+
+IMPORT_SNIPPET = """
+import sys, time
+started = time.perf_counter()
+import {module}
+print(time.perf_counter() - started, 'crewai' in sys.modules)
+"""
+
+
+def time_import(module: str, runs: int) -> List[float]:
+    """Seconds to import ``module`` in each of ``runs`` fresh interpreters."""
+    env = dict(os.environ, CREW_PRELOAD='false')
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', IMPORT_SNIPPET.format(module=module)],
+            env=env, capture_output=True, text=True, check=True, stdin=subprocess.DEVNULL
+        ).stdout.split()
+        samples.append(float(output[0]))
+        loads_crewai = output[1] == 'True'
+    print(f"import {module:<36} {statistics.median(samples) * 1000:8.0f} ms"
+          f"{'  (loads crewAI)' if loads_crewai else ''}")
+    return samples
+
+
+def time_builds(build: Callable[[], None], runs: int, before_each: Callable[[], None] = lambda: None) -> List[float]:
+    samples = []
+    for _ in range(runs):
+        before_each()
+        started = time.perf_counter()
+        build()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--imports', type=int, default=3, help="Fresh interpreters per import")
+    parser.add_argument('--builds', type=int, default=20, help="Crews built per variant")
+    args = parser.parse_args()
+
+    os.environ.setdefault('OPENAI_API_KEY', 'benchmark-placeholder')
+    os.environ.setdefault('SERPER_API_KEY', 'benchmark-placeholder')
+    os.environ.setdefault('CREWAI_DISABLE_TELEMETRY', 'true')
+    os.environ.setdefault('OTEL_SDK_DISABLED', 'true')
+
+    time_import('financial_researcher.web_app', args.imports)
+    time_import('financial_researcher.crew_runner', args.imports)
+
+    from financial_researcher import crew, llm_cache
+    from financial_researcher.tools import cached_search_tool
+
+    def clear_templates():
+        crew._parse_yaml.cache_clear()
+        llm_cache._template_llm.cache_clear()
+        cached_search_tool.shared_search_tool.cache_clear()
+
+    for fan_out in (False, True):
+        build = lambda: crew.FinancialResearcher(verbose=False, fan_out=fan_out).crew()
+        clear_templates()
+        first = time_builds(build, 1)[0]
+        cold = time_builds(build, args.builds, clear_templates)
+        warm = time_builds(build, args.builds)
+        label = 'fan-out crew' if fan_out else 'default crew'
+        print(f"{label}: first {first * 1000:7.1f} ms, "
+              f"without templates {statistics.median(cold) * 1000:7.1f} ms, "
+              f"from templates {statistics.median(warm) * 1000:7.1f} ms "
+              f"({statistics.median(cold) / statistics.median(warm):.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,301 @@
+"""ASGI application for Financial Researcher.
+
+Serves the same routes as the Flask app, but each open ``/stream``
+connection is a coroutine waiting on an ``asyncio.Event`` instead of a
+thread, so one process can hold thousands of idle dashboards. Crews still
+run on the scheduler's worker threads, and everything that reads the job
+store runs on the default thread pool, off the event loop.
+"""
+import asyncio
+import json
+import re
+from urllib.parse import parse_qs
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from financial_researcher import research_service
+from financial_researcher.event_bus import JobEventBus
+from financial_researcher.research_service import (
+    SSE_KEEPALIVE,
+    BatchStream,
+    JobStream,
+    batch_manager,
+    job_manager,
+)
+
+
+TEMPLATE_PATH = Path(__file__).parent / 'templates' / 'index.html'
+MAX_BODY_BYTES = 64 * 1024
+
+_STREAM_ROUTE = re.compile(r'^/stream/([^/]+)$')
+_REPORT_ROUTE = re.compile(r'^/report/([^/]+)$')
+_CANCEL_ROUTE = re.compile(r'^/cancel/([^/]+)$')
+_TRACE_ROUTE = re.compile(r'^/trace/([^/]+)$')
+_BATCH_ROUTE = re.compile(r'^/batch/([^/]+)$')
+_BATCH_STREAM_ROUTE = re.compile(r'^/batch/([^/]+)/stream$')
+
+_index_html: Optional[bytes] = None
+
+
+async def app(scope, receive, send):
+    """ASGI entry point."""
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    method = scope['method']
+    path = scope['path']
+
+    if path == '/' and method == 'GET':
+        await _send_bytes(send, 200, _get_index_html(), 'text/html; charset=utf-8')
+        return
+
+    if path == '/research' and method == 'POST':
+        data = await _read_json(receive)
+        result = await asyncio.to_thread(research_service.submit_research, data)
+        await _send_json(send, *result)
+        return
+
+    if path == '/batch' and method == 'POST':
+        data = await _read_json(receive)
+        result = await asyncio.to_thread(research_service.submit_batch, data)
+        await _send_json(send, *result)
+        return
+
+    if path == '/metrics' and method == 'GET':
+        await _send_json(send, *await asyncio.to_thread(research_service.get_metrics))
+        return
+
+    match = _BATCH_ROUTE.match(path)
+    if match and method == 'GET':
+        await _send_json(send, *await asyncio.to_thread(research_service.get_batch, match.group(1)))
+        return
+
+    match = _BATCH_STREAM_ROUTE.match(path)
+    if match and method == 'GET':
+        batch_id = match.group(1)
+        if not batch_manager.get(batch_id):
+            await _send_json(send, {'error': 'Batch not found'}, 404)
+            return
+        await _stream_sse(
+            batch_manager.event_bus, batch_id, BatchStream(batch_manager, batch_id), receive, send
+        )
+        return
+
+    match = _CANCEL_ROUTE.match(path)
+    if match and method == 'POST':
+        result = await asyncio.to_thread(research_service.cancel_job, match.group(1))
+        await _send_json(send, *result)
+        return
+
+    match = _TRACE_ROUTE.match(path)
+    if match and method == 'GET':
+        query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        trace_format = query.get('format', [None])[0]
+        result = await asyncio.to_thread(research_service.get_trace, match.group(1), trace_format)
+        await _send_json(send, *result)
+        return
+
+    match = _STREAM_ROUTE.match(path)
+    if match and method == 'GET':
+        await _stream_job(match.group(1), scope, receive, send)
+        return
+
+    match = _REPORT_ROUTE.match(path)
+    if match and method == 'GET':
+        headers = _request_headers(scope)
+        result = await asyncio.to_thread(
+            research_service.get_report,
+            match.group(1),
+            headers.get('accept-encoding'),
+            headers.get('if-none-match')
+        )
+        await _send_json(send, *result)
+        return
+
+    await _send_json(send, {'error': 'Not found'}, 404)
+
+
+async def _stream_job(job_id: str, scope, receive, send):
+    """Server-Sent Events endpoint for job progress."""
+    if not await asyncio.to_thread(job_manager.get_job, job_id):
+        await _send_json(send, {'error': 'Job not found'}, 404)
+        return
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    stream = research_service.open_job_stream(
+        job_id, _request_headers(scope).get('last-event-id'), query.get('coalesce', [None])[0]
+    )
+    await _stream_sse(job_manager.event_bus, job_id, stream, receive, send)
+
+
+async def _stream_sse(
+    bus: JobEventBus,
+    channel_id: str,
+    stream: Union[JobStream, BatchStream],
+    receive,
+    send
+):
+    """Send ``stream``'s frames as they come, woken by ``bus`` publishes for ``channel_id``."""
+    loop = asyncio.get_running_loop()
+    wake = asyncio.Event()
+
+    def notify():
+        # Called from whichever thread published the event
+        try:
+            loop.call_soon_threadsafe(wake.set)
+        except RuntimeError:
+            pass  # Loop already closed
+
+    # Listen before the first read so no event can slip in between
+    remove_listener = bus.add_listener(channel_id, notify)
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+
+        while True:
+            wake.clear()
+            # Polls read the job store, which may flush to SQLite or read spill files
+            frames = await asyncio.to_thread(stream.poll)
+            if frames:
+                await send({
+                    'type': 'http.response.body',
+                    'body': ''.join(frames).encode('utf-8'),
+                    'more_body': not stream.done,
+                })
+            if stream.done:
+                return
+
+            woken = asyncio.ensure_future(wake.wait())
+            done, _ = await asyncio.wait(
+                {woken, disconnected},
+                timeout=research_service.SSE_HEARTBEAT_SECONDS,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            woken.cancel()
+            if disconnected in done:
+                return
+            if not done:
+                await send({
+                    'type': 'http.response.body',
+                    'body': SSE_KEEPALIVE.encode('utf-8'),
+                    'more_body': True,
+                })
+            elif getattr(stream, 'coalesce', False):
+                # Let the rest of a burst arrive so it goes out as one frame
+                await asyncio.sleep(research_service.SSE_COALESCE_SECONDS)
+    finally:
+        remove_listener()
+        disconnected.cancel()
+
+
+async def _wait_for_disconnect(receive):
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            research_service.start_services()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            # Drain the worker pool without blocking the loop
+            await asyncio.to_thread(research_service.shutdown_scheduler)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def _read_json(receive) -> Optional[Dict]:
+    """The request body as a JSON object, or None if it is missing or not an object."""
+    body = await _read_body(receive)
+    try:
+        data = json.loads(body) if body else None
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+async def _read_body(receive) -> bytes:
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        body += message.get('body', b'')
+        if len(body) > MAX_BODY_BYTES:
+            return b''
+        more_body = message.get('more_body', False)
+    return body
+
+
+def _get_index_html() -> bytes:
+    global _index_html
+    if _index_html is None:
+        _index_html = TEMPLATE_PATH.read_bytes()
+    return _index_html
+
+
+def _request_headers(scope) -> Dict[str, str]:
+    """Request headers with lowercase names; repeated headers are joined with commas."""
+    headers: Dict[str, str] = {}
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').lower()
+        value = value.decode('latin-1')
+        headers[name] = f"{headers[name]}, {value}" if name in headers else value
+    return headers
+
+
+async def _send_json(send, body: Union[Dict, bytes], status: int, headers: Optional[Dict[str, str]] = None):
+    headers = dict(headers or {})
+    content_type = headers.pop('Content-Type', 'application/json')
+    extra = [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers.items()]
+    # Bytes bodies arrive already encoded
+    data = body if isinstance(body, bytes) else json.dumps(body).encode('utf-8')
+    await _send_bytes(send, status, data, content_type, extra)
+
+
+async def _send_bytes(send, status: int, body: bytes, content_type: str, extra_headers=None):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', content_type.encode('latin-1')),
+            (b'content-length', str(len(body)).encode('latin-1')),
+            *(extra_headers or []),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def run_asgi_app(host='127.0.0.1', port=5000):
+    """Run the ASGI application with uvicorn."""
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit(
+            "The async server needs uvicorn. Install it with: pip install 'financial_researcher[async]'"
+        )
+
+    research_service.start_services()
+    print(f"Starting Financial Researcher Web Interface (async)...")
+    print(f"Open your browser to: http://{host}:{port}")
+    uvicorn.run(app, host=host, port=port, log_level='warning', backlog=4096)
+
+
+if __name__ == '__main__':
+    run_asgi_app()
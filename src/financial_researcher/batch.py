@@ -0,0 +1,358 @@
+"""Research many companies as one batch with bounded parallelism."""
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from financial_researcher.event_bus import JobEventBus
+from financial_researcher.job_manager import JobManager, JobState, JobStatus
+from financial_researcher.scheduler import QueueFullError, SchedulerShutdownError
+
+
+# Per-company states; the ones after "pending" mirror JobState
+PENDING = 'pending'
+FINISHED_STATES = (JobState.COMPLETED.value, JobState.FAILED.value)
+
+
+class BatchItem:
+    """One company of a batch and the job researching it."""
+
+    __slots__ = ('company', 'job_id', 'state', 'report_path', 'error', 'starting', 'version')
+
+    def __init__(self, company: str):
+        self.company = company
+        self.job_id: Optional[str] = None
+        self.state = PENDING
+        self.report_path: Optional[str] = None
+        self.error: Optional[str] = None
+        # Claimed by a feeder that is submitting it right now
+        self.starting = False
+        # Batch version of the last change, for incremental progress frames
+        self.version = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'company': self.company,
+            'job_id': self.job_id,
+            'state': self.state,
+            'report_path': self.report_path,
+            'error': self.error,
+        }
+
+
+class Batch:
+    """A list of companies researched together."""
+
+    def __init__(self, batch_id: str, companies: List[str], parallelism: int, options: Dict[str, Any]):
+        self.batch_id = batch_id
+        self.items = [BatchItem(company) for company in companies]
+        self.parallelism = parallelism
+        self.options = options
+        self.created_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+        self.index_path: Optional[str] = None
+        self.version = 0
+        # Guards against feeding one batch from two places at once
+        self.feeding = False
+        self.refeed = False
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    def in_flight(self) -> int:
+        return sum(
+            1 for item in self.items
+            if item.starting or (item.job_id and item.state not in FINISHED_STATES)
+        )
+
+
+class BatchManager:
+    """
+    Feeds the companies of each batch to the research scheduler, at most
+    ``parallelism`` at a time per batch.
+
+    A company is started with ``start_job(company, **options)``, which
+    returns the job ID and may serve a cached report or attach to a job
+    already researching the company. Whenever a job finishes the next
+    pending company is started; one rejected with ``QueueFullError`` stays
+    pending and is retried on the next finished job anywhere. When every
+    company has finished, an index of report paths is written to
+    ``index_dir/<batch_id>.json``.
+
+    ``event_bus`` is published under the batch ID on every change, like
+    JobManager's bus is for jobs.
+
+    Batches are held in this process and driven by ``job_manager``'s local
+    state listeners, so they need a job store that is not shared with
+    other processes.
+    """
+
+    def __init__(
+        self,
+        job_manager: JobManager,
+        start_job: Callable[..., str],
+        index_dir: Optional[str] = 'output/batches',
+        max_finished_batches: int = 100,
+    ):
+        self.job_manager = job_manager
+        self.start_job = start_job
+        self.index_dir = index_dir
+        self.max_finished_batches = max_finished_batches
+        self.event_bus = JobEventBus()
+
+        self._batches: "OrderedDict[str, Batch]" = OrderedDict()
+        # job_id -> (batch, item) pairs following that job
+        self._job_items: Dict[str, List[tuple]] = {}
+        self._lock = threading.Lock()
+
+        job_manager.add_state_listener(self._on_job_state)
+
+    def create(self, companies: List[str], parallelism: int, **options) -> Batch:
+        """Start researching ``companies`` and return the new batch."""
+        if parallelism < 1:
+            raise ValueError("parallelism must be at least 1")
+
+        batch = Batch(str(uuid.uuid4()), companies, parallelism, options)
+        with self._lock:
+            self._batches[batch.batch_id] = batch
+            self._prune_locked()
+        self._feed(batch)
+        return batch
+
+    def get(self, batch_id: str) -> Optional[Batch]:
+        with self._lock:
+            return self._batches.get(batch_id)
+
+    def progress(self, batch: Batch, since_version: int = -1) -> Dict[str, Any]:
+        """
+        Overall counts and completion percentage for a batch.
+
+        ``companies`` lists only the companies that changed after
+        ``since_version``, or all of them by default.
+        """
+        with self._lock:
+            counts = dict.fromkeys((PENDING, *(state.value for state in JobState)), 0)
+            for item in batch.items:
+                counts[item.state] += 1
+            finished = counts[JobState.COMPLETED.value] + counts[JobState.FAILED.value]
+            total = len(batch.items)
+            return {
+                'batch_id': batch.batch_id,
+                'version': batch.version,
+                'total': total,
+                'parallelism': batch.parallelism,
+                'counts': counts,
+                'percent_complete': round(100.0 * finished / total, 1) if total else 100.0,
+                'done': batch.done,
+                'index_path': batch.index_path,
+                'companies': [item.to_dict() for item in batch.items if item.version > since_version],
+            }
+
+    def index(self, batch: Batch) -> Dict[str, Any]:
+        """The report index of a batch: every company with its job and report path."""
+        with self._lock:
+            return {
+                'batch_id': batch.batch_id,
+                'created_at': batch.created_at.isoformat(),
+                'finished_at': batch.finished_at.isoformat() if batch.finished_at else None,
+                'reports': [item.to_dict() for item in batch.items],
+            }
+
+    def _feed(self, batch: Batch):
+        """Start pending companies until the batch has ``parallelism`` in flight."""
+        with self._lock:
+            if batch.feeding:
+                # A cached report finishes its job inside start_job, which
+                # lands back here; let the running feeder go round again
+                batch.refeed = True
+                return
+            batch.feeding = True
+
+        try:
+            while True:
+                with self._lock:
+                    batch.refeed = False
+                self._start_pending(batch)
+                with self._lock:
+                    if not batch.refeed:
+                        break
+        finally:
+            with self._lock:
+                batch.feeding = False
+
+        self._check_finished(batch)
+
+    def _start_pending(self, batch: Batch):
+        while True:
+            with self._lock:
+                if batch.done or batch.in_flight() >= batch.parallelism:
+                    return
+                item = next((i for i in batch.items if i.state == PENDING and not i.starting), None)
+                if item is None:
+                    return
+                item.starting = True
+
+            try:
+                job_id = self.start_job(item.company, **batch.options)
+            except QueueFullError:
+                with self._lock:
+                    item.starting = False
+                return  # Retried when a running job finishes
+            except SchedulerShutdownError:
+                self._set_item(batch, item, JobState.FAILED.value, error="Server is shutting down")
+                continue
+            except Exception as e:
+                self._set_item(batch, item, JobState.FAILED.value, error=str(e))
+                continue
+
+            with self._lock:
+                item.job_id = job_id
+                self._job_items.setdefault(job_id, []).append((batch, item))
+
+            # The job may have changed state before it was registered above
+            job = self.job_manager.get_job(job_id)
+            if job is None:
+                self._set_item(batch, item, JobState.FAILED.value, error="Job was removed")
+            else:
+                self._update_from_job(batch, item, job)
+                if job.state.value in FINISHED_STATES:
+                    with self._lock:
+                        self._job_items.pop(job_id, None)
+
+    def _on_job_state(self, job: JobStatus):
+        with self._lock:
+            entries = list(self._job_items.get(job.job_id, ()))
+        for batch, item in entries:
+            self._update_from_job(batch, item, job)
+
+        if job.state.value in FINISHED_STATES:
+            with self._lock:
+                self._job_items.pop(job.job_id, None)
+                # A finished job frees a scheduler slot for any batch
+                waiting = [
+                    batch for batch in self._batches.values()
+                    if not batch.done and any(item.state == PENDING for item in batch.items)
+                ]
+            for batch in waiting:
+                self._feed(batch)
+            for batch, _ in entries:
+                self._check_finished(batch)
+
+    def _update_from_job(self, batch: Batch, item: BatchItem, job: JobStatus):
+        self._set_item(
+            batch, item, job.state.value,
+            report_path=job.report_path,
+            error=job.error_message if job.state == JobState.FAILED else None
+        )
+
+    def _set_item(self, batch: Batch, item: BatchItem, state: str,
+                  report_path: Optional[str] = None, error: Optional[str] = None):
+        with self._lock:
+            if item.state in FINISHED_STATES:
+                return  # Late notifications never move a company backwards
+            if (item.state, item.report_path, item.error) == (state, report_path, error):
+                return
+            item.state = state
+            item.report_path = report_path
+            item.error = error
+            item.starting = False
+            batch.version += 1
+            item.version = batch.version
+        self.event_bus.publish(batch.batch_id)
+
+    def _check_finished(self, batch: Batch):
+        with self._lock:
+            if batch.done or any(item.state not in FINISHED_STATES for item in batch.items):
+                return
+            batch.finished_at = datetime.now()
+            batch.version += 1
+
+        if self.index_dir:
+            path = os.path.join(self.index_dir, f"{batch.batch_id}.json")
+            try:
+                os.makedirs(self.index_dir, exist_ok=True)
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump(self.index(batch), f, indent=2)
+                with self._lock:
+                    batch.index_path = path
+            except OSError:
+                pass  # The index is still served by GET /batch/<id>
+
+        self.event_bus.publish(batch.batch_id)
+
+    def _prune_locked(self):
+        """Forget the oldest finished batches beyond ``max_finished_batches``."""
+        finished = [batch_id for batch_id, batch in self._batches.items() if batch.done]
+        for batch_id in finished[:max(0, len(finished) - self.max_finished_batches)]:
+            del self._batches[batch_id]
+
+
+def run_batch_cli(argv: Optional[List[str]] = None) -> int:
+    """
+    Research a list of companies from the command line.
+
+    Companies come from the arguments, or one per line from ``--file``.
+    Prints a line per finished company and the path of the report index.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='run_batch', description="Research a list of companies.")
+    parser.add_argument('companies', nargs='*', help="Company names")
+    parser.add_argument('--file', '-f', help="File with one company per line")
+    parser.add_argument('--parallelism', '-p', type=int, default=2, help="Crews to run at once")
+    parser.add_argument('--force-refresh', action='store_true', help="Ignore cached reports")
+    parser.add_argument('--refresh', action='store_true',
+                        help="Research only the stale sections of each company's last report")
+    args = parser.parse_args(argv)
+
+    companies = list(args.companies)
+    if args.file:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            companies += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    if not companies:
+        parser.error("no companies given")
+    if args.parallelism < 1:
+        parser.error("--parallelism must be at least 1")
+
+    # The worker pool is sized when research_service is first imported
+    os.environ['RESEARCH_MAX_WORKERS'] = str(args.parallelism)
+    from financial_researcher import research_service
+
+    body, status, _ = research_service.submit_batch({
+        'companies': companies,
+        'parallelism': args.parallelism,
+        'force_refresh': args.force_refresh,
+        'refresh': args.refresh,
+    })
+    if status >= 400:
+        print(f"Error: {body['error']}")
+        return 1
+
+    batch_manager = research_service.batch_manager
+    batch = batch_manager.get(body['batch_id'])
+    started = time.monotonic()
+    with batch_manager.event_bus.subscribe(batch.batch_id) as subscription:
+        version = -1
+        while True:
+            progress = batch_manager.progress(batch, since_version=version)
+            version = progress['version']
+            for item in progress['companies']:
+                if item['state'] in FINISHED_STATES:
+                    detail = item['report_path'] if item['state'] == JobState.COMPLETED.value else item['error']
+                    print(f"[{progress['percent_complete']:5.1f}%] {item['company']}: {item['state']} ({detail})")
+            if progress['done']:
+                break
+            subscription.wait(timeout=5)
+
+    counts = progress['counts']
+    print(
+        f"{counts[JobState.COMPLETED.value]} completed, {counts[JobState.FAILED.value]} failed "
+        f"in {time.monotonic() - started:.0f}s"
+    )
+    print(f"Report index: {progress['index_path'] or 'not written'}")
+    return 0 if counts[JobState.FAILED.value] == 0 else 1
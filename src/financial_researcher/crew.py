@@ -1,8 +1,65 @@
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
-from typing import List
-from crewai_tools import SerperDevTool
+from concurrent.futures import Future
+from contextvars import Context, copy_context
+from functools import lru_cache
+from pydantic import PrivateAttr
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+import copy
+import os
+import yaml
+from financial_researcher.llm_cache import llm_for_agent
+from financial_researcher.tools.cached_search_tool import shared_search_tool
+
+
+# Tasks in config/tasks.yaml that split the research task by focus area
+FOCUS_AREA_TASKS = (
+    'research_status',
+    'research_history',
+    'research_challenges',
+    'research_news',
+    'research_outlook',
+)
+
+
+@lru_cache(maxsize=16)
+def _parse_yaml(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        content = yaml.safe_load(f)
+    return content if isinstance(content, dict) else {}
+
+
+def load_yaml(config_path: Path) -> Dict[str, Any]:
+    """
+    Parsed YAML config, read once per file version.
+
+    Every crew gets its own copy, since CrewBase replaces agent and task
+    names in it with instances.
+    """
+    stat = os.stat(config_path)
+    return copy.deepcopy(_parse_yaml(str(config_path), stat.st_mtime_ns, stat.st_size))
+
+
+class ContextTask(Task):
+    """
+    Task whose async execution runs in a copy of the kicking-off thread's context.
+
+    crewAI starts async tasks on plain threads, which begin with an empty
+    context, so per-job context variables such as the output routing of
+    crew_runner would otherwise not reach them.
+    """
+    _caller_context: Optional[Context] = PrivateAttr(default=None)
+
+    def execute_async(self, *args, **kwargs) -> Future:
+        self._caller_context = copy_context()
+        return super().execute_async(*args, **kwargs)
+
+    def _execute_task_async(self, *args, **kwargs) -> None:
+        if self._caller_context is None:
+            return super()._execute_task_async(*args, **kwargs)
+        self._caller_context.run(super()._execute_task_async, *args, **kwargs)
 
 
 @CrewBase
@@ -11,20 +68,48 @@ class FinancialResearcher():
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
 
+    def __init__(
+        self,
+        verbose: bool = True,
+        fan_out: bool = False,
+        refresh_sections: Optional[Sequence[str]] = None,
+        stream_report: bool = False
+    ):
+        # Web jobs take progress from the event bus and run quietly
+        self.verbose = verbose
+        # Research each focus area concurrently instead of in one long task
+        self.fan_out = fan_out
+        # Re-research only these focus areas and merge them into the previous report
+        self.refresh_sections = refresh_sections
+        # Stream the analyst's tokens so the report can be shown as it is written
+        self.stream_report = stream_report
 
     @agent
     def researcher(self) -> Agent:
         return Agent(
             config=self.agents_config['researcher'], # type: ignore[index]
-            tools=[SerperDevTool()],
-            verbose=True
+            llm=llm_for_agent('researcher', self.agents_config['researcher']['llm']), # type: ignore[index]
+            tools=[shared_search_tool()],
+            verbose=self.verbose
+        )
+
+    def focus_researcher(self) -> Agent:
+        """A researcher of its own for one focus area, so several can run at once."""
+        return Agent(
+            config=self.agents_config['researcher'], # type: ignore[index]
+            llm=llm_for_agent('researcher', self.agents_config['researcher']['llm']), # type: ignore[index]
+            tools=[shared_search_tool()],
+            verbose=self.verbose
         )
 
     @agent
     def analyst(self) -> Agent:
         return Agent(
             config=self.agents_config['analyst'], # type: ignore[index]
-            verbose=True
+            llm=llm_for_agent(
+                'analyst', self.agents_config['analyst']['llm'], stream=self.stream_report # type: ignore[index]
+            ),
+            verbose=self.verbose
         )
 
     @task
@@ -40,13 +125,67 @@ class FinancialResearcher():
             output_file='output/report_{company}.md'
         )
 
+    def focus_area_tasks(self, names: Sequence[str] = FOCUS_AREA_TASKS) -> List[Task]:
+        """The research task split by focus area, each run asynchronously by its own researcher."""
+        return [
+            ContextTask(
+                config=self.tasks_config[name], # type: ignore[index]
+                name=name,
+                agent=self.focus_researcher(),
+                async_execution=True
+            )
+            for name in names
+        ]
+
     @crew
     def crew(self) -> Crew:
         """Creates the FinancialResearcher crew"""
-        
+        if self.refresh_sections:
+            return self.refresh_crew(self.refresh_sections)
+        if self.fan_out:
+            return self.fan_out_crew()
+
         return Crew(
             agents=self.agents, # Automatically created by the @agent decorator
             tasks=self.tasks, # Automatically created by the @task decorator
             process=Process.sequential,
-            verbose=True,
+            verbose=self.verbose,
         )
+
+    def fan_out_crew(self) -> Crew:
+        """
+        Crew that researches the focus areas concurrently.
+
+        The analysis task waits for all of them and gets their findings as
+        context, so research takes about as long as the slowest area.
+        """
+        return self._focus_area_crew(FOCUS_AREA_TASKS, 'analysis')
+
+    def refresh_crew(self, sections: Sequence[str]) -> Crew:
+        """
+        Crew that researches only ``sections`` again and has the analyst
+        merge them into the previous report.
+
+        Kick it off with ``previous_report`` and ``kept_sections`` inputs
+        besides ``company``.
+        """
+        return self._focus_area_crew(sections, 'refresh_analysis')
+
+    def _focus_area_crew(self, sections: Sequence[str], analysis_config: str) -> Crew:
+        focus_tasks = self.focus_area_tasks(sections)
+        analysis = Task(
+            config=self.tasks_config[analysis_config], # type: ignore[index]
+            name='analysis',
+            context=focus_tasks,
+            output_file='output/report_{company}.md'
+        )
+        return Crew(
+            agents=[task.agent for task in focus_tasks] + [self.analyst()],
+            tasks=focus_tasks + [analysis],
+            process=Process.sequential,
+            verbose=self.verbose,
+        )
+
+
+# CrewBase installs its own loader on the class; use the cached one
+FinancialResearcher.load_yaml = staticmethod(load_yaml)
@@ -1,48 +1,153 @@
 """Crew runner that captures output and integrates with job management."""
+import os
 import sys
-import io
-from contextlib import redirect_stdout, redirect_stderr
-from typing import Optional
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Optional, TextIO
 
-from financial_researcher.crew import FinancialResearcher
+from financial_researcher.crew import FOCUS_AREA_TASKS, FinancialResearcher
+from financial_researcher.event_listener import get_event_bridge
 from financial_researcher.job_manager import JobManager, JobState
 from financial_researcher.log_parser import LogParser
+from financial_researcher.section_store import SectionStore, stale_sections
+from financial_researcher.tracing import JobTrace, trace_store
+
+
+# "events" takes progress from crewAI's event bus, "stdout" scrapes verbose output
+CREW_EVENT_SOURCE = os.environ.get('CREW_EVENT_SOURCE', 'events')
+
+# Research the focus areas concurrently; see FinancialResearcher.fan_out_crew
+RESEARCH_FAN_OUT = os.environ.get('RESEARCH_FAN_OUT', 'false').lower() in ('1', 'true', 'yes')
+
+# Send the report to /stream as the analyst writes it (needs the event source)
+REPORT_STREAMING = os.environ.get('REPORT_STREAMING', 'true').lower() in ('1', 'true', 'yes')
+
+# Sections of past reports, for refresh runs
+section_store = SectionStore(os.environ.get('REPORT_SECTIONS_DIR', 'output/sections'))
 
 
 class CrewOutputCapture:
     """Captures stdout/stderr and forwards to job manager with parsing."""
     
-    def __init__(self, job_manager: JobManager, job_id: str):
+    def __init__(self, job_manager: JobManager, job_id: str, parse: bool = True):
         self.job_manager = job_manager
         self.job_id = job_id
-        self.buffer = io.StringIO()
-        self.parser = LogParser()
+        self.parser = LogParser() if parse else None
     
     def write(self, text: str):
-        """Write to buffer, parse, and forward to job manager."""
+        """Parse and forward to job manager."""
         if text and text.strip():
-            self.buffer.write(text)
-            
             # Add raw log
             self.job_manager.add_log(self.job_id, text.strip())
             
             # Parse and extract structured events
-            events = self.parser.parse_line(text.strip())
-            for event in events:
-                self.job_manager.add_event(self.job_id, event)
+            if self.parser is not None:
+                events = self.parser.parse_line(text.strip())
+                for event in events:
+                    self.job_manager.add_event(self.job_id, event)
         
         return len(text)
     
     def flush(self):
-        """Flush the buffer."""
-        self.buffer.flush()
+        """Nothing is buffered; writes go straight to the job manager."""
+
+
+class OutputRouter:
+    """
+    Process-wide stdout/stderr replacement that routes writes per job.
+
+    ``redirect_stdout`` swaps ``sys.stdout`` for every thread at once, so
+    concurrent jobs would capture each other's output. The router is
+    installed once and looks up the capture bound to the current context;
+    writes from anywhere else go to the original stream.
+    """
+
+    def __init__(self, fallback: TextIO):
+        self._fallback = fallback
+        self._target: ContextVar[Optional["CrewOutputCapture"]] = ContextVar(
+            f"output_target_{id(self)}", default=None
+        )
+
+    def write(self, text: str) -> int:
+        """Write to the capture bound to the current context, if any."""
+        target = self._target.get()
+        if target is None:
+            return self._fallback.write(text)
+        return target.write(text)
+
+    def flush(self):
+        """Flush the current target."""
+        target = self._target.get()
+        if target is None:
+            self._fallback.flush()
+        else:
+            target.flush()
+
+    @contextmanager
+    def route(self, target: "CrewOutputCapture"):
+        """Send writes made from the current context to ``target``."""
+        token = self._target.set(target)
+        try:
+            yield target
+        finally:
+            self._target.reset(token)
+
+    def __getattr__(self, name):
+        # isatty(), encoding, fileno() etc. behave like the original stream
+        return getattr(self._fallback, name)
+
+
+_router_lock = threading.Lock()
+_stdout_router: Optional[OutputRouter] = None
+_stderr_router: Optional[OutputRouter] = None
+
+
+def install_output_routers():
+    """Install the stdout/stderr routers once for the whole process."""
+    global _stdout_router, _stderr_router
+    
+    with _router_lock:
+        if _stdout_router is None:
+            _stdout_router = OutputRouter(sys.stdout)
+            sys.stdout = _stdout_router
+        if _stderr_router is None:
+            _stderr_router = OutputRouter(sys.stderr)
+            sys.stderr = _stderr_router
     
-    def getvalue(self) -> str:
-        """Get all captured output."""
-        return self.buffer.getvalue()
+    return _stdout_router, _stderr_router
+
+
+@contextmanager
+def capture_output(capture: "CrewOutputCapture"):
+    """Route stdout and stderr of the current thread into ``capture``."""
+    stdout_router, stderr_router = install_output_routers()
+    with stdout_router.route(capture), stderr_router.route(capture):
+        yield capture
+
 
+def warm_up():
+    """
+    Build a crew the way jobs do without running it.
 
-def run_crew_with_logging(company_name: str, job_manager: JobManager, job_id: str) -> Optional[str]:
+    The first job then finds crewAI imported, the configs parsed and
+    checked, and the LLM and search tool templates ready to clone.
+    Raises whatever building the crew raises, e.g. for a missing API key.
+    """
+    FinancialResearcher(
+        verbose=False,
+        fan_out=RESEARCH_FAN_OUT,
+        stream_report=REPORT_STREAMING and CREW_EVENT_SOURCE == 'events'
+    ).crew()
+
+
+def run_crew_with_logging(
+    company_name: str,
+    job_manager: JobManager,
+    job_id: str,
+    refresh: bool = False
+) -> Optional[str]:
     """
     Run the financial research crew with output capture.
     
@@ -50,6 +155,8 @@ def run_crew_with_logging(company_name: str, job_manager: JobManager, job_id: st
         company_name: The company to research
         job_manager: JobManager instance to track progress
         job_id: The job ID to update
+        refresh: Research only the stale sections of the company's last
+            report and merge them into it; see section_store
     
     Returns:
         Path to the generated report, or None if failed
@@ -57,25 +164,63 @@ def run_crew_with_logging(company_name: str, job_manager: JobManager, job_id: st
     # Update job to running state
     job_manager.update_job(job_id, JobState.RUNNING, f"Starting research for {company_name}...")
     
+    # Spans below the job are recorded by the event bridge
+    trace = JobTrace(job_id, company_name)
+    trace_store.begin(trace)
+    trace_status = 'error'
+    
     try:
-        # Create output capture
-        capture = CrewOutputCapture(job_manager, job_id)
+        use_events = CREW_EVENT_SOURCE == 'events'
+        
+        # Create output capture. With the event bridge, stray prints are
+        # still logged but only the bridge produces structured events.
+        capture = CrewOutputCapture(job_manager, job_id, parse=not use_events)
         
         # Prepare inputs
         inputs = {'company': company_name}
+        report_path = f"output/report_{company_name}.md"
         
         # Run crew with output capture
         job_manager.add_log(job_id, "Initializing AI agents...")
         
-        with redirect_stdout(capture), redirect_stderr(capture):
-            crew_instance = FinancialResearcher()
-            result = crew_instance.crew().kickoff(inputs=inputs)
+        with capture_output(capture):
+            # Refreshes need the report split into sections, so they always fan out
+            crew_instance = FinancialResearcher(
+                verbose=not use_events,
+                fan_out=RESEARCH_FAN_OUT or refresh,
+                stream_report=REPORT_STREAMING and use_events
+            )
+            
+            stored = section_store.load(company_name) if refresh else None
+            stale = stale_sections(stored, crew_instance.tasks_config, FOCUS_AREA_TASKS) if stored else None
+            
+            if stored and not stale:
+                job_manager.add_log(job_id, "Every section is current, reusing the previous report")
+                Path(report_path).parent.mkdir(parents=True, exist_ok=True)
+                Path(report_path).write_text(stored.report, encoding='utf-8')
+                result = None
+            else:
+                if stored:
+                    job_manager.add_log(job_id, f"Refreshing stale sections: {', '.join(stale)}")
+                    crew_instance.refresh_sections = stale
+                    inputs['previous_report'] = stored.report
+                    inputs['kept_sections'] = stored.render_sections(
+                        name for name in FOCUS_AREA_TASKS if name not in stale
+                    )
+                
+                crew = crew_instance.crew()
+                if use_events:
+                    with get_event_bridge().track(crew, job_manager, job_id, trace):
+                        result = crew.kickoff(inputs=inputs)
+                else:
+                    result = crew.kickoff(inputs=inputs)
         
-        # Determine report path
-        report_path = f"output/report_{company_name}.md"
+        if result is not None and crew_instance.fan_out:
+            _save_sections(company_name, report_path, result, crew_instance.tasks_config)
         
         job_manager.add_log(job_id, "Research completed successfully!")
         job_manager.set_result(job_id, report_path)
+        trace_status = 'ok'
         
         return report_path
         
@@ -83,3 +228,21 @@ def run_crew_with_logging(company_name: str, job_manager: JobManager, job_id: st
         error_msg = f"Error during research: {str(e)}"
         job_manager.update_job(job_id, JobState.FAILED, error_msg)
         return None
+    
+    finally:
+        trace.finish(trace_status)
+        trace_store.save(trace)
+
+
+def _save_sections(company_name: str, report_path: str, result, tasks_config):
+    """Keep the sections researched by a fan-out run for later refreshes."""
+    sections = {
+        output.name: output.raw
+        for output in result.tasks_output
+        if output.name in FOCUS_AREA_TASKS
+    }
+    try:
+        report = Path(report_path).read_text(encoding='utf-8')
+    except OSError:
+        return
+    section_store.save(company_name, report, sections, tasks_config)
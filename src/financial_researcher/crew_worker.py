@@ -0,0 +1,80 @@
+"""
+Entry module of the crew worker processes started by ProcessCrewExecutor.
+
+Spawned workers re-run this module instead of the parent's main script, so
+they never import the web app and the job store, scheduler and retention
+sweeps that come with it. Keep its imports to what running a crew needs.
+"""
+import sys
+import threading
+from typing import Dict, Optional
+
+from financial_researcher.job_manager import JobState
+
+
+# Modules that bring the web server's state along; a worker must not load them
+WEB_APP_MODULES = (
+    'financial_researcher.research_service',
+    'financial_researcher.web_app',
+    'financial_researcher.asgi_app',
+)
+
+
+class JobManagerProxy:
+    """
+    Stands in for JobManager inside a worker process.
+
+    Every call is sent over the pipe to the parent, which applies it to
+    the real JobManager. Calls come from several threads (the crewAI event
+    loop, async tasks, captured output), so sends are serialized.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._lock = threading.Lock()
+
+    def _send(self, method: str, *args, **kwargs) -> bool:
+        with self._lock:
+            self._conn.send(('call', method, args, kwargs))
+        return True
+
+    def add_log(self, job_id: str, message: str) -> bool:
+        return self._send('add_log', job_id, message)
+
+    def add_event(self, job_id: str, event: Dict) -> bool:
+        return self._send('add_event', job_id, event)
+
+    def update_job(self, job_id: str, state: JobState, message: Optional[str] = None) -> bool:
+        return self._send('update_job', job_id, state, message)
+
+    def set_result(self, job_id: str, report_path: str) -> bool:
+        return self._send('set_result', job_id, report_path)
+
+    def done(self, report_path: Optional[str]):
+        with self._lock:
+            self._conn.send(('done', report_path))
+
+
+def main(conn):
+    """Worker process loop: run one crew per ('run', ...) message until told to stop."""
+    # Imported here so the parent never loads crewAI on behalf of its workers
+    from financial_researcher.crew_runner import run_crew_with_logging
+
+    # A second job store and scheduler here would run jobs nobody serves,
+    # and its retention sweeps would delete reports the server still holds
+    loaded = [name for name in WEB_APP_MODULES if name in sys.modules]
+    if loaded:
+        sys.exit(f"Crew worker must not import the web app, but loaded {', '.join(loaded)}")
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+
+        _, job_id, company_name, refresh = message
+        proxy = JobManagerProxy(conn)
+        report_path = run_crew_with_logging(company_name, proxy, job_id, refresh=refresh)
+        proxy.done(report_path)
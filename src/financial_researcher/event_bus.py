@@ -0,0 +1,152 @@
+"""Per-job publish/subscribe channels that wake SSE streams on new events."""
+import threading
+from typing import Callable, Dict, List, Optional
+
+
+class _Channel:
+    """Version counter and condition variable for one job.
+
+    ``subscribers`` is guarded by the bus lock, the rest by ``condition``.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.version = 0
+        self.subscribers = 0
+        self.closed = False
+        self.listeners: List[Callable[[], None]] = []
+
+
+class Subscription:
+    """
+    A reader's view of a job channel.
+
+    The version is captured when the subscription is created, so any
+    publish after that point wakes ``wait`` even if it happened before
+    the reader started waiting.
+    """
+
+    def __init__(self, bus: "JobEventBus", job_id: str, channel: _Channel):
+        self.bus = bus
+        self.job_id = job_id
+        self._channel = channel
+        self._seen_version = channel.version
+        self._closed = False
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until something is published or the timeout expires.
+
+        Returns True if there was a publish since the last call, False on
+        timeout.
+        """
+        channel = self._channel
+        with channel.condition:
+            changed = channel.condition.wait_for(
+                lambda: channel.version != self._seen_version or channel.closed,
+                timeout
+            )
+            self._seen_version = channel.version
+            return changed
+
+    @property
+    def closed(self) -> bool:
+        return self._channel.closed
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self.bus._unsubscribe(self.job_id, self._channel)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JobEventBus:
+    """Fans out "job changed" notifications to any number of subscribers."""
+
+    def __init__(self):
+        self._channels: Dict[str, _Channel] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, job_id: str):
+        """Wake every subscriber of a job."""
+        with self._lock:
+            channel = self._channels.get(job_id)
+        if channel is None:
+            return
+
+        with channel.condition:
+            channel.version += 1
+            channel.condition.notify_all()
+            listeners = list(channel.listeners)
+
+        for listener in listeners:
+            listener()
+
+    def subscribe(self, job_id: str) -> Subscription:
+        """Start listening for updates to a job."""
+        channel = self._acquire_channel(job_id)
+        with channel.condition:
+            return Subscription(self, job_id, channel)
+
+    def add_listener(self, job_id: str, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Call ``callback`` on every publish for a job, from the publishing thread.
+
+        Returns a function that removes the listener.
+        """
+        channel = self._acquire_channel(job_id)
+        with channel.condition:
+            channel.listeners.append(callback)
+
+        def remove():
+            with channel.condition:
+                if callback not in channel.listeners:
+                    return
+                channel.listeners.remove(callback)
+            self._unsubscribe(job_id, channel)
+
+        return remove
+
+    def close(self, job_id: str):
+        """Drop a job's channel and wake its subscribers so they can exit."""
+        with self._lock:
+            channel = self._channels.pop(job_id, None)
+        if channel is None:
+            return
+
+        with channel.condition:
+            channel.closed = True
+            channel.version += 1
+            channel.condition.notify_all()
+            listeners = list(channel.listeners)
+
+        for listener in listeners:
+            listener()
+
+    def subscriber_count(self, job_id: Optional[str] = None) -> int:
+        """Number of open subscriptions for one job, or for all jobs."""
+        with self._lock:
+            channels = list(self._channels.values()) if job_id is None else [self._channels.get(job_id)]
+            return sum(channel.subscribers for channel in channels if channel)
+
+    def _acquire_channel(self, job_id: str) -> _Channel:
+        """Get or create a job's channel and count one more subscriber."""
+        with self._lock:
+            channel = self._channels.get(job_id)
+            if channel is None:
+                channel = _Channel()
+                self._channels[job_id] = channel
+            channel.subscribers += 1
+            return channel
+
+    def _unsubscribe(self, job_id: str, channel: _Channel):
+        """Count one less subscriber and drop the channel once nobody listens."""
+        with self._lock:
+            channel.subscribers -= 1
+            if channel.subscribers == 0 and self._channels.get(job_id) is channel:
+                del self._channels[job_id]
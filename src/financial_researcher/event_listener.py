@@ -0,0 +1,446 @@
+"""Forwards crewAI's own lifecycle events to JobManager as dashboard events.
+
+crewAI reports agent, task, tool and LLM activity on a process-wide event
+bus. The bridge maps each running crew's agent and task ids to the job it
+belongs to and turns those events into the same ``EventType`` dicts the
+stdout ``LogParser`` produces, with timings taken from the events
+themselves instead of from scraped text. When given a ``JobTrace`` it
+also records the run as spans: tasks, each agent's turn at a task, and
+the tool and LLM calls made during it.
+"""
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from crewai.events import BaseEventListener
+from crewai.events.base_events import BaseEvent
+from crewai.events.types.agent_events import (
+    AgentExecutionCompletedEvent,
+    AgentExecutionErrorEvent,
+    AgentExecutionStartedEvent,
+)
+from crewai.events.types.llm_events import (
+    LLMCallCompletedEvent,
+    LLMCallFailedEvent,
+    LLMCallStartedEvent,
+    LLMCallType,
+    LLMStreamChunkEvent,
+)
+from crewai.events.types.task_events import TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent
+from crewai.events.types.tool_usage_events import (
+    ToolUsageErrorEvent,
+    ToolUsageFinishedEvent,
+    ToolUsageStartedEvent,
+)
+
+from financial_researcher.job_manager import JobManager
+from financial_researcher.log_parser import EventType, determine_agent_role
+from financial_researcher.metrics import registry
+from financial_researcher.tracing import JobTrace
+
+
+# Longest tool output kept in an observation event
+MAX_OBSERVATION_CHARS = 500
+
+# Seconds to wait for queued handlers when a crew finishes
+FLUSH_TIMEOUT_SECONDS = 5.0
+
+# The task whose LLM output is the report, streamed as report_chunk events
+REPORT_TASK_NAME = 'analysis'
+
+# The report starts after this marker in the analyst's response
+FINAL_ANSWER_MARKER = 'Final Answer:'
+
+# Streamed tokens are batched into one event per interval, or sooner once
+# this many characters are waiting, so a report is tens of events
+REPORT_CHUNK_INTERVAL_SECONDS = 0.25
+REPORT_CHUNK_MAX_CHARS = 2000
+
+# How far the bridge's handlers trail the crew; crewAI queues events for them
+EVENT_LAG = registry.histogram(
+    'crew_event_lag_seconds', "Time from crewAI emitting an event to the bridge recording it",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+
+
+class _FlushEvent(BaseEvent):
+    """Marker emitted after a crew finishes; handled once every earlier event is."""
+    type: str = "financial_researcher_flush"
+
+
+@dataclass
+class _ReportStream:
+    """The analyst's response to one LLM call, as far as it has been streamed."""
+    text: str = ''
+    # Offset of the report in ``text``, once the final answer marker is seen
+    answer_start: Optional[int] = None
+    # Characters of the report sent so far
+    sent: int = 0
+    last_sent_at: Optional[datetime] = None
+
+
+@dataclass
+class _JobRoute:
+    """Where a crew's events go, plus the state needed to describe them."""
+    job_manager: JobManager
+    job_id: str
+    current_agent: Optional[str] = None
+    current_task: Optional[str] = None
+    started_at: Dict[Tuple[str, Optional[str]], datetime] = field(default_factory=dict)
+    report_stream: Optional[_ReportStream] = None
+    # Token totals of each LLM when its last call was recorded, by id
+    token_totals: Dict[int, Tuple[int, int]] = field(default_factory=dict)
+    trace: Optional[JobTrace] = None
+    # The agent working on each task, by task id; tool events lack the agent's id
+    task_agents: Dict[str, str] = field(default_factory=dict)
+
+
+class JobEventBridge(BaseEventListener):
+    """
+    Listens on the crewAI event bus and adds events to the owning job.
+
+    Handlers are registered as coroutines, so crewAI runs them one after
+    another on its event loop in the order the events were emitted. That
+    keeps a job's events in order and lets ``track`` wait for the tail of
+    a run before the job is marked complete.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[str, _JobRoute] = {}
+        super().__init__()
+
+    @contextmanager
+    def track(self, crew: Any, job_manager: JobManager, job_id: str,
+              trace: Optional[JobTrace] = None) -> Iterator[_JobRoute]:
+        """
+        Send the events of ``crew``'s agents and tasks to a job while the
+        block runs, recording spans on ``trace`` if given.
+        """
+        route = _JobRoute(job_manager, job_id, trace=trace)
+        ids = [str(agent.id) for agent in crew.agents] + [str(task.id) for task in crew.tasks]
+        with self._lock:
+            for entity_id in ids:
+                self._routes[entity_id] = route
+        try:
+            yield route
+        finally:
+            self.flush()
+            with self._lock:
+                for entity_id in ids:
+                    self._routes.pop(entity_id, None)
+
+    def flush(self, timeout: float = FLUSH_TIMEOUT_SECONDS):
+        """Wait until every event emitted so far has been handled."""
+        from crewai.events import crewai_event_bus
+
+        future = crewai_event_bus.emit(self, _FlushEvent())
+        if future is not None:
+            try:
+                future.result(timeout)
+            except Exception:
+                pass  # Late events are dropped rather than holding up the job
+
+    def setup_listeners(self, crewai_event_bus):
+        @crewai_event_bus.on(_FlushEvent)
+        async def on_flush(source, event):
+            pass
+
+        @crewai_event_bus.on(AgentExecutionStartedEvent)
+        async def on_agent_started(source, event):
+            route = self._route(getattr(event.task, 'id', None), event.agent.id)
+            if route is None:
+                return
+            agent_name = event.agent.role.strip()
+            task_id = str(getattr(event.task, 'id', None))
+            route.task_agents[task_id] = str(event.agent.id)
+            self._start_span(
+                route, ('agent', str(event.agent.id), task_id), agent_name, 'agent', event,
+                (('task', task_id),), role=determine_agent_role(agent_name)
+            )
+            if agent_name == route.current_agent:
+                return
+
+            event_type = EventType.AGENT_START if route.current_agent is None else EventType.AGENT_CHANGE
+            route.current_agent = agent_name
+            self._add_event(route, event_type, event, {
+                'agent': agent_name,
+                'role': determine_agent_role(agent_name),
+            })
+            route.job_manager.add_log(route.job_id, f"Agent: {agent_name}")
+
+        @crewai_event_bus.on(AgentExecutionCompletedEvent)
+        async def on_agent_completed(source, event):
+            route = self._route(getattr(event.task, 'id', None), event.agent.id)
+            if route is not None:
+                self._end_span(route, ('agent', str(event.agent.id), str(getattr(event.task, 'id', None))), event)
+
+        @crewai_event_bus.on(AgentExecutionErrorEvent)
+        async def on_agent_error(source, event):
+            route = self._route(getattr(event.task, 'id', None), event.agent.id)
+            if route is not None:
+                self._end_span(
+                    route, ('agent', str(event.agent.id), str(getattr(event.task, 'id', None))), event,
+                    'error', error=str(event.error)
+                )
+
+        @crewai_event_bus.on(TaskStartedEvent)
+        async def on_task_started(source, event):
+            task = event.task
+            route = self._route(getattr(task, 'id', None))
+            if route is None:
+                return
+            task_name = self._task_name(task)
+            route.current_task = task_name
+            route.started_at[('task', str(task.id))] = event.timestamp
+            self._start_span(
+                route, ('task', str(task.id)), task_name, 'task', event,
+                agent=self._task_agent(task), async_execution=bool(getattr(task, 'async_execution', False))
+            )
+            self._add_event(route, EventType.TASK_START, event, {
+                'task': task_name,
+                'agent': self._task_agent(task) or route.current_agent,
+            })
+            route.job_manager.add_log(route.job_id, f"Task started: {task_name}")
+
+        @crewai_event_bus.on(TaskCompletedEvent)
+        async def on_task_completed(source, event):
+            task = event.task
+            route = self._route(getattr(task, 'id', None))
+            if route is None:
+                return
+            task_name = self._task_name(task)
+            duration_ms = self._elapsed_ms(route, ('task', str(task.id)), event.timestamp)
+            self._end_span(route, ('task', str(task.id)), event)
+            self._add_event(route, EventType.TASK_COMPLETE, event, {
+                'task': task_name,
+                'agent': self._task_agent(task) or route.current_agent,
+                'duration_ms': duration_ms,
+            })
+            route.job_manager.add_log(route.job_id, f"Task completed: {task_name}")
+
+        @crewai_event_bus.on(TaskFailedEvent)
+        async def on_task_failed(source, event):
+            route = self._route(getattr(event.task, 'id', None))
+            if route is None:
+                return
+            self._end_span(route, ('task', str(getattr(event.task, 'id', None))), event, 'error', error=str(event.error))
+            self._add_log_event(route, event, f"Task failed: {event.error}")
+
+        @crewai_event_bus.on(ToolUsageStartedEvent)
+        async def on_tool_started(source, event):
+            route = self._route(event.task_id, event.agent_id)
+            if route is None:
+                return
+            self._start_span(
+                route, self._tool_key(event), event.tool_name, 'tool', event, self._call_parents(route, event),
+                args=str(event.tool_args)
+            )
+            self._add_event(route, EventType.TOOL_USE, event, {
+                'tool': event.tool_name,
+                'action': 'Search' if 'search' in event.tool_name.lower() else None,
+                'args': event.tool_args,
+                'agent': route.current_agent,
+            })
+            route.job_manager.add_log(route.job_id, f"Using tool: {event.tool_name}")
+
+        @crewai_event_bus.on(ToolUsageFinishedEvent)
+        async def on_tool_finished(source, event):
+            route = self._route(event.task_id, event.agent_id)
+            if route is None:
+                return
+            observation = str(event.output)
+            if len(observation) > MAX_OBSERVATION_CHARS:
+                observation = observation[:MAX_OBSERVATION_CHARS] + '...'
+            self._end_span(route, self._tool_key(event), event, from_cache=bool(event.from_cache))
+            self._add_event(route, EventType.OBSERVATION, event, {
+                'observation': observation,
+                'tool': event.tool_name,
+                'from_cache': event.from_cache,
+                'duration_ms': _ms(event.finished_at - event.started_at),
+                'agent': route.current_agent,
+            })
+
+        @crewai_event_bus.on(ToolUsageErrorEvent)
+        async def on_tool_error(source, event):
+            route = self._route(event.task_id, event.agent_id)
+            if route is None:
+                return
+            self._end_span(route, self._tool_key(event), event, 'error', error=str(event.error))
+            self._add_log_event(route, event, f"Tool {event.tool_name} failed: {event.error}")
+
+        @crewai_event_bus.on(LLMCallStartedEvent)
+        async def on_llm_started(source, event):
+            route = self._route(event.task_id, event.agent_id)
+            if route is None:
+                return
+            route.started_at[('llm', event.agent_id)] = event.timestamp
+            self._start_span(
+                route, ('llm', event.agent_id, event.task_id), event.model or 'llm', 'llm', event,
+                self._call_parents(route, event), model=event.model
+            )
+            if event.task_name == REPORT_TASK_NAME:
+                # A retry or follow-up call writes the report again from the start
+                if route.report_stream is not None and route.report_stream.sent:
+                    self._add_event(route, EventType.REPORT_CHUNK, event, {'text': '', 'offset': 0, 'reset': True})
+                route.report_stream = _ReportStream()
+
+        @crewai_event_bus.on(LLMStreamChunkEvent)
+        async def on_llm_chunk(source, event):
+            if event.task_name != REPORT_TASK_NAME or event.call_type == LLMCallType.TOOL_CALL:
+                return
+            route = self._route(event.task_id, event.agent_id)
+            if route is None:
+                return
+            if route.report_stream is None:
+                route.report_stream = _ReportStream()
+            route.report_stream.text += event.chunk
+            self._send_report_text(route, event)
+
+        @crewai_event_bus.on(LLMCallCompletedEvent)
+        async def on_llm_completed(source, event):
+            route = self._route(event.task_id, event.agent_id)
+            if route is None:
+                return
+            if route.report_stream is not None and event.task_name == REPORT_TASK_NAME:
+                self._send_report_text(route, event, final=True)
+            prompt_tokens, completion_tokens = self._tokens_used(route, source)
+            self._end_span(
+                route, ('llm', event.agent_id, event.task_id), event,
+                prompt_tokens=prompt_tokens, completion_tokens=completion_tokens
+            )
+            self._add_event(route, EventType.LLM_CALL, event, {
+                'model': event.model,
+                'duration_ms': self._elapsed_ms(route, ('llm', event.agent_id), event.timestamp),
+                'agent': route.current_agent,
+                'task': route.current_task,
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+            })
+
+        @crewai_event_bus.on(LLMCallFailedEvent)
+        async def on_llm_failed(source, event):
+            route = self._route(event.task_id, event.agent_id)
+            if route is None:
+                return
+            route.started_at.pop(('llm', event.agent_id), None)
+            self._end_span(route, ('llm', event.agent_id, event.task_id), event, 'error', error=str(event.error))
+            self._add_log_event(route, event, f"LLM call failed: {event.error}")
+
+    def _route(self, *entity_ids: Any) -> Optional[_JobRoute]:
+        """The route for the first id that belongs to a tracked crew."""
+        with self._lock:
+            for entity_id in entity_ids:
+                if entity_id is not None:
+                    route = self._routes.get(str(entity_id))
+                    if route is not None:
+                        return route
+        return None
+
+    def _add_event(self, route: _JobRoute, event_type: EventType, event: BaseEvent, data: Dict):
+        EVENT_LAG.observe((datetime.now(event.timestamp.tzinfo) - event.timestamp).total_seconds())
+        route.job_manager.add_event(route.job_id, {
+            'type': event_type.value,
+            'timestamp': event.timestamp.astimezone().strftime('%H:%M:%S'),
+            'data': data,
+        })
+
+    def _add_log_event(self, route: _JobRoute, event: BaseEvent, message: str):
+        route.job_manager.add_log(route.job_id, message)
+        self._add_event(route, EventType.LOG, event, {
+            'message': message,
+            'agent': route.current_agent,
+            'task': route.current_task,
+        })
+
+    @staticmethod
+    def _start_span(route: _JobRoute, key: Tuple, name: str, kind: str, event: BaseEvent,
+                    parent_keys: Tuple = (), **attributes):
+        if route.trace is not None:
+            route.trace.start_span(key, name, kind, parent_keys, event.timestamp.timestamp(), **attributes)
+
+    @staticmethod
+    def _end_span(route: _JobRoute, key: Tuple, event: BaseEvent, status: str = 'ok', **attributes):
+        if route.trace is not None:
+            route.trace.end_span(key, event.timestamp.timestamp(), status, **attributes)
+
+    @staticmethod
+    def _call_parents(route: _JobRoute, event: BaseEvent) -> Tuple:
+        """Span keys a tool or LLM call hangs under: the agent's turn at the task, else the task."""
+        task_id = str(event.task_id)
+        agent_id = event.agent_id or route.task_agents.get(task_id)
+        return (('agent', str(agent_id), task_id), ('task', task_id))
+
+    @staticmethod
+    def _tool_key(event: BaseEvent) -> Tuple:
+        return ('tool', event.agent_id, event.task_id, event.tool_name)
+
+    def _send_report_text(self, route: _JobRoute, event: BaseEvent, final: bool = False):
+        """Send the part of the streamed report not sent yet, batching small pieces."""
+        stream = route.report_stream
+        if stream.answer_start is None:
+            marker = stream.text.find(FINAL_ANSWER_MARKER)
+            if marker < 0:
+                return
+            stream.answer_start = marker + len(FINAL_ANSWER_MARKER)
+
+        text = stream.text[stream.answer_start + stream.sent:]
+        if not stream.sent:
+            # Drop the whitespace after the marker
+            stripped = text.lstrip()
+            stream.answer_start += len(text) - len(stripped)
+            text = stripped
+        if not text:
+            return
+
+        due = (
+            final
+            or stream.last_sent_at is None
+            or len(text) >= REPORT_CHUNK_MAX_CHARS
+            or (event.timestamp - stream.last_sent_at).total_seconds() >= REPORT_CHUNK_INTERVAL_SECONDS
+        )
+        if not due:
+            return
+
+        self._add_event(route, EventType.REPORT_CHUNK, event, {'text': text, 'offset': stream.sent})
+        stream.sent += len(text)
+        stream.last_sent_at = event.timestamp
+
+    @staticmethod
+    def _tokens_used(route: _JobRoute, llm: Any) -> Tuple[Optional[int], Optional[int]]:
+        """Prompt and completion tokens ``llm`` used since it was last seen, if it counts them."""
+        try:
+            usage = llm.get_token_usage_summary()
+            totals = (int(usage.prompt_tokens), int(usage.completion_tokens))
+        except Exception:
+            return None, None
+        previous = route.token_totals.get(id(llm), (0, 0))
+        route.token_totals[id(llm)] = totals
+        return totals[0] - previous[0], totals[1] - previous[1]
+
+    @staticmethod
+    def _elapsed_ms(route: _JobRoute, key: Tuple[str, Optional[str]], finished_at: datetime) -> Optional[int]:
+        started_at = route.started_at.pop(key, None)
+        return _ms(finished_at - started_at) if started_at else None
+
+    @staticmethod
+    def _task_name(task: Any) -> str:
+        return task.name or task.description
+
+    @staticmethod
+    def _task_agent(task: Any) -> Optional[str]:
+        agent = getattr(task, 'agent', None)
+        return agent.role.strip() if agent is not None else None
+
+
+def _ms(delta) -> int:
+    return int(delta.total_seconds() * 1000)
+
+
+@lru_cache(maxsize=None)
+def get_event_bridge() -> JobEventBridge:
+    """The process-wide bridge. Handlers are registered on first use."""
+    return JobEventBridge()
@@ -0,0 +1,190 @@
+"""Bounded per-job storage for logs and events."""
+import json
+import os
+import sys
+from array import array
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+
+# Longer raw log lines are cut when stored with an event; the full text is in the logs
+RAW_LINE_MAX_CHARS = 200
+
+
+class EventRecord:
+    """Compact, slotted form of a structured job event."""
+
+    __slots__ = ('type', 'timestamp', 'data')
+
+    def __init__(self, type: str, timestamp: Optional[str], data: Dict[str, Any]):
+        # Event types repeat constantly, so share one string object per type
+        self.type = sys.intern(type)
+        self.timestamp = timestamp
+        self.data = data
+
+    @classmethod
+    def from_dict(cls, event: Dict) -> "EventRecord":
+        data = event.get('data', {})
+        raw_line = data.get('raw_line')
+        if isinstance(raw_line, str) and len(raw_line) > RAW_LINE_MAX_CHARS:
+            data = dict(data, raw_line=raw_line[:RAW_LINE_MAX_CHARS] + '...')
+        return cls(event.get('type', 'log'), event.get('timestamp'), data)
+
+    def to_dict(self) -> Dict:
+        return {'type': self.type, 'timestamp': self.timestamp, 'data': self.data}
+
+
+class JobHistory:
+    """
+    Append-only sequence of a job's items, holding only the newest in memory.
+
+    Items keep their index for the life of the job. Once more than
+    ``max_items`` are held, the oldest are written in batches to an
+    append-only JSON lines file at ``spill_path`` and read back from there
+    on demand. Without a spill path they are discarded, and reads start
+    at the oldest item still held. If the spill file cannot be written,
+    read back or no longer matches what was written (e.g. deleted from
+    outside), spilling stops for the job and older items are dropped as
+    if there were no spill path.
+
+    Not thread-safe; MemoryJobStore guards every call with the owning
+    job's ``_MemoryJob.lock``.
+    """
+
+    def __init__(
+        self,
+        max_items: int = 1000,
+        spill_path: Optional[str] = None,
+        encode: Callable[[Any], Any] = lambda item: item,
+        decode: Callable[[Any], Any] = lambda value: value,
+    ):
+        if max_items < 1:
+            raise ValueError("max_items must be at least 1")
+        self.max_items = max_items
+        self.spill_path = spill_path
+        self._encode = encode
+        self._decode = decode
+        self._items: Deque[Any] = deque()
+        # Index of self._items[0]; everything before it is spilled or dropped
+        self._first_index = 0
+        # Byte offset of each spilled item's line in the spill file
+        self._offsets = array('Q')
+        self._spill_size = 0
+        self._spill_failed = False
+
+    def __len__(self) -> int:
+        """Number of items ever appended."""
+        return self._first_index + len(self._items)
+
+    @property
+    def in_memory(self) -> int:
+        return len(self._items)
+
+    @property
+    def spilled(self) -> int:
+        return len(self._offsets)
+
+    def append(self, item: Any):
+        self._items.append(item)
+        if len(self._items) > self.max_items:
+            self._evict(max(1, self.max_items // 4))
+
+    def since(self, index: int = 0) -> List[Any]:
+        """Items from ``index`` on, oldest first."""
+        index = max(index, 0)
+        items = []
+        if index < self._first_index:
+            items.extend(self._read_spilled(index))
+        items.extend(islice(self._items, max(index - self._first_index, 0), None))
+        return items
+
+    def memory_bytes(self) -> int:
+        """Rough size of the items held in memory, counting each item and its values."""
+        return sum(_sizeof(item) for item in self._items)
+
+    def discard(self):
+        """Forget every item and delete the spill file."""
+        self._items.clear()
+        self._offsets = array('Q')
+        self._spill_size = 0
+        if self.spill_path:
+            try:
+                os.remove(self.spill_path)
+            except FileNotFoundError:
+                pass
+            # A late append must not recreate the file
+            self.spill_path = None
+
+    def _evict(self, count: int):
+        evicted = [self._items.popleft() for _ in range(min(count, len(self._items)))]
+        self._first_index += len(evicted)
+        # Line n of the spill file is item n, so stop for good after a failed write
+        if not self.spill_path or self._spill_failed:
+            return
+
+        offsets = []
+        chunk = bytearray()
+        try:
+            for item in evicted:
+                offsets.append(self._spill_size + len(chunk))
+                chunk += json.dumps(self._encode(item), default=str).encode('utf-8')
+                chunk += b'\n'
+        except (TypeError, ValueError):
+            self._spill_failed = True
+            return
+
+        try:
+            if not self._spill_intact():
+                self._spill_failed = True
+                return
+            Path(self.spill_path).parent.mkdir(parents=True, exist_ok=True)
+            with open(self.spill_path, 'ab') as f:
+                f.write(chunk)
+        except OSError:
+            self._spill_failed = True
+            return
+        self._offsets.extend(offsets)
+        self._spill_size += len(chunk)
+
+    def _spill_intact(self) -> bool:
+        """Whether the spill file still has exactly the bytes written to it."""
+        try:
+            return os.stat(self.spill_path).st_size == self._spill_size
+        except FileNotFoundError:
+            return self._spill_size == 0
+
+    def _read_spilled(self, index: int) -> List[Any]:
+        if index >= len(self._offsets) or self._spill_failed:
+            return []
+        try:
+            if not self._spill_intact():
+                raise ValueError("spill file changed since it was written")
+            with open(self.spill_path, 'rb') as f:
+                f.seek(self._offsets[index])
+                lines = f.read(self._spill_size - self._offsets[index]).splitlines()
+            return [self._decode(json.loads(line)) for line in lines]
+        except (OSError, ValueError, TypeError, AttributeError):
+            # Unreadable or misaligned; serve what is in memory from now on
+            self._spill_failed = True
+            return []
+
+
+def _sizeof(item: Any) -> int:
+    if isinstance(item, EventRecord):
+        return (
+            sys.getsizeof(item) + sys.getsizeof(item.timestamp) + sys.getsizeof(item.data)
+            + sum(sys.getsizeof(value) for value in item.data.values())
+        )
+    return sys.getsizeof(item)
+
+
+def event_history(max_items: int = 1000, spill_path: Optional[str] = None) -> JobHistory:
+    """History of EventRecords, spilled as their dict form."""
+    return JobHistory(
+        max_items,
+        spill_path,
+        encode=EventRecord.to_dict,
+        decode=EventRecord.from_dict,
+    )
@@ -1,151 +1,212 @@
 """Job management system for tracking research jobs."""
+import threading
 import uuid
-from dataclasses import dataclass, field
-from datetime import datetime
-from enum import Enum
-from typing import Dict, List, Optional
-from threading import Lock
-
-
-class JobState(Enum):
-    """Job execution states."""
-    QUEUED = "queued"
-    RUNNING = "running"
-    COMPLETED = "completed"
-    FAILED = "failed"
-
-
-@dataclass
-class JobStatus:
-    """Represents the status of a research job."""
-    job_id: str
-    company_name: str
-    state: JobState
-    created_at: datetime
-    updated_at: datetime
-    logs: List[str] = field(default_factory=list)
-    events: List[Dict] = field(default_factory=list)
-    current_agent: Optional[str] = None
-    current_task: Optional[str] = None
-    error_message: Optional[str] = None
-    report_path: Optional[str] = None
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from financial_researcher.event_bus import JobEventBus
+from financial_researcher.job_store import (
+    JobState,
+    JobStatus,
+    JobStore,
+    MemoryJobStore,
+    normalize_company_key,
+)
 
 
 class JobManager:
-    """Manages research jobs and their status."""
-    
-    def __init__(self):
-        self._jobs: Dict[str, JobStatus] = {}
-        self._lock = Lock()
-    
+    """
+    Manages research jobs and their status.
+
+    Jobs live in a ``JobStore``: in memory by default, or in a shared
+    SQLite file so several web worker processes see the same jobs. For a
+    shared store a background thread polls for changes made by other
+    processes and wakes the local ``/stream`` readers of those jobs.
+    """
+
+    def __init__(self, store: Optional[JobStore] = None, poll_interval: float = 0.25):
+        self.store = store or MemoryJobStore()
+        # Wakes /stream readers whenever a job's events or state change
+        self.event_bus = JobEventBus()
+        self._state_listeners: List[Callable[[JobStatus], None]] = []
+        self._event_listeners: List[Callable[[str, Dict], None]] = []
+        self._stopped = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        if self.store.shared:
+            self._watcher = threading.Thread(
+                target=self._watch_store, args=(poll_interval,), name="job-store-watcher", daemon=True
+            )
+            self._watcher.start()
+
     def create_job(self, company_name: str) -> str:
         """Create a new job and return its ID."""
-        job_id = str(uuid.uuid4())
+        job = self._new_job(company_name)
+        self.store.insert(job)
+        self._notify_state(job.job_id)
+        return job.job_id
+
+    def get_or_create_job(self, company_name: str) -> Tuple[str, bool]:
+        """
+        Attach to the in-flight job for this company or create a new one.
+
+        Requests for the same normalized company name share one job while it
+        is queued or running, so they see the same event stream and report.
+
+        Returns:
+            Tuple of (job_id, created) where created is False when the
+            request was attached to an existing job
+        """
+        job, created = self.store.get_or_insert_active(self._new_job(company_name))
+        if created:
+            self._notify_state(job.job_id)
+        return job.job_id, created
+
+    def _new_job(self, company_name: str) -> JobStatus:
         now = datetime.now()
-        
-        with self._lock:
-            self._jobs[job_id] = JobStatus(
-                job_id=job_id,
-                company_name=company_name,
-                state=JobState.QUEUED,
-                created_at=now,
-                updated_at=now
-            )
-        
-        return job_id
-    
+        return JobStatus(
+            job_id=str(uuid.uuid4()),
+            company_name=company_name,
+            state=JobState.QUEUED,
+            created_at=now,
+            updated_at=now,
+            company_key=normalize_company_key(company_name)
+        )
+
     def get_job(self, job_id: str) -> Optional[JobStatus]:
         """Retrieve job status by ID."""
-        with self._lock:
-            return self._jobs.get(job_id)
-    
+        return self.store.get(job_id)
+
     def update_job(self, job_id: str, state: JobState, message: Optional[str] = None) -> bool:
         """Update job state and optionally add a status message."""
-        with self._lock:
-            job = self._jobs.get(job_id)
-            if not job:
-                return False
-            
-            job.state = state
-            job.updated_at = datetime.now()
-            
-            if message:
-                job.logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] {message}")
-            
-            if state == JobState.FAILED and message:
-                job.error_message = message
-            
-            return True
-    
+        changes = {'state': state, 'updated_at': datetime.now()}
+        if state == JobState.FAILED and message:
+            changes['error_message'] = message
+
+        previous = self._state_of(job_id)
+        if not self.store.update(job_id, changes, self._format_log(message) if message else None):
+            return False
+
+        self.event_bus.publish(job_id)
+        # Updates that only add a status message leave the listeners alone
+        if previous != state:
+            self._notify_state(job_id)
+        return True
+
     def add_log(self, job_id: str, message: str) -> bool:
         """Add a log message to the job."""
-        with self._lock:
-            job = self._jobs.get(job_id)
-            if not job:
-                return False
-            
-            job.logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] {message}")
-            job.updated_at = datetime.now()
-            return True
-    
+        return self.store.append_log(job_id, self._format_log(message), {'updated_at': datetime.now()})
+
     def set_result(self, job_id: str, report_path: str) -> bool:
         """Set the completed report path for the job."""
-        with self._lock:
-            job = self._jobs.get(job_id)
-            if not job:
-                return False
-            
-            job.report_path = report_path
-            job.state = JobState.COMPLETED
-            job.updated_at = datetime.now()
-            return True
-    
+        changes = {'report_path': report_path, 'state': JobState.COMPLETED, 'updated_at': datetime.now()}
+        previous = self._state_of(job_id)
+        if not self.store.update(job_id, changes):
+            return False
+
+        self.event_bus.publish(job_id)
+        if previous != JobState.COMPLETED:
+            self._notify_state(job_id)
+        return True
+
     def get_logs(self, job_id: str) -> List[str]:
         """Get all logs for a job."""
-        with self._lock:
-            job = self._jobs.get(job_id)
-            if not job:
-                return []
-            return job.logs.copy()
-    
+        return self.store.read_logs(job_id)
+
     def add_event(self, job_id: str, event: Dict) -> bool:
         """Add a structured event to the job."""
-        with self._lock:
-            job = self._jobs.get(job_id)
-            if not job:
-                return False
-            
-            job.events.append(event)
-            job.updated_at = datetime.now()
-            
-            # Update current agent/task if event contains that info
-            if event.get('type') in ['agent_start', 'agent_change']:
-                job.current_agent = event.get('data', {}).get('agent')
-            elif event.get('type') == 'task_start':
-                job.current_task = event.get('data', {}).get('task')
-            
-            return True
-    
+        changes = {'updated_at': datetime.now()}
+
+        # Update current agent/task if event contains that info
+        if event.get('type') in ['agent_start', 'agent_change']:
+            changes['current_agent'] = event.get('data', {}).get('agent')
+        elif event.get('type') == 'task_start':
+            changes['current_task'] = event.get('data', {}).get('task')
+
+        if not self.store.append_event(job_id, event, changes):
+            return False
+
+        self.event_bus.publish(job_id)
+        for callback in self._event_listeners:
+            callback(job_id, event)
+        return True
+
     def get_events(self, job_id: str, since_index: int = 0) -> List[Dict]:
         """Get events for a job, optionally starting from a specific index."""
-        with self._lock:
-            job = self._jobs.get(job_id)
-            if not job:
-                return []
-            return job.events[since_index:]
-    
+        return self.read_events(job_id, since_index)[0]
+
+    def read_events(self, job_id: str, since_index: int = 0) -> Tuple[List[Dict], int]:
+        """
+        Get events from ``since_index`` on, and the index to continue from.
+
+        The next index accounts for events that were dropped from memory
+        without a spill file, so callers never see an event twice.
+        """
+        return self.store.read_events(job_id, since_index)
+
+    def remove_job(self, job_id: str) -> bool:
+        """Remove a job. Returns True if it existed."""
+        if not self.store.delete(job_id):
+            return False
+
+        self.event_bus.close(job_id)
+        return True
+
     def cleanup_old_jobs(self, max_age_hours: int = 24) -> int:
         """Remove jobs older than max_age_hours. Returns count of removed jobs."""
-        now = datetime.now()
-        removed = 0
-        
-        with self._lock:
-            job_ids = list(self._jobs.keys())
-            for job_id in job_ids:
-                job = self._jobs[job_id]
-                age_hours = (now - job.created_at).total_seconds() / 3600
-                if age_hours > max_age_hours:
-                    del self._jobs[job_id]
-                    removed += 1
-        
-        return removed
+        removed_ids = self.store.delete_created_before(datetime.now() - timedelta(hours=max_age_hours))
+
+        for job_id in removed_ids:
+            self.event_bus.close(job_id)
+
+        return len(removed_ids)
+
+    def list_jobs(self) -> List[JobStatus]:
+        """Snapshots of every job."""
+        return self.store.list_jobs()
+
+    def add_state_listener(self, callback: Callable[[JobStatus], None]):
+        """Call ``callback`` with a job's snapshot when it is created or changes state."""
+        self._state_listeners.append(callback)
+
+    def add_event_listener(self, callback: Callable[[str, Dict], None]):
+        """Call ``callback`` with the job ID and event after every ``add_event``. It must be fast."""
+        self._event_listeners.append(callback)
+
+    def _state_of(self, job_id: str) -> Optional[JobState]:
+        """The job's current state, read only if someone listens for changes."""
+        if not self._state_listeners:
+            return None
+        job = self.store.get(job_id)
+        return job.state if job else None
+
+    def _notify_state(self, job_id: str):
+        if not self._state_listeners:
+            return
+        job = self.store.get(job_id)
+        if job is None:
+            return
+        for callback in self._state_listeners:
+            callback(job)
+
+    def close(self):
+        """Stop watching the store and close it."""
+        self._stopped.set()
+        if self._watcher is not None:
+            self._watcher.join()
+        self.store.close()
+
+    def _watch_store(self, poll_interval: float):
+        """Publish changes other processes make to jobs this process is streaming."""
+        cursor = self.store.current_revision()
+        while not self._stopped.wait(poll_interval):
+            if not self.event_bus.subscriber_count():
+                # Nobody to wake; skip ahead without reading the changes
+                cursor = self.store.current_revision()
+                continue
+            job_ids, cursor = self.store.changes_since(cursor)
+            for job_id in set(job_ids):
+                self.event_bus.publish(job_id)
+
+    @staticmethod
+    def _format_log(message: str) -> str:
+        return f"[{datetime.now().strftime('%H:%M:%S')}] {message}"
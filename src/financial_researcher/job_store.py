@@ -0,0 +1,743 @@
+"""Job records and the storage backends behind JobManager."""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass, fields, replace
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from financial_researcher.job_history import EventRecord, JobHistory, event_history
+
+
+def normalize_company_key(company_name: str) -> str:
+    """
+    Normalize a company name so equivalent requests map to the same key.
+
+    Case, punctuation and repeated whitespace are ignored, so
+    "Apple Inc." and "  apple   inc" share a key.
+    """
+    without_punctuation = re.sub(r'[^\w\s]', '', company_name.casefold())
+    return ' '.join(without_punctuation.split())
+
+
+class JobState(Enum):
+    """Job execution states."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+ACTIVE_STATES = (JobState.QUEUED, JobState.RUNNING)
+
+
+@dataclass(frozen=True)
+class JobStatus:
+    """
+    Represents the status of a research job.
+
+    Instances are immutable snapshots; stores replace them on every change.
+    """
+    job_id: str
+    company_name: str
+    state: JobState
+    created_at: datetime
+    updated_at: datetime
+    current_agent: Optional[str] = None
+    current_task: Optional[str] = None
+    error_message: Optional[str] = None
+    report_path: Optional[str] = None
+    company_key: str = ''
+    attached_requests: int = 1
+
+
+# JobStatus fields a store may change after creation
+UPDATABLE_FIELDS = frozenset(
+    f.name for f in fields(JobStatus) if f.name not in ('job_id', 'company_name', 'created_at', 'company_key')
+)
+
+
+class JobStore(ABC):
+    """
+    Where JobManager keeps jobs, their logs and their events.
+
+    Every method is atomic on its own. ``shared`` stores are visible to
+    other processes, so JobManager also polls them for changes made
+    elsewhere with ``changes_since``.
+    """
+
+    shared = False
+
+    @abstractmethod
+    def insert(self, job: JobStatus):
+        """Add a new job."""
+
+    @abstractmethod
+    def get_or_insert_active(self, job: JobStatus) -> Tuple[JobStatus, bool]:
+        """
+        Return the queued or running job with ``job``'s company key, counting
+        one more attached request, or insert ``job`` if there is none.
+
+        Returns:
+            Tuple of (job, created)
+        """
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[JobStatus]:
+        """Look up a job."""
+
+    @abstractmethod
+    def list_jobs(self) -> List[JobStatus]:
+        """Every job in the store."""
+
+    @abstractmethod
+    def update(self, job_id: str, changes: Dict[str, Any], log: Optional[str] = None) -> bool:
+        """Change fields of a job and optionally append a log line. False if unknown."""
+
+    @abstractmethod
+    def append_log(self, job_id: str, line: str, changes: Dict[str, Any]) -> bool:
+        """Append a log line and apply ``changes``. False if the job is unknown."""
+
+    @abstractmethod
+    def append_event(self, job_id: str, event: Dict, changes: Dict[str, Any]) -> bool:
+        """Append a structured event and apply ``changes``. False if the job is unknown."""
+
+    @abstractmethod
+    def read_logs(self, job_id: str) -> List[str]:
+        """Every log line of a job."""
+
+    @abstractmethod
+    def read_events(self, job_id: str, since_index: int = 0) -> Tuple[List[Dict], int]:
+        """Events from ``since_index`` on, and the index to continue from."""
+
+    @abstractmethod
+    def delete(self, job_id: str) -> bool:
+        """Remove a job with its logs and events. False if it did not exist."""
+
+    @abstractmethod
+    def delete_created_before(self, cutoff: datetime) -> List[str]:
+        """Remove jobs created before ``cutoff``. Returns their IDs."""
+
+    def current_revision(self) -> int:
+        """Cursor for ``changes_since`` that skips every change made so far."""
+        return 0
+
+    def changes_since(self, cursor: int) -> Tuple[List[str], int]:
+        """IDs of jobs changed after ``cursor``, and the new cursor."""
+        return [], cursor
+
+    def memory_stats(self) -> Dict[str, int]:
+        """Sizes of the logs and events this process holds for the store."""
+        return {}
+
+    def close(self):
+        """Release any resources held by the store."""
+
+
+class _MemoryJob:
+    """A job's current snapshot and history, guarded by the job's own lock."""
+
+    __slots__ = ('lock', 'snapshot', 'logs', 'events')
+
+    def __init__(self, snapshot: JobStatus, logs: JobHistory, events: JobHistory):
+        self.lock = threading.Lock()
+        self.snapshot = snapshot
+        self.logs = logs
+        self.events = events
+
+
+class MemoryJobStore(JobStore):
+    """
+    Process-local store, for development and single-process servers.
+
+    Each job has its own lock, so writers to different jobs never wait on
+    each other. Readers of job status get the current immutable snapshot
+    without taking any lock; writers replace the snapshot rather than
+    changing it. The store lock only guards adding and removing jobs.
+
+    Each job keeps its newest ``max_logs`` log lines and ``max_events``
+    events in memory. Older ones are spilled to per-job files under
+    ``spill_dir``, or dropped when no directory is given.
+    """
+
+    def __init__(self, max_logs: int = 1000, max_events: int = 1000, spill_dir: Optional[str] = None):
+        self.max_logs = max_logs
+        self.max_events = max_events
+        self.spill_dir = spill_dir
+        self._jobs: Dict[str, _MemoryJob] = {}
+        # Company key -> job ID of the queued or running job for that company
+        self._active: Dict[str, str] = {}
+        # Taken before a job lock, never while holding one
+        self._lock = threading.Lock()
+
+    def insert(self, job: JobStatus):
+        with self._lock:
+            self._insert_locked(job)
+
+    def get_or_insert_active(self, job: JobStatus) -> Tuple[JobStatus, bool]:
+        with self._lock:
+            job_id = self._active.get(job.company_key)
+            entry = self._jobs.get(job_id) if job_id else None
+            if entry:
+                with entry.lock:
+                    if entry.snapshot.state in ACTIVE_STATES:
+                        entry.snapshot = replace(
+                            entry.snapshot, attached_requests=entry.snapshot.attached_requests + 1
+                        )
+                        return entry.snapshot, False
+
+            self._insert_locked(job)
+            self._active[job.company_key] = job.job_id
+            return job, True
+
+    def _insert_locked(self, job: JobStatus):
+        self._jobs[job.job_id] = _MemoryJob(
+            job,
+            JobHistory(self.max_logs, self._spill_path(job.job_id, 'logs')),
+            event_history(self.max_events, self._spill_path(job.job_id, 'events')),
+        )
+
+    def _spill_path(self, job_id: str, kind: str) -> Optional[str]:
+        if not self.spill_dir:
+            return None
+        return os.path.join(self.spill_dir, f"{job_id}.{kind}.jsonl")
+
+    def get(self, job_id: str) -> Optional[JobStatus]:
+        # A dict lookup and an attribute read are atomic, and snapshots never change
+        entry = self._jobs.get(job_id)
+        return entry.snapshot if entry else None
+
+    def list_jobs(self) -> List[JobStatus]:
+        with self._lock:
+            entries = list(self._jobs.values())
+        return [entry.snapshot for entry in entries]
+
+    def update(self, job_id: str, changes: Dict[str, Any], log: Optional[str] = None) -> bool:
+        entry = self._jobs.get(job_id)
+        if not entry:
+            return False
+        with entry.lock:
+            snapshot = entry.snapshot = replace(entry.snapshot, **changes)
+            if log is not None:
+                entry.logs.append(log)
+        self._release_if_finished(snapshot)
+        return True
+
+    def append_log(self, job_id: str, line: str, changes: Dict[str, Any]) -> bool:
+        entry = self._jobs.get(job_id)
+        if not entry:
+            return False
+        with entry.lock:
+            entry.logs.append(line)
+            entry.snapshot = replace(entry.snapshot, **changes)
+        return True
+
+    def append_event(self, job_id: str, event: Dict, changes: Dict[str, Any]) -> bool:
+        entry = self._jobs.get(job_id)
+        if not entry:
+            return False
+        record = EventRecord.from_dict(event)
+        with entry.lock:
+            entry.events.append(record)
+            entry.snapshot = replace(entry.snapshot, **changes)
+        return True
+
+    def _release_if_finished(self, snapshot: JobStatus):
+        """Stop routing new requests to a finished job."""
+        if snapshot.state in ACTIVE_STATES:
+            return
+        with self._lock:
+            if self._active.get(snapshot.company_key) == snapshot.job_id:
+                del self._active[snapshot.company_key]
+
+    def read_logs(self, job_id: str) -> List[str]:
+        entry = self._jobs.get(job_id)
+        if not entry:
+            return []
+        with entry.lock:
+            return entry.logs.since(0)
+
+    def read_events(self, job_id: str, since_index: int = 0) -> Tuple[List[Dict], int]:
+        entry = self._jobs.get(job_id)
+        if not entry:
+            return [], since_index
+        with entry.lock:
+            records = entry.events.since(since_index)
+            next_index = len(entry.events)
+        return [record.to_dict() for record in records], next_index
+
+    def delete(self, job_id: str) -> bool:
+        with self._lock:
+            entry = self._pop_locked(job_id)
+        if entry is None:
+            return False
+        self._discard(entry)
+        return True
+
+    def delete_created_before(self, cutoff: datetime) -> List[str]:
+        with self._lock:
+            expired = [
+                job_id for job_id, entry in self._jobs.items() if entry.snapshot.created_at < cutoff
+            ]
+            removed = [self._pop_locked(job_id) for job_id in expired]
+        for entry in removed:
+            self._discard(entry)
+        return expired
+
+    def _pop_locked(self, job_id: str) -> Optional[_MemoryJob]:
+        entry = self._jobs.pop(job_id, None)
+        if entry is None:
+            return None
+        company_key = entry.snapshot.company_key
+        if self._active.get(company_key) == job_id:
+            del self._active[company_key]
+        return entry
+
+    def memory_stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = list(self._jobs.values())
+        stats = dict.fromkeys(
+            ('logs_in_memory', 'logs_spilled', 'log_bytes', 'events_in_memory', 'events_spilled', 'event_bytes'), 0
+        )
+        for entry in entries:
+            with entry.lock:
+                stats['logs_in_memory'] += entry.logs.in_memory
+                stats['logs_spilled'] += entry.logs.spilled
+                stats['log_bytes'] += entry.logs.memory_bytes()
+                stats['events_in_memory'] += entry.events.in_memory
+                stats['events_spilled'] += entry.events.spilled
+                stats['event_bytes'] += entry.events.memory_bytes()
+        return stats
+
+    @staticmethod
+    def _discard(entry: _MemoryJob):
+        # Deleting spill files happens outside the store lock
+        with entry.lock:
+            entry.logs.discard()
+            entry.events.discard()
+
+
+class SqliteJobStore(JobStore):
+    """
+    SQLite store in WAL mode, shared by every process that opens the same file.
+
+    Events and log lines are buffered and written in one transaction per
+    batch, either when ``batch_size`` are pending, after ``flush_interval``
+    seconds, or before anything reads from or changes the store. Each
+    write bumps a store-wide revision that other processes poll to learn
+    which jobs changed.
+
+    Each store instance owns the jobs it inserts and refreshes their
+    heartbeat every ``heartbeat_interval`` seconds while they are queued
+    or running. Active jobs whose heartbeat is older than ``stale_after``
+    were left behind by a process that crashed or was restarted; they are
+    marked failed when the store opens, on every heartbeat, and before a
+    request could coalesce onto them. ``update`` leaves finished jobs
+    alone, so a late result cannot bring a failed job back.
+    """
+
+    shared = True
+
+    STALE_JOB_MESSAGE = "The server running this job stopped before it finished"
+
+    def __init__(self, path: str, batch_size: int = 64, flush_interval: float = 0.05,
+                 heartbeat_interval: float = 15, stale_after: float = 60):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.owner = uuid.uuid4().hex
+        if path != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # (job_id, kind, payload, changes) waiting to be written, in arrival order
+        self._pending: List[Tuple[str, str, Any, Dict[str, Any]]] = []
+        self._known_jobs: Dict[str, bool] = {}
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = False
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                company_name TEXT NOT NULL,
+                company_key TEXT NOT NULL,
+                state TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                current_agent TEXT,
+                current_task TEXT,
+                error_message TEXT,
+                report_path TEXT,
+                attached_requests INTEGER NOT NULL DEFAULT 1,
+                revision INTEGER NOT NULL DEFAULT 0,
+                owner TEXT,
+                heartbeat_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs (created_at);
+            CREATE INDEX IF NOT EXISTS idx_jobs_company_state ON jobs (company_key, state);
+            CREATE INDEX IF NOT EXISTS idx_jobs_revision ON jobs (revision);
+            CREATE TABLE IF NOT EXISTS job_events (
+                job_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                type TEXT NOT NULL,
+                timestamp TEXT,
+                data TEXT NOT NULL,
+                PRIMARY KEY (job_id, seq)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS job_logs (
+                job_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                line TEXT NOT NULL,
+                PRIMARY KEY (job_id, seq)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS job_store_meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO job_store_meta VALUES ('revision', 0);
+            """
+        )
+        # Files created before jobs had owners
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, column_type in (('owner', 'TEXT'), ('heartbeat_at', 'REAL')):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+
+        with self._lock, self._transaction() as conn:
+            self._fail_stale_locked(conn)
+        self._stopped = threading.Event()
+        self._heartbeat = threading.Thread(target=self._heartbeat_loop, name="job-store-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction that takes the database lock up front. Caller holds ``_lock``."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._conn
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _next_revision(self, conn: sqlite3.Connection) -> int:
+        conn.execute("UPDATE job_store_meta SET value = value + 1 WHERE key = 'revision'")
+        return conn.execute("SELECT value FROM job_store_meta WHERE key = 'revision'").fetchone()[0]
+
+    def insert(self, job: JobStatus):
+        with self._lock, self._transaction() as conn:
+            self._insert_row(conn, job)
+
+    def get_or_insert_active(self, job: JobStatus) -> Tuple[JobStatus, bool]:
+        with self._lock:
+            self._flush_locked()
+            with self._transaction() as conn:
+                # Never coalesce onto a job nobody is running any more
+                self._fail_stale_locked(conn, job.company_key)
+                row = conn.execute(
+                    f"SELECT {self._COLUMNS} FROM jobs WHERE company_key = ? AND state IN (?, ?) "
+                    "ORDER BY created_at DESC LIMIT 1",
+                    (job.company_key, *(state.value for state in ACTIVE_STATES))
+                ).fetchone()
+                if row:
+                    existing = self._to_job(row)
+                    existing = replace(existing, attached_requests=existing.attached_requests + 1)
+                    conn.execute(
+                        "UPDATE jobs SET attached_requests = ?, revision = ? WHERE job_id = ?",
+                        (existing.attached_requests, self._next_revision(conn), existing.job_id)
+                    )
+                    return existing, False
+                self._insert_row(conn, job)
+                return job, True
+
+    def _insert_row(self, conn: sqlite3.Connection, job: JobStatus):
+        conn.execute(
+            f"INSERT INTO jobs ({self._COLUMNS}, revision, owner, heartbeat_at) "
+            f"VALUES ({', '.join('?' * 11)}, ?, ?, ?)",
+            (*self._to_row(job), self._next_revision(conn), self.owner, time.time())
+        )
+        self._known_jobs[job.job_id] = True
+
+    def _fail_stale_locked(self, conn: sqlite3.Connection, company_key: Optional[str] = None) -> int:
+        """Mark active jobs without a recent heartbeat failed. Caller holds ``_lock``."""
+        now = time.time()
+        where = "state IN (?, ?) AND (heartbeat_at IS NULL OR heartbeat_at < ?)"
+        params: List[Any] = [*(state.value for state in ACTIVE_STATES), now - self.stale_after]
+        if company_key is not None:
+            where += " AND company_key = ?"
+            params.append(company_key)
+        if not conn.execute(f"SELECT 1 FROM jobs WHERE {where} LIMIT 1", params).fetchone():
+            return 0
+        return conn.execute(
+            f"UPDATE jobs SET state = ?, error_message = ?, updated_at = ?, revision = ? WHERE {where}",
+            (JobState.FAILED.value, self.STALE_JOB_MESSAGE, now, self._next_revision(conn), *params)
+        ).rowcount
+
+    def _heartbeat_loop(self):
+        while not self._stopped.wait(self.heartbeat_interval):
+            with self._lock:
+                if self._closed:
+                    return
+                try:
+                    with self._transaction() as conn:
+                        conn.execute(
+                            "UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND state IN (?, ?)",
+                            (time.time(), self.owner, *(state.value for state in ACTIVE_STATES))
+                        )
+                        self._fail_stale_locked(conn)
+                except sqlite3.Error:
+                    pass  # Busy; the next beat is well within stale_after
+
+    def get(self, job_id: str) -> Optional[JobStatus]:
+        with self._lock:
+            self._flush_locked()
+            row = self._conn.execute(
+                f"SELECT {self._COLUMNS} FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return self._to_job(row) if row else None
+
+    def list_jobs(self) -> List[JobStatus]:
+        with self._lock:
+            self._flush_locked()
+            rows = self._conn.execute(f"SELECT {self._COLUMNS} FROM jobs").fetchall()
+        return [self._to_job(row) for row in rows]
+
+    def update(self, job_id: str, changes: Dict[str, Any], log: Optional[str] = None) -> bool:
+        with self._lock:
+            # Buffered events were emitted first, so they are written first
+            self._flush_locked()
+            with self._transaction() as conn:
+                # A finished job stays finished, e.g. a late result from a
+                # process whose job was failed for missing heartbeats
+                if not self._update_row(conn, job_id, changes, active_only=True):
+                    return False
+                if log is not None:
+                    self._insert_items(conn, 'log', job_id, [log])
+            return True
+
+    def append_log(self, job_id: str, line: str, changes: Dict[str, Any]) -> bool:
+        return self._append(job_id, 'log', line, changes)
+
+    def append_event(self, job_id: str, event: Dict, changes: Dict[str, Any]) -> bool:
+        return self._append(job_id, 'event', event, changes)
+
+    def _append(self, job_id: str, kind: str, payload: Any, changes: Dict[str, Any]) -> bool:
+        with self._lock:
+            if not self._job_exists_locked(job_id):
+                return False
+            self._pending.append((job_id, kind, payload, changes))
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+            else:
+                self._start_flusher_locked()
+            return True
+
+    def _job_exists_locked(self, job_id: str) -> bool:
+        if job_id not in self._known_jobs:
+            row = self._conn.execute("SELECT 1 FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if not row:
+                return False
+            self._known_jobs[job_id] = True
+        return True
+
+    def memory_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'pending_writes': len(self._pending)}
+
+    def flush(self):
+        """Write buffered events and log lines now."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+
+        # Group by job, keeping each job's items in arrival order
+        batches: Dict[str, Dict[str, Any]] = {}
+        for job_id, kind, payload, changes in pending:
+            batch = batches.setdefault(job_id, {'log': [], 'event': [], 'changes': {}})
+            batch[kind].append(payload)
+            batch['changes'].update(changes)
+
+        with self._transaction() as conn:
+            for job_id, batch in batches.items():
+                if not self._update_row(conn, job_id, batch['changes']):
+                    continue  # Removed while its items were buffered
+                self._insert_items(conn, 'log', job_id, batch['log'])
+                self._insert_items(conn, 'event', job_id, batch['event'])
+
+    def _start_flusher_locked(self):
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(target=self._flush_loop, name="job-store-flusher", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            with self._lock:
+                if self._closed or not self._pending:
+                    self._flusher = None
+                    return
+                self._flush_locked()
+
+    def _insert_items(self, conn: sqlite3.Connection, kind: str, job_id: str, items: List[Any]):
+        if not items:
+            return
+        table = 'job_events' if kind == 'event' else 'job_logs'
+        start = conn.execute(
+            f"SELECT COALESCE(MAX(seq) + 1, 0) FROM {table} WHERE job_id = ?", (job_id,)
+        ).fetchone()[0]
+        if kind == 'event':
+            conn.executemany(
+                "INSERT INTO job_events VALUES (?, ?, ?, ?, ?)",
+                [
+                    (job_id, start + i, record.type, record.timestamp, json.dumps(record.data, default=str))
+                    for i, record in enumerate(EventRecord.from_dict(event) for event in items)
+                ]
+            )
+        else:
+            conn.executemany(
+                "INSERT INTO job_logs VALUES (?, ?, ?)",
+                [(job_id, start + i, line) for i, line in enumerate(items)]
+            )
+
+    def _update_row(self, conn: sqlite3.Connection, job_id: str, changes: Dict[str, Any],
+                    active_only: bool = False) -> bool:
+        """Apply ``changes`` to a job, with ``active_only`` only while it is queued or running."""
+        unknown = set(changes) - UPDATABLE_FIELDS
+        if unknown:
+            raise ValueError(f"Cannot update job fields: {', '.join(sorted(unknown))}")
+
+        assignments = [f"{name} = ?" for name in changes] + ["revision = ?"]
+        values = [self._to_column(value) for value in changes.values()]
+        where = "job_id = ?"
+        params: List[Any] = [job_id]
+        if active_only:
+            where += " AND state IN (?, ?)"
+            params += [state.value for state in ACTIVE_STATES]
+        cursor = conn.execute(
+            f"UPDATE jobs SET {', '.join(assignments)} WHERE {where}",
+            (*values, self._next_revision(conn), *params)
+        )
+        return cursor.rowcount > 0
+
+    def read_logs(self, job_id: str) -> List[str]:
+        with self._lock:
+            self._flush_locked()
+            rows = self._conn.execute(
+                "SELECT line FROM job_logs WHERE job_id = ? ORDER BY seq", (job_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def read_events(self, job_id: str, since_index: int = 0) -> Tuple[List[Dict], int]:
+        with self._lock:
+            self._flush_locked()
+            rows = self._conn.execute(
+                "SELECT seq, type, timestamp, data FROM job_events WHERE job_id = ? AND seq >= ? ORDER BY seq",
+                (job_id, max(since_index, 0))
+            ).fetchall()
+        events = [{'type': row[1], 'timestamp': row[2], 'data': json.loads(row[3])} for row in rows]
+        return events, rows[-1][0] + 1 if rows else since_index
+
+    def delete(self, job_id: str) -> bool:
+        with self._lock:
+            self._flush_locked()
+            with self._transaction() as conn:
+                return bool(self._delete_rows(conn, [job_id]))
+
+    def delete_created_before(self, cutoff: datetime) -> List[str]:
+        with self._lock:
+            self._flush_locked()
+            with self._transaction() as conn:
+                job_ids = [
+                    row[0] for row in conn.execute(
+                        "SELECT job_id FROM jobs WHERE created_at < ?", (cutoff.timestamp(),)
+                    )
+                ]
+                self._delete_rows(conn, job_ids)
+        return job_ids
+
+    def _delete_rows(self, conn: sqlite3.Connection, job_ids: List[str]) -> int:
+        removed = 0
+        for job_id in job_ids:
+            removed += conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,)).rowcount
+            conn.execute("DELETE FROM job_events WHERE job_id = ?", (job_id,))
+            conn.execute("DELETE FROM job_logs WHERE job_id = ?", (job_id,))
+            self._known_jobs.pop(job_id, None)
+        return removed
+
+    def changes_since(self, cursor: int) -> Tuple[List[str], int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id, revision FROM jobs WHERE revision > ? ORDER BY revision", (cursor,)
+            ).fetchall()
+        if not rows:
+            return [], cursor
+        return [row[0] for row in rows], rows[-1][1]
+
+    def current_revision(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT value FROM job_store_meta WHERE key = 'revision'"
+            ).fetchone()[0]
+
+    def close(self):
+        self._stopped.set()
+        with self._lock:
+            self._flush_locked()
+            self._closed = True
+            self._conn.close()
+
+    _COLUMNS = (
+        "job_id, company_name, company_key, state, created_at, updated_at, "
+        "current_agent, current_task, error_message, report_path, attached_requests"
+    )
+
+    @staticmethod
+    def _to_row(job: JobStatus) -> Tuple:
+        return (
+            job.job_id, job.company_name, job.company_key, job.state.value,
+            job.created_at.timestamp(), job.updated_at.timestamp(),
+            job.current_agent, job.current_task, job.error_message, job.report_path,
+            job.attached_requests,
+        )
+
+    @staticmethod
+    def _to_job(row: Tuple) -> JobStatus:
+        return JobStatus(
+            job_id=row[0],
+            company_name=row[1],
+            company_key=row[2],
+            state=JobState(row[3]),
+            created_at=datetime.fromtimestamp(row[4]),
+            updated_at=datetime.fromtimestamp(row[5]),
+            current_agent=row[6],
+            current_task=row[7],
+            error_message=row[8],
+            report_path=row[9],
+            attached_requests=row[10],
+        )
+
+    @staticmethod
+    def _to_column(value: Any) -> Any:
+        if isinstance(value, JobState):
+            return value.value
+        if isinstance(value, datetime):
+            return value.timestamp()
+        return value
@@ -0,0 +1,314 @@
+"""Opt-in completion cache for the crew's LLM calls."""
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Optional, Union
+
+from crewai.events import crewai_event_bus
+from crewai.events.types.llm_events import LLMCallType, LLMStreamChunkEvent
+from crewai.llm import LLM
+from crewai.llms.base_llm import BaseLLM
+
+
+# Inner LLM attributes that change the completion and so belong in the key
+KEY_PARAMS = (
+    'temperature', 'top_p', 'max_tokens', 'max_completion_tokens',
+    'reasoning_effort', 'seed', 'response_format', 'stop'
+)
+
+
+def make_cache_key(model: str, messages: Any, params: Dict[str, Any]) -> str:
+    """Stable hash of everything that determines a completion."""
+    payload = json.dumps(
+        {'model': model, 'messages': messages, 'params': params},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMCacheBackend(ABC):
+    """Storage for cached completions."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached completion for a key, or None."""
+
+    @abstractmethod
+    def set(self, key: str, value: str):
+        """Store a completion, evicting old entries if the backend is full."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of cached completions."""
+
+
+class MemoryLLMCacheBackend(LLMCacheBackend):
+    """In-process LRU cache."""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class SqliteLLMCacheBackend(LLMCacheBackend):
+    """SQLite cache shared across processes and restarts, evicting least recently used."""
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        self.path = path
+        self.max_entries = max_entries
+        if path != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                last_used_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row:
+                self._conn.execute(
+                    "UPDATE llm_cache SET last_used_at = ? WHERE key = ?", (time.time(), key)
+                )
+                self._conn.commit()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?)", (key, value, time.time())
+            )
+            self._conn.execute(
+                """
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+class CachingLLM(BaseLLM):
+    """
+    Wraps an LLM and serves repeated identical calls from a cache.
+
+    Only plain text completions are cached. Calls that let the model run
+    functions are always passed through, since replaying them would skip
+    the side effects. Everything else (stop words, token usage, context
+    window) is delegated to the wrapped LLM.
+    """
+
+    def __init__(self, llm: BaseLLM, cache: LLMCacheBackend):
+        # Set before BaseLLM.__init__, which assigns ``stop`` through the property
+        self._inner = llm
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+        super().__init__(
+            model=llm.model,
+            temperature=getattr(llm, 'temperature', None),
+            provider=getattr(llm, 'provider', None),
+            stop=getattr(llm, 'stop', None)
+        )
+
+    @property
+    def inner(self) -> BaseLLM:
+        return self._inner
+
+    @property
+    def stop(self) -> List[str]:
+        return self._inner.stop
+
+    @stop.setter
+    def stop(self, value: List[str]):
+        self._inner.stop = value
+
+    def call(
+        self,
+        messages: Union[str, List[Dict[str, Any]]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+        from_task: Optional[Any] = None,
+        from_agent: Optional[Any] = None,
+        response_model: Optional[Any] = None,
+    ) -> Any:
+        if available_functions:
+            return self._call_inner(
+                messages, tools, callbacks, available_functions, from_task, from_agent, response_model
+            )
+
+        key = self.cache_key(messages, tools, response_model)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            # Listeners (progress, metrics) still see the call, just a fast one
+            self._emit_call_started_event(messages=messages, from_task=from_task, from_agent=from_agent)
+            if getattr(self._inner, 'stream', False):
+                # Streaming listeners get the whole response as one chunk
+                crewai_event_bus.emit(self, event=LLMStreamChunkEvent(
+                    chunk=cached,
+                    from_task=from_task,
+                    from_agent=from_agent,
+                    call_type=LLMCallType.LLM_CALL
+                ))
+            self._emit_call_completed_event(
+                response=cached,
+                call_type=LLMCallType.LLM_CALL,
+                from_task=from_task,
+                from_agent=from_agent,
+                messages=messages
+            )
+            return cached
+
+        self.misses += 1
+        response = self._call_inner(
+            messages, tools, callbacks, available_functions, from_task, from_agent, response_model
+        )
+        if isinstance(response, str):
+            self.cache.set(key, response)
+        return response
+
+    def cache_key(self, messages: Any, tools: Optional[List[Dict[str, Any]]] = None, response_model: Optional[Any] = None) -> str:
+        """Key for a call to the wrapped model with these messages."""
+        params = {name: getattr(self._inner, name, None) for name in KEY_PARAMS}
+        params['additional_params'] = getattr(self._inner, 'additional_params', None)
+        params['tools'] = tools
+        params['response_model'] = getattr(response_model, '__name__', response_model)
+        return make_cache_key(self._inner.model, messages, params)
+
+    def _call_inner(self, messages, tools, callbacks, available_functions, from_task, from_agent, response_model):
+        return self._inner.call(
+            messages,
+            tools=tools,
+            callbacks=callbacks,
+            available_functions=available_functions,
+            from_task=from_task,
+            from_agent=from_agent,
+            response_model=response_model,
+        )
+
+    def supports_function_calling(self) -> bool:
+        return self._inner.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self._inner.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self._inner.get_context_window_size()
+
+    def get_token_usage_summary(self):
+        return self._inner.get_token_usage_summary()
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes CachingLLM does not define itself
+        if name == '_inner':
+            raise AttributeError(name)
+        return getattr(self._inner, name)
+
+
+def _enabled_agents() -> List[str]:
+    """Agents named in LLM_CACHE_AGENTS, e.g. "researcher,analyst"."""
+    value = os.environ.get('LLM_CACHE_AGENTS', '')
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+@lru_cache(maxsize=None)
+def get_llm_cache() -> LLMCacheBackend:
+    """Process-wide cache backend selected by LLM_CACHE_BACKEND."""
+    backend = os.environ.get('LLM_CACHE_BACKEND', 'memory')
+    max_entries = int(os.environ.get('LLM_CACHE_MAX_ENTRIES', '1000'))
+
+    if backend == 'sqlite':
+        path = os.environ.get('LLM_CACHE_PATH', 'output/cache/llm_cache.sqlite3')
+        return SqliteLLMCacheBackend(path, max_entries=max_entries)
+    if backend == 'memory':
+        return MemoryLLMCacheBackend(max_entries=max_entries)
+    raise ValueError(f"Unknown LLM_CACHE_BACKEND: {backend}")
+
+
+@lru_cache(maxsize=None)
+def _template_llm(model: str, stream: bool) -> BaseLLM:
+    return LLM(model=model, stream=stream)
+
+
+def new_llm(model: str, stream: bool = False) -> BaseLLM:
+    """
+    A fresh LLM for ``model``, cloned from one built on first use.
+
+    Building an LLM creates its HTTP clients, which is most of the cost
+    of setting up a crew. Clones share the template's clients, which
+    are thread safe, but have their own stop words and token counts.
+    """
+    template = _template_llm(model, stream)
+    llm = copy.copy(template)
+    llm.stop = list(template.stop)
+    llm._token_usage = dict.fromkeys(template._token_usage, 0)
+    return llm
+
+
+def llm_for_agent(agent_name: str, llm: Union[str, BaseLLM], stream: bool = False) -> BaseLLM:
+    """
+    Return the LLM an agent should use.
+
+    A model name gets a clone from ``new_llm``. When caching is enabled
+    for the agent the model is wrapped in a CachingLLM. With ``stream``
+    the model streams its responses, so listeners receive
+    ``LLMStreamChunkEvent``s while it writes.
+    """
+    if isinstance(llm, str):
+        llm = new_llm(llm, stream=stream)
+    elif stream:
+        llm.stream = True
+
+    if agent_name not in _enabled_agents() and '*' not in _enabled_agents():
+        return llm
+    return CachingLLM(llm, get_llm_cache())
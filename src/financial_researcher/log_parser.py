@@ -1,7 +1,7 @@
 """Log parser for extracting structured events from CrewAI output."""
 import re
 from datetime import datetime
-from typing import Dict, Optional, List
+from typing import Dict, Iterable, Iterator, List, Optional, Set
 from enum import Enum
 
 
@@ -16,6 +16,21 @@ class EventType(Enum):
     ACTION = "action"
     OBSERVATION = "observation"
     LOG = "log"
+    QUEUE_POSITION = "queue_position"
+    LLM_CALL = "llm_call"
+    REPORT_CHUNK = "report_chunk"
+
+
+def determine_agent_role(agent_name: str) -> str:
+    """Determine the role identifier from agent name."""
+    agent_lower = agent_name.lower()
+    
+    if 'research' in agent_lower:
+        return 'researcher'
+    elif 'analyst' in agent_lower or 'analysis' in agent_lower:
+        return 'analyst'
+    else:
+        return 'unknown'
 
 
 class LogParser:
@@ -34,6 +49,8 @@ class LogParser:
         r'Beginning:\s*(.+?)(?:\n|$)',
     ]
     
+    TASK_COMPLETE_PATTERN = r'task output|completed|finished'
+    
     TOOL_PATTERNS = [
         r'Using tool:\s*(.+?)(?:\n|$)',
         r'Tool:\s*(.+?)(?:\n|$)',
@@ -52,11 +69,46 @@ class LogParser:
         r'Result:\s*(.+?)(?:\n|$)',
     ]
     
+    # Literal every pattern of a category contains. A line without any of a
+    # category's keywords cannot match that category, so its patterns are skipped.
+    CATEGORY_KEYWORDS = {
+        'agent': ('agent:',),
+        'task': ('task:', 'beginning:'),
+        'task_complete': ('task output', 'completed', 'finished'),
+        'tool': ('tool:', 'action:'),
+        'thinking': ('thought:', 'reasoning:', 'i need to', 'i will'),
+        'observation': ('observation:', 'result:'),
+    }
+    
+    # Compiled once for all parsers
+    _AGENT_RES = [re.compile(p, re.IGNORECASE) for p in AGENT_PATTERNS]
+    _TASK_RES = [re.compile(p, re.IGNORECASE) for p in TASK_PATTERNS]
+    _TASK_COMPLETE_RE = re.compile(TASK_COMPLETE_PATTERN, re.IGNORECASE)
+    _TOOL_RES = [re.compile(p, re.IGNORECASE) for p in TOOL_PATTERNS]
+    _THINKING_RES = [re.compile(p, re.IGNORECASE) for p in THINKING_PATTERNS]
+    _OBSERVATION_RES = [re.compile(p, re.IGNORECASE) for p in OBSERVATION_PATTERNS]
+    
+    # One pass over the line finds every category keyword. The lookahead makes
+    # matches zero-width so overlapping keywords are all reported.
+    _KEYWORD_SCANNER = re.compile(
+        '(?=' + '|'.join(
+            f"(?P<{category}>{'|'.join(re.escape(k) for k in keywords)})"
+            for category, keywords in CATEGORY_KEYWORDS.items()
+        ) + ')',
+        re.IGNORECASE
+    )
+    
     def __init__(self):
         self.current_agent = None
         self.current_task = None
         self.last_event_type = None
     
+    def parse_lines(self, lines: Iterable[str]) -> Iterator[Dict]:
+        """Parse many lines, yielding their events in order."""
+        parse_line = self.parse_line
+        for line in lines:
+            yield from parse_line(line)
+    
     def parse_line(self, line: str) -> List[Dict]:
         """
         Parse a single log line and return structured events.
@@ -68,31 +120,38 @@ class LogParser:
         
         events = []
         line = line.strip()
+        categories = self._categories(line)
         
-        # Check for agent
-        agent_event = self._parse_agent(line)
-        if agent_event:
-            events.append(agent_event)
-        
-        # Check for task
-        task_event = self._parse_task(line)
-        if task_event:
-            events.append(task_event)
-        
-        # Check for tool usage
-        tool_event = self._parse_tool(line)
-        if tool_event:
-            events.append(tool_event)
-        
-        # Check for thinking
-        thinking_event = self._parse_thinking(line)
-        if thinking_event:
-            events.append(thinking_event)
-        
-        # Check for observation
-        observation_event = self._parse_observation(line)
-        if observation_event:
-            events.append(observation_event)
+        if categories:
+            # Check for agent
+            if 'agent' in categories:
+                agent_event = self._parse_agent(line)
+                if agent_event:
+                    events.append(agent_event)
+            
+            # Check for task
+            if 'task' in categories or 'task_complete' in categories:
+                task_event = self._parse_task(line)
+                if task_event:
+                    events.append(task_event)
+            
+            # Check for tool usage
+            if 'tool' in categories:
+                tool_event = self._parse_tool(line)
+                if tool_event:
+                    events.append(tool_event)
+            
+            # Check for thinking
+            if 'thinking' in categories:
+                thinking_event = self._parse_thinking(line)
+                if thinking_event:
+                    events.append(thinking_event)
+            
+            # Check for observation
+            if 'observation' in categories:
+                observation_event = self._parse_observation(line)
+                if observation_event:
+                    events.append(observation_event)
         
         # If no specific event, treat as regular log
         if not events:
@@ -100,10 +159,23 @@ class LogParser:
         
         return events
     
+    def _categories(self, line: str) -> Set[str]:
+        """Find which event categories a line could match."""
+        if line.isascii():
+            # For ASCII text lower() is exactly what IGNORECASE matches, and
+            # substring checks are much cheaper than a case-insensitive regex
+            lowered = line.lower()
+            return {
+                category
+                for category, keywords in self.CATEGORY_KEYWORDS.items()
+                if any(keyword in lowered for keyword in keywords)
+            }
+        return {match.lastgroup for match in self._KEYWORD_SCANNER.finditer(line)}
+    
     def _parse_agent(self, line: str) -> Optional[Dict]:
         """Extract agent information from line."""
-        for pattern in self.AGENT_PATTERNS:
-            match = re.search(pattern, line, re.IGNORECASE)
+        for pattern in self._AGENT_RES:
+            match = pattern.search(line)
             if match:
                 agent_name = match.group(1).strip()
                 
@@ -127,8 +199,8 @@ class LogParser:
     
     def _parse_task(self, line: str) -> Optional[Dict]:
         """Extract task information from line."""
-        for pattern in self.TASK_PATTERNS:
-            match = re.search(pattern, line, re.IGNORECASE)
+        for pattern in self._TASK_RES:
+            match = pattern.search(line)
             if match:
                 task_name = match.group(1).strip()
                 self.current_task = task_name
@@ -144,7 +216,7 @@ class LogParser:
                 }
         
         # Check for task completion indicators
-        if re.search(r'task output|completed|finished', line, re.IGNORECASE):
+        if self._TASK_COMPLETE_RE.search(line):
             return {
                 'type': EventType.TASK_COMPLETE.value,
                 'timestamp': self._get_timestamp(),
@@ -159,8 +231,8 @@ class LogParser:
     
     def _parse_tool(self, line: str) -> Optional[Dict]:
         """Extract tool usage information from line."""
-        for pattern in self.TOOL_PATTERNS:
-            match = re.search(pattern, line, re.IGNORECASE)
+        for pattern in self._TOOL_RES:
+            match = pattern.search(line)
             if match:
                 tool_info = match.group(1).strip()
                 
@@ -190,8 +262,8 @@ class LogParser:
     
     def _parse_thinking(self, line: str) -> Optional[Dict]:
         """Extract thinking/reasoning information from line."""
-        for pattern in self.THINKING_PATTERNS:
-            match = re.search(pattern, line, re.IGNORECASE)
+        for pattern in self._THINKING_RES:
+            match = pattern.search(line)
             if match:
                 thought = match.group(1).strip()
                 
@@ -208,8 +280,8 @@ class LogParser:
     
     def _parse_observation(self, line: str) -> Optional[Dict]:
         """Extract observation/result information from line."""
-        for pattern in self.OBSERVATION_PATTERNS:
-            match = re.search(pattern, line, re.IGNORECASE)
+        for pattern in self._OBSERVATION_RES:
+            match = pattern.search(line)
             if match:
                 observation = match.group(1).strip()
                 
@@ -238,14 +310,7 @@ class LogParser:
     
     def _determine_agent_role(self, agent_name: str) -> str:
         """Determine the role identifier from agent name."""
-        agent_lower = agent_name.lower()
-        
-        if 'research' in agent_lower:
-            return 'researcher'
-        elif 'analyst' in agent_lower or 'analysis' in agent_lower:
-            return 'analyst'
-        else:
-            return 'unknown'
+        return determine_agent_role(agent_name)
     
     def _get_timestamp(self) -> str:
         """Get formatted timestamp."""
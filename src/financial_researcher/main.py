@@ -27,5 +27,14 @@ def run():
         raise Exception(f"An error occurred while running the crew: {e}")
 
 
+def run_batch():
+    """
+    Run the crew for a list of companies, several at a time.
+    """
+    from financial_researcher.batch import run_batch_cli
+
+    sys.exit(run_batch_cli(sys.argv[1:]))
+
+
 if __name__ == "__main__":
     run()
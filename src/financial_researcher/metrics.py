@@ -0,0 +1,302 @@
+"""Prometheus counters and histograms for research jobs, served at /metrics."""
+import bisect
+import re
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from financial_researcher.job_manager import JobManager, JobState, JobStatus
+from financial_researcher.log_parser import EventType, determine_agent_role
+
+
+PREFIX = 'financial_researcher'
+
+# Seconds, from a fast tool call to a long crew run
+DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Task names from the crew config; anything else (e.g. scraped from
+# stdout) is reported as "other" to keep the number of series bounded
+_TASK_LABEL = re.compile(r'^[a-z][a-z0-9_]{0,63}$')
+
+# A family from a collector: (name, type, help, {label values: value}, label names)
+Family = Tuple[str, str, str, Dict[Tuple[str, ...], float], Tuple[str, ...]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    """A monotonically increasing count per combination of label values."""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_format_labels(self.labels, key)} {_format_value(v)}" for key, v in values]
+        return lines
+
+
+class Histogram:
+    """Observations counted into fixed buckets per combination of label values."""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [count per bucket (the last is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, (list(counts), total)) for key, (counts, total) in self._series.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms updated as things happen, plus collectors
+    that report gauges from other components' stats when scraped.
+    """
+
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(f"{PREFIX}_{name}", help, labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(f"{PREFIX}_{name}", help, labels, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[Family]]):
+        """Call ``collector`` on every scrape for (name, type, help, values, label names) families."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def _register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors)
+
+        lines: List[str] = []
+        for metric in metrics:
+            lines += metric.render()
+        for collector in collectors:
+            for name, kind, help, values, label_names in collector():
+                name = f"{PREFIX}_{name}"
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+                lines += [
+                    f"{name}{_format_labels(label_names, key)} {_format_value(value)}"
+                    for key, value in sorted(values.items())
+                ]
+        return '\n'.join(lines) + '\n'
+
+
+# The registry /metrics serves; modules register their metrics on it at import
+registry = MetricsRegistry()
+
+
+def gauge(name: str, help: str, value: float) -> Family:
+    return name, 'gauge', help, {(): value}, ()
+
+
+def stats_families(component: str, stats: Dict, counters: Iterable[str] = ()) -> List[Family]:
+    """
+    Families for a component's ``stats()`` dict: numbers become gauges,
+    or counters if named in ``counters``; nested dicts get a ``key`` label.
+    """
+    families = []
+    for key, value in stats.items():
+        name = f"{component}_{key}"
+        kind = 'counter' if key in counters else 'gauge'
+        help = f"{key.replace('_', ' ').capitalize()} ({component})"
+        if kind == 'counter':
+            name += '_total'
+        if isinstance(value, dict):
+            values = {(str(k),): v for k, v in value.items() if isinstance(v, (int, float))}
+            families.append((name, kind, help, values, ('key',)))
+        elif isinstance(value, (int, float)):
+            families.append((name, kind, help, {(): value}, ()))
+    return families
+
+
+def agent_label(agent: Optional[str]) -> str:
+    return determine_agent_role(agent) if agent else 'unknown'
+
+
+def task_label(task: Optional[str]) -> str:
+    return task if task and _TASK_LABEL.match(task) else 'other'
+
+
+class JobMetrics:
+    """
+    Turns JobManager state changes and job events into metrics.
+
+    Per-stage timings come from the events the crew already records
+    (task_complete, observation, llm_call), so they work the same with
+    worker processes, whose events are relayed to this JobManager. Every
+    other event costs one dict lookup.
+    """
+
+    def __init__(self, job_manager: JobManager, registry: MetricsRegistry):
+        self.job_manager = job_manager
+
+        self.transitions = registry.counter(
+            'job_state_transitions_total', "Jobs entering a state, by previous state", ('from_state', 'to_state')
+        )
+        self.queue_wait = registry.histogram(
+            'queue_wait_seconds', "Time jobs spent queued before a worker started them"
+        )
+        self.job_duration = registry.histogram(
+            'job_duration_seconds', "Time from a worker starting a job to it finishing", ('state',)
+        )
+        self.task_duration = registry.histogram(
+            'task_duration_seconds', "Crew task durations by task and agent", ('task', 'agent')
+        )
+        self.tool_duration = registry.histogram(
+            'tool_call_duration_seconds', "Tool call latency", ('tool',)
+        )
+        self.tool_calls = registry.counter(
+            'tool_calls_total', "Tool calls, by whether crewAI served them from its cache", ('tool', 'from_cache')
+        )
+        self.llm_duration = registry.histogram(
+            'llm_call_duration_seconds', "LLM call latency", ('agent', 'model')
+        )
+        self.llm_tokens = registry.counter(
+            'llm_tokens_total', "LLM tokens used", ('agent', 'kind')
+        )
+
+        # job_id -> (state, when it entered it) for jobs not finished yet
+        self._states: Dict[str, Tuple[JobState, datetime]] = {}
+        self._lock = threading.Lock()
+        self._event_handlers = {
+            EventType.TASK_COMPLETE.value: self._on_task_complete,
+            EventType.OBSERVATION.value: self._on_observation,
+            EventType.LLM_CALL.value: self._on_llm_call,
+        }
+
+        job_manager.add_state_listener(self._on_state)
+        job_manager.add_event_listener(self._on_event)
+
+    def _on_state(self, job: JobStatus):
+        with self._lock:
+            previous = self._states.get(job.job_id)
+            if previous is not None and previous[0] == job.state:
+                return
+            if job.state in (JobState.COMPLETED, JobState.FAILED):
+                self._states.pop(job.job_id, None)
+            else:
+                self._states[job.job_id] = (job.state, job.updated_at)
+
+        self.transitions.inc(previous[0].value if previous else 'new', job.state.value)
+        if previous is None:
+            return
+        elapsed = (job.updated_at - previous[1]).total_seconds()
+        if previous[0] == JobState.QUEUED and job.state == JobState.RUNNING:
+            self.queue_wait.observe(elapsed)
+        elif previous[0] == JobState.RUNNING:
+            self.job_duration.observe(elapsed, job.state.value)
+
+    def _on_event(self, job_id: str, event: Dict):
+        handler = self._event_handlers.get(event.get('type'))
+        if handler is not None:
+            handler(event.get('data') or {})
+
+    def _on_task_complete(self, data: Dict):
+        if data.get('duration_ms') is not None:
+            self.task_duration.observe(
+                data['duration_ms'] / 1000, task_label(data.get('task')), agent_label(data.get('agent'))
+            )
+
+    def _on_observation(self, data: Dict):
+        tool = str(data.get('tool') or 'unknown')
+        self.tool_calls.inc(tool, 'true' if data.get('from_cache') else 'false')
+        if data.get('duration_ms') is not None:
+            self.tool_duration.observe(data['duration_ms'] / 1000, tool)
+
+    def _on_llm_call(self, data: Dict):
+        agent = agent_label(data.get('agent'))
+        if data.get('duration_ms') is not None:
+            self.llm_duration.observe(data['duration_ms'] / 1000, agent, str(data.get('model') or 'unknown'))
+        for kind in ('prompt', 'completion'):
+            tokens = data.get(f'{kind}_tokens')
+            if tokens:
+                self.llm_tokens.inc(agent, kind, amount=tokens)
+
+    def collect(self) -> List[Family]:
+        """Jobs by state and the job store's memory, read at scrape time."""
+        jobs = self.job_manager.list_jobs()
+        by_state = {(state.value,): 0 for state in JobState}
+        for job in jobs:
+            by_state[(job.state.value,)] += 1
+
+        # Forget jobs removed without finishing, e.g. rejected by a full queue.
+        # Look them up outside the lock so job events are not held up by the store.
+        with self._lock:
+            tracked = list(self._states)
+        removed = [job_id for job_id in tracked if self.job_manager.get_job(job_id) is None]
+        with self._lock:
+            for job_id in removed:
+                self._states.pop(job_id, None)
+
+        families: List[Family] = [
+            ('jobs', 'gauge', "Jobs currently held, by state", by_state, ('state',)),
+            gauge('sse_subscribers', "Open /stream connections", self.job_manager.event_bus.subscriber_count()),
+        ]
+        families += stats_families('job_store', self.job_manager.store.memory_stats())
+        return families
@@ -0,0 +1,215 @@
+"""Runs crews in worker processes and relays their progress to JobManager."""
+import multiprocessing
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from financial_researcher import crew_worker
+from financial_researcher.job_manager import JobManager, JobState
+
+
+# JobManager methods a crew may call; anything else from a worker is ignored
+RELAYED_METHODS = frozenset({'add_log', 'add_event', 'update_job', 'set_result'})
+
+# Seconds between checks for cancellation, timeouts and dead workers
+POLL_INTERVAL_SECONDS = 0.5
+
+# Serializes swapping __main__ while a worker is started
+_spawn_lock = threading.Lock()
+
+
+@contextmanager
+def _worker_entry_main():
+    """
+    Make crew_worker the main module that spawned workers re-run.
+
+    A spawned child first re-runs the parent's ``__main__`` as
+    ``__mp_main__``. For the ``web`` scripts and ``python web_app.py``
+    that imports the web app, and with it research_service and its job
+    store. multiprocessing reads ``sys.modules['__main__']`` when a process
+    is started, so it is pointed at the worker's entry module meanwhile.
+    """
+    with _spawn_lock:
+        main = sys.modules['__main__']
+        sys.modules['__main__'] = crew_worker
+        try:
+            yield
+        finally:
+            sys.modules['__main__'] = main
+
+
+class _Worker:
+    """A worker process and the parent's end of its pipe."""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=crew_worker.main, args=(child_conn,), daemon=True)
+        with _worker_entry_main():
+            self.process.start()
+        child_conn.close()
+        self.jobs_run = 0
+
+    def stop(self, timeout: float = 5.0):
+        """Ask the worker to exit, and kill it if it does not."""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class ProcessCrewExecutor:
+    """
+    Runs ``run_crew_with_logging`` in worker processes.
+
+    ``run`` blocks the calling scheduler thread while a worker runs the
+    crew, applying the logs, events and state changes the worker sends
+    back to the real JobManager. A worker is reused for up to
+    ``max_jobs_per_worker`` jobs and then replaced, so leaks do not
+    accumulate; one that crashes only fails its own job. Jobs are killed
+    with their worker when cancelled or after ``job_timeout`` seconds.
+
+    Workers are started with "spawn" from the crew_worker module, so they
+    neither inherit the web server's threads and locks nor import the web
+    app and its job store, scheduler and retention sweeps.
+    """
+
+    def __init__(self, max_jobs_per_worker: int = 10, job_timeout: Optional[float] = None):
+        if max_jobs_per_worker < 1:
+            raise ValueError("max_jobs_per_worker must be at least 1")
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.job_timeout = job_timeout
+
+        self._context = multiprocessing.get_context('spawn')
+        self._idle: List[_Worker] = []
+        self._busy: Dict[str, _Worker] = {}
+        self._cancelled: set = set()
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.workers_started = 0
+        self.workers_recycled = 0
+        self.jobs_timed_out = 0
+        self.jobs_cancelled = 0
+        self.worker_crashes = 0
+
+    def run(self, company_name: str, job_manager: JobManager, job_id: str, refresh: bool = False) -> Optional[str]:
+        """Run one job in a worker process. Returns the report path, or None if it failed."""
+        worker = self._acquire(job_id)
+        worker.jobs_run += 1
+        deadline = None if self.job_timeout is None else time.monotonic() + self.job_timeout
+        healthy = False
+        report_path = None
+
+        try:
+            worker.conn.send(('run', job_id, company_name, refresh))
+            while True:
+                if job_id in self._cancelled:
+                    job_manager.update_job(job_id, JobState.FAILED, "Cancelled")
+                    with self._lock:
+                        self.jobs_cancelled += 1
+                    break
+                if deadline is not None and time.monotonic() > deadline:
+                    job_manager.update_job(
+                        job_id, JobState.FAILED, f"Research timed out after {self.job_timeout:.0f}s"
+                    )
+                    with self._lock:
+                        self.jobs_timed_out += 1
+                    break
+
+                try:
+                    if not worker.conn.poll(POLL_INTERVAL_SECONDS):
+                        if not worker.process.is_alive():
+                            raise EOFError
+                        continue
+                    message = worker.conn.recv()
+                except (EOFError, OSError):
+                    worker.process.join(1)
+                    job_manager.update_job(
+                        job_id, JobState.FAILED,
+                        f"Worker process exited unexpectedly (exit code {worker.process.exitcode})"
+                    )
+                    with self._lock:
+                        self.worker_crashes += 1
+                    break
+
+                if message[0] == 'done':
+                    report_path = message[1]
+                    healthy = True
+                    break
+                _, method, args, kwargs = message
+                if method in RELAYED_METHODS:
+                    getattr(job_manager, method)(*args, **kwargs)
+        finally:
+            self._release(job_id, worker, healthy)
+        return report_path
+
+    def cancel(self, job_id: str) -> bool:
+        """Kill a running job's worker. Returns False if the job is not running here."""
+        with self._lock:
+            if job_id not in self._busy:
+                return False
+            self._cancelled.add(job_id)
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'idle_workers': len(self._idle),
+                'busy_workers': len(self._busy),
+                'workers_started': self.workers_started,
+                'workers_recycled': self.workers_recycled,
+                'worker_crashes': self.worker_crashes,
+                'jobs_timed_out': self.jobs_timed_out,
+                'jobs_cancelled': self.jobs_cancelled,
+            }
+
+    def shutdown(self, timeout: float = 5.0):
+        """Stop idle workers and kill any still running a job."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            busy = list(self._busy.values())
+        for worker in idle:
+            worker.stop(timeout)
+        for worker in busy:
+            worker.kill()
+
+    def _acquire(self, job_id: str) -> _Worker:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Executor is shut down")
+            worker = self._idle.pop() if self._idle else None
+            if worker is None:
+                self.workers_started += 1
+        if worker is None:
+            worker = _Worker(self._context)
+        with self._lock:
+            self._busy[job_id] = worker
+        return worker
+
+    def _release(self, job_id: str, worker: _Worker, healthy: bool):
+        with self._lock:
+            self._busy.pop(job_id, None)
+            self._cancelled.discard(job_id)
+            keep = healthy and not self._closed and worker.jobs_run < self.max_jobs_per_worker
+            if keep:
+                self._idle.append(worker)
+            elif healthy:
+                self.workers_recycled += 1
+        if keep:
+            return
+        if healthy:
+            worker.stop()
+        else:
+            # Cancelled, timed out or crashed: whatever it was doing is abandoned
+            worker.kill()
@@ -0,0 +1,260 @@
+"""TTL/LRU cache of generated reports, keyed by company and crew config."""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterable, Optional, Tuple
+
+from financial_researcher.job_manager import normalize_company_key
+
+
+CONFIG_DIR = Path(__file__).parent / 'config'
+DEFAULT_CONFIG_PATHS = (CONFIG_DIR / 'agents.yaml', CONFIG_DIR / 'tasks.yaml')
+
+
+@dataclass
+class CachedReport:
+    """A report kept by the cache."""
+    key: str
+    company_name: str
+    report_path: str
+    content: str
+    created_at: float
+
+
+class ReportCache:
+    """
+    Caches report markdown so repeat lookups skip the crew entirely.
+
+    Keys combine the normalized company name with a hash of the agent and
+    task configs, so editing either YAML file invalidates old reports.
+    Entries expire after ``ttl_seconds`` and the in-memory tier evicts the
+    least recently used entry beyond ``max_entries``. When ``disk_dir`` is
+    set, entries are also written there as JSON and survive restarts. The
+    disk tier drops expired files as they are found, and after each write
+    deletes expired files and the oldest beyond ``max_disk_entries``.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 3600,
+        max_entries: int = 128,
+        disk_dir: Optional[str] = None,
+        config_paths: Iterable[Path] = DEFAULT_CONFIG_PATHS,
+        max_disk_entries: int = 1024
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.config_paths = tuple(Path(p) for p in config_paths)
+
+        self._entries: "OrderedDict[str, CachedReport]" = OrderedDict()
+        self._lock = Lock()
+        self._fingerprint: Optional[Tuple[tuple, str]] = None
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, company_name: str) -> str:
+        """Build the cache key for a company under the current config."""
+        return f"{normalize_company_key(company_name)}:{self.config_fingerprint()}"
+
+    def config_fingerprint(self) -> str:
+        """Hash of the crew config files, recomputed only when they change."""
+        stamp = []
+        for path in self.config_paths:
+            try:
+                stat = path.stat()
+                stamp.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamp.append(None)
+        stamp = tuple(stamp)
+
+        cached = self._fingerprint
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+        digest = hashlib.sha256()
+        for path in self.config_paths:
+            digest.update(path.name.encode('utf-8'))
+            if path.exists():
+                digest.update(path.read_bytes())
+        fingerprint = digest.hexdigest()[:16]
+        self._fingerprint = (stamp, fingerprint)
+        return fingerprint
+
+    def get(self, company_name: str) -> Optional[CachedReport]:
+        """Return a fresh cached report for the company, or None."""
+        if self.ttl_seconds <= 0:
+            return None
+
+        key = self.key(company_name)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry.created_at <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            if entry:
+                del self._entries[key]
+
+        entry = self._read_disk(key)
+        if entry and now - entry.created_at <= self.ttl_seconds:
+            with self._lock:
+                self._store_locked(entry)
+                self.hits += 1
+            return entry
+        if entry:
+            self._remove_disk(key)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, company_name: str, report_path: str) -> Optional[CachedReport]:
+        """Cache the report file generated for a company."""
+        if self.ttl_seconds <= 0:
+            return None
+
+        try:
+            content = Path(report_path).read_text(encoding='utf-8')
+        except OSError:
+            return None
+
+        entry = CachedReport(
+            key=self.key(company_name),
+            company_name=company_name,
+            report_path=report_path,
+            content=content,
+            created_at=time.time()
+        )
+
+        with self._lock:
+            self._store_locked(entry)
+        self._write_disk(entry)
+        self._prune_disk(entry.created_at)
+        return entry
+
+    def invalidate(self, company_name: str):
+        """Drop any cached report for the company, e.g. because a new one is on its way."""
+        key = self.key(company_name)
+        with self._lock:
+            self._entries.pop(key, None)
+        self._remove_disk(key)
+
+    def materialize(self, entry: CachedReport) -> str:
+        """Make sure the report file exists on disk and return its path."""
+        report_file = Path(entry.report_path)
+        try:
+            if report_file.read_text(encoding='utf-8') == entry.content:
+                return entry.report_path
+        except OSError:
+            pass
+
+        report_file.parent.mkdir(parents=True, exist_ok=True)
+        _write_atomic(report_file, entry.content)
+        return entry.report_path
+
+    def stats(self) -> Dict:
+        """Get cache size and hit/miss counters."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+    def _store_locked(self, entry: CachedReport):
+        """Insert an entry and evict beyond max_entries. Caller holds the lock."""
+        self._entries[entry.key] = entry
+        self._entries.move_to_end(entry.key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        if not self.disk_dir:
+            return None
+        return self.disk_dir / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json"
+
+    def _read_disk(self, key: str) -> Optional[CachedReport]:
+        path = self._disk_path(key)
+        if not path or not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = CachedReport(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+        return entry if entry.key == key else None
+
+    def _remove_disk(self, key: str):
+        path = self._disk_path(key)
+        if path:
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+    def _prune_disk(self, now: float):
+        """Delete expired disk entries, then the oldest beyond ``max_disk_entries``."""
+        if not self.disk_dir:
+            return
+        files = []
+        try:
+            with os.scandir(self.disk_dir) as entries:
+                for dir_entry in entries:
+                    if dir_entry.name.endswith('.json'):
+                        try:
+                            files.append((dir_entry.stat().st_mtime, dir_entry.path))
+                        except OSError:
+                            continue
+        except OSError:
+            return
+
+        # A file is written when its entry is created, so its mtime is the entry's age
+        files.sort()
+        excess = len(files) - self.max_disk_entries
+        for index, (mtime, path) in enumerate(files):
+            if index >= excess and now - mtime <= self.ttl_seconds:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _write_disk(self, entry: CachedReport):
+        path = self._disk_path(entry.key)
+        if not path:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write_atomic(path, json.dumps(asdict(entry)))
+
+
+def _write_atomic(path: Path, text: str):
+    """
+    Write then rename so readers never see a partial file.
+
+    Each write gets its own temporary file, since several scheduler
+    threads may write the same company's entry at once.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix='.tmp')
+    try:
+        # mkstemp creates the file private to the owner; keep reports readable
+        os.chmod(tmp_path, 0o644)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,263 @@
+"""Cache of reports rendered to HTML and encoded for /report responses."""
+import gzip
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from threading import Event, Lock
+from typing import Dict, List, Optional, Tuple
+
+import markdown2
+
+try:
+    import brotli
+except ImportError:  # Optional: pip install 'financial_researcher[compression]'
+    brotli = None
+
+
+MARKDOWN_EXTRAS = ['tables', 'fenced-code-blocks', 'header-ids']
+
+# Smaller bodies are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+
+# Preferred first when the client accepts several equally
+ENCODING_PREFERENCE = ('br', 'gzip', 'identity')
+
+# Compression levels by coding: the best ones for prerendering in the
+# background, and cheaper ones when a request has to wait for the result
+BEST_LEVELS = {'br': 11, 'gzip': 9}
+FAST_LEVELS = {'br': 5, 'gzip': 6}
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """Content codings this process can produce, best first."""
+    return tuple(e for e in ENCODING_PREFERENCE if e != 'br' or brotli is not None)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> str:
+    """Pick the best coding allowed by an Accept-Encoding header."""
+    if not accept_encoding:
+        return 'identity'
+
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        weight = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+
+    def weight_of(encoding: str) -> float:
+        if encoding in weights:
+            return weights[encoding]
+        if '*' in weights:
+            return weights['*']
+        # identity is acceptable unless explicitly refused
+        return 1.0 if encoding == 'identity' else 0.0
+
+    candidates = [e for e in available_encodings() if weight_of(e) > 0]
+    if not candidates:
+        return 'identity'
+    return max(candidates, key=lambda e: (weight_of(e), -ENCODING_PREFERENCE.index(e)))
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    True if an If-None-Match header names ``etag``.
+
+    Comparison is weak, as RFC 9110 requires for If-None-Match: a ``W/``
+    prefix is ignored, but each coding ("<hash>-gzip") is its own tag.
+    """
+    if not if_none_match:
+        return False
+    base = etag[2:] if etag.startswith('W/') else etag
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag == '*':
+            return True
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag == base:
+            return True
+    return False
+
+
+class ReportBody:
+    """
+    The JSON body of one /report response, in every coding produced so far.
+
+    Each coding is compressed once: requests for a coding that is being
+    compressed wait for it, while other bodies and codings are served.
+    """
+
+    __slots__ = ('etag', 'codings', 'accounted', '_lock', '_in_flight')
+
+    def __init__(self, identity: bytes):
+        self.etag = hashlib.sha256(identity).hexdigest()[:32]
+        self.codings: Dict[str, bytes] = {'identity': identity}
+        # Bytes ReportRenderer has counted for this body
+        self.accounted = 0
+        self._lock = Lock()
+        self._in_flight: Dict[str, Event] = {}
+
+    def encoded(self, encoding: str, levels: Dict[str, int] = FAST_LEVELS) -> Tuple[bytes, str]:
+        """The body in ``encoding`` and its content coding, compressing on first use."""
+        identity = self.codings['identity']
+        if self.coding_for(encoding) == 'identity':
+            return identity, 'identity'
+
+        while True:
+            with self._lock:
+                data = self.codings.get(encoding)
+                if data is not None:
+                    return data, encoding
+                in_flight = self._in_flight.get(encoding)
+                if in_flight is None:
+                    done = self._in_flight[encoding] = Event()
+                    break
+            in_flight.wait()
+
+        try:
+            if encoding == 'br':
+                data = brotli.compress(identity, quality=levels['br'])
+            else:
+                data = gzip.compress(identity, compresslevel=levels['gzip'], mtime=0)
+            with self._lock:
+                self.codings[encoding] = data
+        finally:
+            with self._lock:
+                del self._in_flight[encoding]
+            done.set()
+        return data, encoding
+
+    def coding_for(self, encoding: str) -> str:
+        """The content coding ``encoded`` will answer a request for ``encoding`` with."""
+        if encoding == 'identity' or len(self.codings['identity']) < MIN_COMPRESS_BYTES:
+            return 'identity'
+        return encoding
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return sum(len(data) for data in self.codings.values())
+
+
+class ReportRenderer:
+    """
+    Renders report markdown to HTML once per file version.
+
+    Entries are keyed by path, modification time and size, so an edited
+    or regenerated file is rendered again. The least recently used
+    entries are evicted beyond ``max_entries`` or ``max_bytes``.
+    Compressed codings are produced on first request at a fast level, or
+    all at once at the best level by ``prerender``; either way outside
+    the renderer's lock.
+    """
+
+    def __init__(self, max_entries: int = 64, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # (path, mtime_ns, size, company) -> body
+        self._entries: "OrderedDict[tuple, ReportBody]" = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, report_path: str, company_name: str) -> Optional[ReportBody]:
+        """The response body for a report, or None if the file does not exist."""
+        try:
+            stat = os.stat(report_path)
+        except FileNotFoundError:
+            return None
+        key = (os.path.abspath(report_path), stat.st_mtime_ns, stat.st_size, company_name)
+
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return body
+            self.misses += 1
+
+        # Render outside the lock; a duplicate render on a race is harmless
+        with open(report_path, 'r', encoding='utf-8') as f:
+            html = markdown2.markdown(f.read(), extras=MARKDOWN_EXTRAS)
+        body = ReportBody(json.dumps({'html': html, 'company': company_name}).encode('utf-8'))
+
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                return existing
+            self._entries[key] = body
+            body.accounted = body.size
+            self._bytes += body.accounted
+            self._evict_locked()
+        return body
+
+    def encoded(self, body: ReportBody, encoding: str, levels: Dict[str, int] = FAST_LEVELS) -> Tuple[bytes, str]:
+        """``body`` in ``encoding``, keeping the byte count up to date."""
+        result = body.encoded(encoding, levels)
+        with self._lock:
+            size = body.size
+            if size != body.accounted and any(entry is body for entry in self._entries.values()):
+                self._bytes += size - body.accounted
+                body.accounted = size
+                self._evict_locked()
+        return result
+
+    def prerender(self, report_path: str, company_name: str) -> bool:
+        """Render a report and every coding now, so the first viewer is served from cache."""
+        body = self.get(report_path, company_name)
+        if body is None:
+            return False
+        for encoding in available_encodings():
+            self.encoded(body, encoding, BEST_LEVELS)
+        return True
+
+    def _evict_locked(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.accounted
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+            }
+
+
+def conditional_response(
+    body: ReportBody,
+    renderer: ReportRenderer,
+    accept_encoding: Optional[str],
+    if_none_match: Optional[str],
+) -> Tuple[bytes, int, Dict[str, str]]:
+    """
+    Encoded body, status and headers for a GET, honouring If-None-Match.
+
+    A matching revalidation is answered before anything is compressed.
+    """
+    encoding = body.coding_for(negotiate_encoding(accept_encoding))
+    etag = f'"{body.etag}"' if encoding == 'identity' else f'"{body.etag}-{encoding}"'
+
+    headers = {
+        'ETag': etag,
+        'Vary': 'Accept-Encoding',
+        'Cache-Control': 'no-cache',
+    }
+    if etag_matches(if_none_match, etag):
+        return b'', 304, headers
+
+    data, encoding = renderer.encoded(body, encoding)
+    headers['Content-Type'] = 'application/json'
+    if encoding != 'identity':
+        headers['Content-Encoding'] = encoding
+    return data, 200, headers
@@ -0,0 +1,618 @@
+"""Research job service shared by the Flask and ASGI web servers."""
+import atexit
+import json
+import os
+import random
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple, Union
+
+from financial_researcher.batch import BatchManager
+from financial_researcher.job_manager import JobManager, JobState, JobStatus, normalize_company_key
+from financial_researcher.job_store import JobStore, MemoryJobStore, SqliteJobStore
+from financial_researcher.metrics import CONTENT_TYPE, JobMetrics, registry, stats_families
+from financial_researcher.process_executor import ProcessCrewExecutor
+from financial_researcher.report_cache import ReportCache
+from financial_researcher.report_renderer import ReportRenderer, conditional_response
+from financial_researcher.retention import RetentionService
+from financial_researcher.scheduler import JobScheduler, QueueFullError, SchedulerShutdownError
+from financial_researcher.tracing import TRACE_FORMATS, trace_store
+
+
+# (body, HTTP status, extra headers) returned by the request handlers below.
+# A bytes body is sent as is, with its Content-Type in the headers.
+ServiceResponse = Tuple[Union[Dict, bytes], int, Dict[str, str]]
+
+# Seconds between keepalive comments on an idle /stream connection
+SSE_HEARTBEAT_SECONDS = float(os.environ.get('SSE_HEARTBEAT_SECONDS', '15'))
+
+# Reconnect delay suggested to EventSource clients. Each connection gets a
+# value between this and twice this, so clients dropped together (e.g. by
+# a proxy restart) do not all come back at once.
+SSE_RETRY_MS = int(os.environ.get('SSE_RETRY_MS', '3000'))
+
+# How long a /stream?coalesce=1 connection lets events pile up after being
+# woken, so a burst goes out as one batched frame
+SSE_COALESCE_SECONDS = float(os.environ.get('SSE_COALESCE_SECONDS', '0.05'))
+
+
+def create_job_store() -> JobStore:
+    """Job store selected by JOB_STORE: "memory" (default) or "sqlite"."""
+    backend = os.environ.get('JOB_STORE', 'memory')
+    if backend == 'sqlite':
+        return SqliteJobStore(os.environ.get('JOB_STORE_PATH', 'output/jobs.sqlite3'))
+    if backend == 'memory':
+        return MemoryJobStore(
+            max_logs=int(os.environ.get('JOB_HISTORY_MAX_LOGS', '1000')),
+            max_events=int(os.environ.get('JOB_HISTORY_MAX_EVENTS', '1000')),
+            spill_dir=os.environ.get('JOB_HISTORY_DIR', 'output/job_history') or None
+        )
+    raise ValueError(f"Unknown JOB_STORE: {backend}")
+
+
+job_manager = JobManager(create_job_store())
+job_metrics = JobMetrics(job_manager, registry)
+registry.add_collector(job_metrics.collect)
+report_cache = ReportCache(
+    ttl_seconds=float(os.environ.get('REPORT_CACHE_TTL', '3600')),
+    max_entries=int(os.environ.get('REPORT_CACHE_MAX_ENTRIES', '128')),
+    disk_dir=os.environ.get('REPORT_CACHE_DIR', 'output/cache/reports') or None,
+    max_disk_entries=int(os.environ.get('REPORT_CACHE_MAX_DISK_ENTRIES', '1024'))
+)
+
+report_renderer = ReportRenderer(
+    max_entries=int(os.environ.get('REPORT_RENDER_CACHE_ENTRIES', '64')),
+    max_bytes=int(float(os.environ.get('REPORT_RENDER_CACHE_MB', '64')) * 1024 * 1024)
+)
+
+
+def prerender_report(job: JobStatus):
+    """Render a job's report as soon as it completes, before anyone asks for it."""
+    if job.state == JobState.COMPLETED and job.report_path:
+        try:
+            report_renderer.prerender(job.report_path, job.company_name)
+        except Exception:
+            pass  # The request path reports rendering errors
+
+
+job_manager.add_state_listener(prerender_report)
+
+
+def create_crew_executor() -> Optional[ProcessCrewExecutor]:
+    """Worker processes for crews if RESEARCH_EXECUTOR is "process"; None runs them on threads."""
+    backend = os.environ.get('RESEARCH_EXECUTOR', 'thread')
+    if backend == 'process':
+        return ProcessCrewExecutor(
+            max_jobs_per_worker=int(os.environ.get('RESEARCH_WORKER_MAX_JOBS', '10')),
+            job_timeout=float(os.environ.get('RESEARCH_JOB_TIMEOUT', '1800') or 0) or None
+        )
+    if backend == 'thread':
+        return None
+    raise ValueError(f"Unknown RESEARCH_EXECUTOR: {backend}")
+
+
+crew_executor = create_crew_executor()
+if crew_executor is not None:
+    # Registered before the scheduler's drain, so it runs after it
+    atexit.register(crew_executor.shutdown)
+
+
+def preload_crew():
+    """
+    Import crewAI and build a crew in the background.
+
+    crew_runner is only imported here and by the first job, so the web
+    server binds without waiting seconds for crewAI to load.
+    """
+    try:
+        from financial_researcher.crew_runner import warm_up
+        warm_up()
+    except Exception as e:
+        print(f"Crew preload failed, jobs will load it themselves: {e}", file=sys.stderr)
+
+
+def run_research_job(company_name: str, job_manager: JobManager, job_id: str, refresh: bool = False):
+    """Run the crew for a job and cache the report it produces."""
+    if crew_executor is not None:
+        report_path = crew_executor.run(company_name, job_manager, job_id, refresh=refresh)
+    else:
+        from financial_researcher.crew_runner import run_crew_with_logging
+        report_path = run_crew_with_logging(company_name, job_manager, job_id, refresh=refresh)
+    if report_path:
+        report_cache.put(company_name, report_path)
+    return report_path
+
+
+scheduler = JobScheduler(
+    job_manager,
+    run_research_job,
+    max_workers=int(os.environ.get('RESEARCH_MAX_WORKERS', '2')),
+    max_queue_depth=int(os.environ.get('RESEARCH_MAX_QUEUE_DEPTH', '20'))
+)
+
+
+@atexit.register
+def shutdown_scheduler():
+    """Let queued and running jobs finish before the process exits."""
+    scheduler.shutdown(drain=True, timeout=float(os.environ.get('RESEARCH_SHUTDOWN_TIMEOUT', '30')))
+
+
+def _hours_setting(name: str, default: str) -> Optional[float]:
+    """Seconds for an hours setting; 0 or empty means never."""
+    hours = float(os.environ.get(name, default) or 0)
+    return hours * 3600 if hours > 0 else None
+
+
+retention = RetentionService(
+    job_manager,
+    retention_seconds={
+        JobState.COMPLETED: _hours_setting('JOB_RETENTION_COMPLETED_HOURS', '24'),
+        JobState.FAILED: _hours_setting('JOB_RETENTION_FAILED_HOURS', '6'),
+        JobState.QUEUED: _hours_setting('JOB_RETENTION_ACTIVE_HOURS', '0'),
+        JobState.RUNNING: _hours_setting('JOB_RETENTION_ACTIVE_HOURS', '0'),
+    },
+    output_dir='output',
+    quota_bytes=int(float(os.environ.get('OUTPUT_QUOTA_MB', '1024') or 0) * 1024 * 1024) or None,
+    trace_dir=str(trace_store.directory) if trace_store.directory else None,
+    interval_seconds=float(os.environ.get('RETENTION_SWEEP_SECONDS', '60'))
+)
+
+_services_lock = threading.Lock()
+_services_started = False
+
+
+def start_services():
+    """
+    Start the background work of a serving process: the retention sweeps
+    and the crew preload. The scheduler starts its workers with the first job.
+
+    Called by the web servers at startup rather than on import, so scripts,
+    benchmarks and crew worker processes that import this module neither
+    load crewAI needlessly nor sweep ``output/`` with a JobManager that
+    holds none of the served jobs.
+    Safe to call more than once.
+    """
+    global _services_started
+
+    with _services_lock:
+        if _services_started:
+            return
+        _services_started = True
+
+    retention.start()
+    atexit.register(retention.stop)
+
+    # Worker processes load crewAI themselves, so the parent has no use for it
+    if crew_executor is None and os.environ.get('CREW_PRELOAD', 'true').lower() in ('1', 'true', 'yes'):
+        threading.Thread(target=preload_crew, name="crew-preload", daemon=True).start()
+
+
+def submit_research(data: Optional[Dict]) -> ServiceResponse:
+    """Validate a POST /research body and start, attach to or serve a job."""
+    if not data or 'company' not in data:
+        return {'error': 'Company name is required'}, 400, {}
+
+    if not isinstance(data['company'], str):
+        return {'error': 'Company name must be a string'}, 400, {}
+
+    company_name = data['company'].strip()
+
+    if not company_name:
+        return {'error': 'Company name cannot be empty'}, 400, {}
+
+    # Validate company name (basic sanitization)
+    if len(company_name) > 100:
+        return {'error': 'Company name too long (max 100 characters)'}, 400, {}
+
+    priority = data.get('priority', 0)
+    if not isinstance(priority, int) or isinstance(priority, bool):
+        return {'error': 'Priority must be an integer'}, 400, {}
+
+    force_refresh = data.get('force_refresh', False)
+    if not isinstance(force_refresh, bool):
+        return {'error': 'force_refresh must be a boolean'}, 400, {}
+
+    refresh = data.get('refresh', False)
+    if not isinstance(refresh, bool):
+        return {'error': 'refresh must be a boolean'}, 400, {}
+
+    try:
+        result = start_research(
+            company_name, priority=priority, force_refresh=force_refresh, refresh=refresh
+        )
+    except QueueFullError as e:
+        return (
+            {'error': 'Too many research jobs queued, try again later'},
+            429,
+            {'Retry-After': str(e.retry_after)}
+        )
+    except SchedulerShutdownError:
+        return {'error': 'Server is shutting down'}, 503, {}
+
+    return result, 200 if result['cached'] else 202, {}
+
+
+def start_research(
+    company_name: str,
+    priority: int = 0,
+    force_refresh: bool = False,
+    refresh: bool = False
+) -> Dict:
+    """
+    Serve a cached report, attach to the in-flight job or queue a new one.
+
+    With ``refresh`` a new job researches only the stale sections of the
+    company's previous report.
+
+    Returns the /research response body for the job.
+
+    Raises:
+        QueueFullError: If the scheduler queue is full
+        SchedulerShutdownError: If the server is shutting down
+    """
+    # Serve a recent report for this company without running the crew
+    cached = None if force_refresh else report_cache.get(company_name)
+    if cached:
+        job_id = job_manager.create_job(company_name)
+        job_manager.add_log(job_id, "Using cached report")
+        job_manager.set_result(job_id, report_cache.materialize(cached))
+        return {
+            'job_id': job_id,
+            'company': company_name,
+            'coalesced': False,
+            'cached': True,
+            'queue_position': None
+        }
+
+    # Create job, or attach to the one already researching this company
+    job_id, created = job_manager.get_or_create_job(company_name)
+
+    if not created:
+        job = job_manager.get_job(job_id)
+        return {
+            'job_id': job_id,
+            'company': job.company_name if job else company_name,
+            'coalesced': True,
+            'cached': False,
+            'queue_position': scheduler.queue_position(job_id)
+        }
+
+    # Queue crew execution on the worker pool
+    try:
+        position = scheduler.submit(
+            job_id, company_name, job_manager, job_id, priority=priority, refresh=refresh
+        )
+    except (QueueFullError, SchedulerShutdownError):
+        job_manager.remove_job(job_id)
+        raise
+
+    # A forced refresh replaces the cached report; stop serving the old one meanwhile
+    if force_refresh:
+        report_cache.invalidate(company_name)
+
+    return {
+        'job_id': job_id,
+        'company': company_name,
+        'coalesced': False,
+        'cached': False,
+        'queue_position': position
+    }
+
+
+batch_manager = BatchManager(
+    job_manager,
+    lambda company, **options: start_research(company, **options)['job_id'],
+    index_dir=os.environ.get('BATCH_INDEX_DIR', 'output/batches') or None
+)
+
+BATCH_MAX_COMPANIES = int(os.environ.get('BATCH_MAX_COMPANIES', '200'))
+
+
+def submit_batch(data: Optional[Dict]) -> ServiceResponse:
+    """
+    Validate a POST /batch body and start researching its companies.
+
+    Companies run at most ``parallelism`` at a time, capped at the
+    number of research workers, which is also the default.
+
+    Batches live in the memory of the process that created them and follow
+    their jobs through local state changes, so they are refused with a
+    shared job store: other web workers could not find them, and a company
+    attached to a job running in another process would never finish.
+    """
+    if job_manager.store.shared:
+        return {'error': 'Batches need JOB_STORE=memory'}, 501, {}
+
+    if not data or 'companies' not in data:
+        return {'error': 'A list of companies is required'}, 400, {}
+
+    companies = data['companies']
+    if not isinstance(companies, list) or not all(isinstance(c, str) for c in companies):
+        return {'error': 'Companies must be a list of strings'}, 400, {}
+
+    # Drop blanks and repeats of the same company
+    unique: Dict[str, str] = {}
+    for company in companies:
+        company = company.strip()
+        if not company:
+            continue
+        if len(company) > 100:
+            return {'error': f'Company name too long (max 100 characters): {company[:100]}'}, 400, {}
+        unique.setdefault(normalize_company_key(company), company)
+
+    if not unique:
+        return {'error': 'Companies cannot be empty'}, 400, {}
+    if len(unique) > BATCH_MAX_COMPANIES:
+        return {'error': f'Too many companies (max {BATCH_MAX_COMPANIES})'}, 400, {}
+
+    parallelism = data.get('parallelism', scheduler.max_workers)
+    if not isinstance(parallelism, int) or isinstance(parallelism, bool) or parallelism < 1:
+        return {'error': 'Parallelism must be a positive integer'}, 400, {}
+
+    priority = data.get('priority', 0)
+    if not isinstance(priority, int) or isinstance(priority, bool):
+        return {'error': 'Priority must be an integer'}, 400, {}
+
+    force_refresh = data.get('force_refresh', False)
+    if not isinstance(force_refresh, bool):
+        return {'error': 'force_refresh must be a boolean'}, 400, {}
+
+    refresh = data.get('refresh', False)
+    if not isinstance(refresh, bool):
+        return {'error': 'refresh must be a boolean'}, 400, {}
+
+    batch = batch_manager.create(
+        list(unique.values()),
+        min(parallelism, scheduler.max_workers),
+        priority=priority,
+        force_refresh=force_refresh,
+        refresh=refresh
+    )
+    return {
+        'batch_id': batch.batch_id,
+        'total': len(batch.items),
+        'parallelism': batch.parallelism,
+    }, 202, {}
+
+
+def get_batch(batch_id: str) -> ServiceResponse:
+    """Progress of a batch, with every company's state and report path."""
+    batch = batch_manager.get(batch_id)
+    if not batch:
+        return {'error': 'Batch not found'}, 404, {}
+    return batch_manager.progress(batch), 200, {}
+
+
+def collect_component_stats():
+    """The stats of the caches, scheduler, reaper and workers, for /metrics."""
+    families = stats_families('scheduler', scheduler.stats())
+    families += stats_families('report_cache', report_cache.stats(), counters=('hits', 'misses'))
+    families += stats_families('report_renderer', report_renderer.stats(), counters=('hits', 'misses'))
+    families += stats_families('retention', retention.stats(), counters=(
+        'sweeps', 'jobs_expired', 'stale_entries_skipped', 'files_removed', 'bytes_reclaimed'
+    ))
+    if crew_executor is not None:
+        families += stats_families('crew_executor', crew_executor.stats(), counters=(
+            'workers_started', 'workers_recycled', 'worker_crashes', 'jobs_timed_out', 'jobs_cancelled'
+        ))
+    # Only once crews run in this process; importing it would load crewAI
+    search_tool = sys.modules.get('financial_researcher.tools.cached_search_tool')
+    if search_tool is not None:
+        families += stats_families('search_cache', search_tool.shared_search_tool().stats(), counters=('hits', 'misses'))
+    return families
+
+
+registry.add_collector(collect_component_stats)
+
+
+def get_metrics() -> ServiceResponse:
+    """Every metric in the Prometheus text format, for GET /metrics."""
+    return registry.render().encode('utf-8'), 200, {'Content-Type': CONTENT_TYPE}
+
+
+def get_trace(job_id: str, trace_format: Optional[str] = None) -> ServiceResponse:
+    """
+    A job's span tree, live while it runs, as ``tree`` (default),
+    ``chrome`` (Chrome trace events) or ``otlp`` (OTLP/JSON).
+    """
+    trace_format = trace_format or 'tree'
+    if trace_format not in TRACE_FORMATS:
+        return {'error': f"Unknown trace format, expected one of: {', '.join(TRACE_FORMATS)}"}, 400, {}
+
+    job = job_manager.get_job(job_id)
+    if not job:
+        return {'error': 'Job not found'}, 404, {}
+
+    trace = trace_store.get(job_id, trace_format)
+    if trace is None:
+        if job.state not in (JobState.COMPLETED, JobState.FAILED):
+            # Worker processes hand over their traces when the job finishes
+            return {'error': 'Trace not available yet'}, 404, {}
+        # e.g. served from the report cache without running a crew
+        return {'error': 'No trace recorded for this job'}, 404, {}
+    return trace, 200, {}
+
+
+def cancel_job(job_id: str) -> ServiceResponse:
+    """
+    Cancel a queued job, or a running one when crews run in worker processes.
+
+    Cancelling a coalesced job cancels it for everyone attached to it.
+    """
+    job = job_manager.get_job(job_id)
+    if not job:
+        return {'error': 'Job not found'}, 404, {}
+    if job.state in (JobState.COMPLETED, JobState.FAILED):
+        return {'error': 'Job already finished'}, 409, {}
+
+    if scheduler.cancel(job_id):
+        return {'job_id': job_id, 'cancelled': True}, 200, {}
+    if crew_executor is not None and crew_executor.cancel(job_id):
+        # The worker is killed within a poll interval and the job marked failed
+        return {'job_id': job_id, 'cancelled': True}, 202, {}
+    return {'error': 'Running jobs can only be cancelled with RESEARCH_EXECUTOR=process'}, 409, {}
+
+
+def get_report(
+    job_id: str,
+    accept_encoding: Optional[str] = None,
+    if_none_match: Optional[str] = None
+) -> ServiceResponse:
+    """
+    Render a completed job's report as HTML.
+
+    The successful response body is already-encoded JSON bytes, with
+    ETag, Content-Type and Content-Encoding in the headers; a matching
+    If-None-Match gives an empty 304.
+    """
+    job = job_manager.get_job(job_id)
+
+    if not job:
+        return {'error': 'Job not found'}, 404, {}
+
+    if job.state != JobState.COMPLETED:
+        return {'error': 'Job not completed yet'}, 400, {}
+
+    if not job.report_path:
+        return {'error': 'Report not available'}, 404, {}
+
+    try:
+        body = report_renderer.get(job.report_path, job.company_name)
+        if body is None:
+            return {'error': 'Report file not found'}, 404, {}
+        return conditional_response(body, report_renderer, accept_encoding, if_none_match)
+    except Exception as e:
+        return {'error': f'Error reading report: {str(e)}'}, 500, {}
+
+
+def format_sse(event: str, data: str, event_id: Optional[int] = None) -> str:
+    """Format one Server-Sent Events frame. Multi-line data becomes several data lines."""
+    data_lines = ''.join(f"data: {line}\n" for line in data.split('\n'))
+    id_line = f"id: {event_id}\n" if event_id is not None else ''
+    return f"{id_line}event: {event}\n{data_lines}\n"
+
+
+def format_sse_retry() -> str:
+    """A frame telling the client how many milliseconds to wait before reconnecting."""
+    return f"retry: {random.randint(SSE_RETRY_MS, SSE_RETRY_MS * 2)}\n\n"
+
+
+def parse_last_event_id(value: Optional[str]) -> int:
+    """The event index a reconnecting client resumes from; 0 for a missing or bad Last-Event-ID."""
+    try:
+        return max(int(value), 0) if value else 0
+    except ValueError:
+        return 0
+
+
+SSE_KEEPALIVE = ": keepalive\n\n"
+
+
+class JobStream:
+    """
+    Turns a job's progress into SSE frames.
+
+    Each ``poll`` returns the frames for everything that happened since
+    the previous call. Status frames are sent only when the state
+    changes, and ``done`` is set after the final complete/error frame.
+    Callers decide how to wait between polls.
+
+    Event frames carry the job's event count up to and including them as
+    their id, so a client reconnecting with that ``Last-Event-ID`` gets
+    only the events it missed. With ``coalesce``, several new events go
+    out as one ``events`` frame holding a JSON list of ``{"type", "data"}``.
+    """
+
+    def __init__(self, job_manager: JobManager, job_id: str,
+                 last_event_id: Optional[str] = None, coalesce: bool = False):
+        self.job_manager = job_manager
+        self.job_id = job_id
+        self.coalesce = coalesce
+        self.last_event_index = parse_last_event_id(last_event_id)
+        self.last_state: Optional[JobState] = None
+        self.started = False
+        self.done = False
+
+    def poll(self) -> List[str]:
+        """Frames for new events and state changes since the last poll."""
+        frames = []
+        if not self.started:
+            frames.append(format_sse_retry())
+            self.started = True
+
+        job = self.job_manager.get_job(self.job_id)
+        if not job:
+            self.done = True
+            return frames + [format_sse('error', 'Job not found')]
+
+        # Send new structured events
+        new_events, self.last_event_index = self.job_manager.read_events(
+            self.job_id, since_index=self.last_event_index
+        )
+        if self.coalesce and len(new_events) > 1:
+            batch = [{'type': event.get('type', 'log'), 'data': event.get('data', {})} for event in new_events]
+            frames.append(format_sse('events', json.dumps(batch), self.last_event_index))
+        else:
+            # Events dropped from memory are skipped, so number them back from the end
+            first_id = self.last_event_index - len(new_events) + 1
+            for event_id, event in enumerate(new_events, first_id):
+                event_type = event.get('type', 'log')
+                frames.append(format_sse(event_type, json.dumps(event.get('data', {})), event_id))
+
+        # Send status updates only when the state changes
+        if job.state != self.last_state:
+            frames.append(format_sse('status', job.state.value))
+            self.last_state = job.state
+
+        # Check if job is complete
+        if job.state == JobState.COMPLETED:
+            frames.append(format_sse('complete', str(job.report_path)))
+            self.done = True
+        elif job.state == JobState.FAILED:
+            frames.append(format_sse('error', job.error_message or "Unknown error"))
+            self.done = True
+
+        return frames
+
+
+def open_job_stream(job_id: str, last_event_id: Optional[str] = None, coalesce: Optional[str] = None) -> JobStream:
+    """A JobStream for a /stream request, from its Last-Event-ID header and ?coalesce= parameter."""
+    return JobStream(
+        job_manager, job_id,
+        last_event_id=last_event_id,
+        coalesce=(coalesce or '').lower() in ('1', 'true', 'yes')
+    )
+
+
+class BatchStream:
+    """
+    Turns a batch's progress into SSE frames, like JobStream does for a job.
+
+    The first ``batch_progress`` frame lists every company; later ones
+    only the companies that changed. A ``batch_complete`` frame with the
+    report index ends the stream.
+    """
+
+    def __init__(self, batch_manager: BatchManager, batch_id: str):
+        self.batch_manager = batch_manager
+        self.batch_id = batch_id
+        self.last_version = -1
+        self.done = False
+
+    def poll(self) -> List[str]:
+        """Frames for progress since the last poll."""
+        batch = self.batch_manager.get(self.batch_id)
+        if batch is None:
+            self.done = True
+            return [format_sse('error', 'Batch not found')]
+
+        frames = []
+        if batch.version != self.last_version:
+            progress = self.batch_manager.progress(batch, since_version=self.last_version)
+            self.last_version = progress['version']
+            frames.append(format_sse('batch_progress', json.dumps(progress)))
+
+        if batch.done and batch.version == self.last_version:
+            frames.append(format_sse('batch_complete', json.dumps(self.batch_manager.index(batch))))
+            self.done = True
+        return frames
@@ -0,0 +1,212 @@
+"""Background reaper for finished jobs and files under output/."""
+import fnmatch
+import heapq
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from financial_researcher.job_manager import JobManager, JobState, JobStatus
+
+
+# Disposable output the quota may delete: reports at the top of the output
+# directory and saved traces. Job history spill files, section state,
+# caches and databases live in subdirectories and are never touched.
+REPORT_PATTERN = 'report_*.md'
+TRACE_PATTERN = '*.json'
+
+
+class RetentionService:
+    """
+    Expires jobs after a per-state retention time and keeps ``output_dir``
+    under a size quota.
+
+    Jobs are kept in a heap ordered by expiry time. JobManager reports
+    every state change, and each change pushes a new entry; entries whose
+    job has since moved to another state are skipped when they surface.
+    A sweep therefore only touches jobs that are due.
+
+    Args:
+        job_manager: Jobs to expire
+        retention_seconds: Seconds a job is kept after entering each
+            state. States left out, or set to None, never expire.
+        output_dir: Directory holding the reports the quota applies to
+        quota_bytes: Size limit for reports and traces; None disables it.
+            The least recently modified files are deleted first, except
+            reports of jobs still held by ``job_manager``.
+        trace_dir: Directory of saved traces, also under the quota
+        min_file_age_seconds: Files modified more recently than this are
+            never deleted, so reports still being written are safe
+        interval_seconds: Time between sweeps of the background thread
+    """
+
+    def __init__(
+        self,
+        job_manager: JobManager,
+        retention_seconds: Dict[JobState, Optional[float]],
+        output_dir: str = 'output',
+        quota_bytes: Optional[int] = None,
+        trace_dir: Optional[str] = None,
+        min_file_age_seconds: float = 600,
+        interval_seconds: float = 60,
+    ):
+        self.job_manager = job_manager
+        self.retention_seconds = retention_seconds
+        self.output_dir = output_dir
+        self.quota_bytes = quota_bytes
+        self.trace_dir = trace_dir
+        self.min_file_age_seconds = min_file_age_seconds
+        self.interval_seconds = interval_seconds
+
+        # (expires_at, job_id, state the job was in when the entry was pushed)
+        self._heap: List[Tuple[float, str, JobState]] = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._sweeps = 0
+        self._jobs_expired: Dict[str, int] = {state.value: 0 for state in JobState}
+        self._stale_entries_skipped = 0
+        self._files_removed = 0
+        self._bytes_reclaimed = 0
+        self._output_bytes = 0
+        self._last_sweep_seconds = 0.0
+
+        job_manager.add_state_listener(self.track)
+        # Jobs that were already there, e.g. in a persistent store after a restart
+        for job in job_manager.list_jobs():
+            self.track(job)
+
+    def track(self, job: JobStatus):
+        """Schedule a job's expiry for the state it is in now."""
+        ttl = self.retention_seconds.get(job.state)
+        if ttl is None:
+            return
+        with self._lock:
+            heapq.heappush(self._heap, (job.updated_at.timestamp() + ttl, job.job_id, job.state))
+
+    def start(self):
+        """Sweep in a background thread every ``interval_seconds``."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="retention", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.wait(self.interval_seconds):
+            self.sweep()
+
+    def sweep(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Expire due jobs and enforce the disk quota once. Returns what was reclaimed."""
+        started = time.perf_counter()
+        now = time.time() if now is None else now
+        jobs_expired = self._expire_jobs(now)
+        files_removed, bytes_reclaimed = self._enforce_quota(now)
+
+        with self._lock:
+            self._sweeps += 1
+            self._last_sweep_seconds = time.perf_counter() - started
+        return {
+            'jobs_expired': jobs_expired,
+            'files_removed': files_removed,
+            'bytes_reclaimed': bytes_reclaimed,
+        }
+
+    def _expire_jobs(self, now: float) -> int:
+        expired = 0
+        while True:
+            with self._lock:
+                if not self._heap or self._heap[0][0] > now:
+                    return expired
+                _, job_id, state = heapq.heappop(self._heap)
+
+            job = self.job_manager.get_job(job_id)
+            if job is None or job.state != state:
+                # Removed already, or a newer entry covers its current state
+                with self._lock:
+                    self._stale_entries_skipped += 1
+                continue
+
+            if self.job_manager.remove_job(job_id):
+                expired += 1
+                with self._lock:
+                    self._jobs_expired[state.value] += 1
+
+    def _quota_files(self) -> Iterator[os.DirEntry]:
+        """Reports and traces, from one listing of each directory; nothing below them."""
+        for directory, pattern in ((self.output_dir, REPORT_PATTERN), (self.trace_dir, TRACE_PATTERN)):
+            if not directory:
+                continue
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if fnmatch.fnmatch(entry.name, pattern) and entry.is_file(follow_symlinks=False):
+                            yield entry
+            except OSError:
+                continue  # Not created yet
+
+    def _held_reports(self) -> Set[str]:
+        """Reports of jobs still held, which are being written or served."""
+        held = set()
+        for job in self.job_manager.list_jobs():
+            held.add(os.path.abspath(os.path.join(self.output_dir, f"report_{job.company_name}.md")))
+            if job.report_path:
+                held.add(os.path.abspath(job.report_path))
+        return held
+
+    def _enforce_quota(self, now: float) -> Tuple[int, int]:
+        if self.quota_bytes is None:
+            return 0, 0
+
+        files = []
+        total = 0
+        for entry in self._quota_files():
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue  # Deleted while scanning
+            total += stat.st_size
+            if now - stat.st_mtime >= self.min_file_age_seconds:
+                files.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+
+        held = self._held_reports() if total > self.quota_bytes else set()
+        files = [item for item in files if os.path.abspath(item[2]) not in held]
+
+        removed = reclaimed = 0
+        if total > self.quota_bytes:
+            for _, size, path in sorted(files, key=lambda item: item[0]):
+                if total <= self.quota_bytes:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+                reclaimed += size
+
+        with self._lock:
+            self._output_bytes = total
+            self._files_removed += removed
+            self._bytes_reclaimed += reclaimed
+        return removed, reclaimed
+
+    def stats(self) -> Dict:
+        """Counters for everything reclaimed since startup."""
+        with self._lock:
+            return {
+                'sweeps': self._sweeps,
+                'jobs_expired': dict(self._jobs_expired),
+                'stale_entries_skipped': self._stale_entries_skipped,
+                'index_size': len(self._heap),
+                'files_removed': self._files_removed,
+                'bytes_reclaimed': self._bytes_reclaimed,
+                'output_bytes': self._output_bytes,
+                'last_sweep_seconds': self._last_sweep_seconds,
+            }
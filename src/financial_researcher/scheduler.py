@@ -0,0 +1,269 @@
+"""Bounded worker pool that runs research jobs from a priority queue."""
+import heapq
+import itertools
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from financial_researcher.job_manager import JobManager, JobState
+from financial_researcher.log_parser import EventType
+
+
+class QueueFullError(Exception):
+    """Raised when the scheduler queue has reached its maximum depth."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Research queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class SchedulerShutdownError(Exception):
+    """Raised when a job is submitted after shutdown has started."""
+
+
+@dataclass(order=True)
+class _QueueEntry:
+    """A queued job. Higher priority first, then FIFO."""
+    sort_key: Tuple[int, int]
+    job_id: str = field(compare=False)
+    args: tuple = field(compare=False, default=())
+    kwargs: Dict = field(compare=False, default_factory=dict)
+    enqueued_at: float = field(compare=False, default_factory=time.monotonic)
+
+
+class JobScheduler:
+    """
+    Runs jobs on a fixed number of worker threads.
+
+    Jobs wait in a priority queue in the ``QUEUED`` state and receive
+    ``queue_position`` events whenever their place in line changes. The
+    queue is bounded: ``submit`` raises ``QueueFullError`` with a
+    Retry-After estimate once ``max_queue_depth`` jobs are waiting.
+
+    The worker threads start with the first ``submit``, so a process that
+    only imports a scheduler never runs any.
+    """
+
+    # Used for Retry-After until a job has actually finished
+    DEFAULT_JOB_SECONDS = 120.0
+
+    def __init__(
+        self,
+        job_manager: JobManager,
+        runner: Callable[..., object],
+        max_workers: int = 2,
+        max_queue_depth: int = 20,
+    ):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_queue_depth < 1:
+            raise ValueError("max_queue_depth must be at least 1")
+
+        self.job_manager = job_manager
+        self.runner = runner
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+
+        self._queue: List[_QueueEntry] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._running: Dict[str, float] = {}
+        self._accepting = True
+        self._stopping = False
+        self._avg_job_seconds = self.DEFAULT_JOB_SECONDS
+
+        # Position snapshots are numbered under the queue lock and published
+        # in order under this one, so a stale snapshot never overwrites a newer
+        self._publish_lock = threading.Lock()
+        self._snapshots = itertools.count()
+        self._published_snapshot = -1
+        self._published: Dict[str, int] = {}
+
+        self._workers: List[threading.Thread] = []
+
+    def submit(self, job_id: str, *args, priority: int = 0, **kwargs) -> int:
+        """
+        Queue ``runner(*args, **kwargs)`` for ``job_id``.
+
+        Returns the 1-based queue position of the job.
+
+        Raises:
+            QueueFullError: If the queue is at ``max_queue_depth``
+            SchedulerShutdownError: If the scheduler no longer accepts jobs
+        """
+        with self._condition:
+            if not self._accepting:
+                raise SchedulerShutdownError("Scheduler is shutting down")
+            if len(self._queue) >= self.max_queue_depth:
+                raise QueueFullError(self._estimate_retry_after())
+
+            entry = _QueueEntry(
+                sort_key=(-priority, next(self._sequence)),
+                job_id=job_id,
+                args=args,
+                kwargs=kwargs
+            )
+            heapq.heappush(self._queue, entry)
+            snapshot = self._snapshot()
+            self._start_workers()
+            self._condition.notify()
+
+        self._publish_positions(snapshot)
+        return snapshot[1][job_id]
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Remove a queued job and mark it failed.
+
+        Returns False if the job is not waiting in the queue, e.g. because
+        a worker has already started it.
+        """
+        with self._condition:
+            remaining = [entry for entry in self._queue if entry.job_id != job_id]
+            if len(remaining) == len(self._queue):
+                return False
+            self._queue = remaining
+            heapq.heapify(self._queue)
+            snapshot = self._snapshot()
+
+        self.job_manager.update_job(job_id, JobState.FAILED, "Cancelled before it started")
+        self._publish_positions(snapshot)
+        return True
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """Get the 1-based queue position of a job, or None if not queued."""
+        with self._condition:
+            return self._positions().get(job_id)
+
+    def stats(self) -> Dict:
+        """Get a snapshot of queue and worker usage."""
+        with self._condition:
+            return {
+                'queued': len(self._queue),
+                'running': len(self._running),
+                'max_workers': self.max_workers,
+                'max_queue_depth': self.max_queue_depth,
+                'accepting': self._accepting,
+            }
+
+    def shutdown(self, drain: bool = True, timeout: Optional[float] = None) -> bool:
+        """
+        Stop accepting jobs and wait for the workers to finish.
+
+        With ``drain`` the queued jobs still run; otherwise they are marked
+        failed. Returns True if all workers exited within ``timeout``.
+        """
+        with self._condition:
+            self._accepting = False
+            dropped = [] if drain else list(self._queue)
+            if not drain:
+                self._queue.clear()
+            self._stopping = True
+            self._condition.notify_all()
+            workers = list(self._workers)
+
+        for entry in dropped:
+            self.job_manager.update_job(
+                entry.job_id, JobState.FAILED, "Server shutting down before the job started"
+            )
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for worker in workers:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            worker.join(remaining)
+
+        return not any(worker.is_alive() for worker in workers)
+
+    def _start_workers(self):
+        """Start the worker threads if they are not running yet. Caller holds the lock."""
+        if self._workers:
+            return
+        self._workers = [
+            threading.Thread(
+                target=self._worker_loop,
+                name=f"research-worker-{i}",
+                daemon=True
+            )
+            for i in range(self.max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def _worker_loop(self):
+        """Take jobs off the queue until shutdown leaves it empty."""
+        while True:
+            with self._condition:
+                while not self._queue and not self._stopping:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+
+                entry = heapq.heappop(self._queue)
+                self._running[entry.job_id] = time.monotonic()
+                snapshot = self._snapshot()
+
+            self._publish_positions(snapshot)
+            self.job_manager.add_log(
+                entry.job_id,
+                f"Waited {time.monotonic() - entry.enqueued_at:.1f}s in queue"
+            )
+
+            try:
+                self.runner(*entry.args, **entry.kwargs)
+            except Exception as e:
+                self.job_manager.update_job(entry.job_id, JobState.FAILED, f"Error during research: {str(e)}")
+            finally:
+                with self._condition:
+                    started = self._running.pop(entry.job_id)
+                    elapsed = time.monotonic() - started
+                    # Exponential moving average keeps Retry-After responsive
+                    self._avg_job_seconds = 0.8 * self._avg_job_seconds + 0.2 * elapsed
+
+    def _positions(self) -> Dict[str, int]:
+        """Map queued job IDs to 1-based positions. Caller holds the lock."""
+        return {
+            entry.job_id: position
+            for position, entry in enumerate(sorted(self._queue), start=1)
+        }
+
+    def _snapshot(self) -> Tuple[int, Dict[str, int]]:
+        """Number the current queue positions for publishing. Caller holds the lock."""
+        return next(self._snapshots), self._positions()
+
+    def _publish_positions(self, snapshot: Tuple[int, Dict[str, int]]):
+        """
+        Send a queue_position event to each waiting job whose position moved.
+
+        Snapshots older than the last one published are dropped, since the
+        newer one already reflects their changes.
+        """
+        number, positions = snapshot
+        with self._publish_lock:
+            if number < self._published_snapshot:
+                return
+            self._published_snapshot = number
+            changed = {
+                job_id: position
+                for job_id, position in positions.items()
+                if self._published.get(job_id) != position
+            }
+            self._published = positions
+
+            timestamp = datetime.now().strftime('%H:%M:%S')
+            for job_id, position in changed.items():
+                self.job_manager.add_event(job_id, {
+                    'type': EventType.QUEUE_POSITION.value,
+                    'timestamp': timestamp,
+                    'data': {
+                        'position': position,
+                        'queue_depth': len(positions)
+                    }
+                })
+
+    def _estimate_retry_after(self) -> int:
+        """Seconds until a queue slot is likely to free up. Caller holds the lock."""
+        # The next slot opens when the first of the running jobs finishes
+        return max(1, math.ceil(self._avg_job_seconds / self.max_workers))
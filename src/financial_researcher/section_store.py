@@ -0,0 +1,129 @@
+"""Per-company store of researched report sections, for incremental refreshes."""
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional
+
+from financial_researcher.job_manager import normalize_company_key
+
+
+@dataclass
+class StoredSection:
+    """The research output for one focus area."""
+    content: str
+    researched_at: float
+    # Hash of the task description it was researched with
+    description_hash: str
+
+
+@dataclass
+class StoredReport:
+    """The last report for a company and the sections it was written from."""
+    company_name: str
+    report: str
+    updated_at: float
+    sections: Dict[str, StoredSection] = field(default_factory=dict)
+
+    def render_sections(self, names: Iterable[str]) -> str:
+        """The stored research for ``names`` as one markdown document."""
+        parts = []
+        for name in names:
+            section = self.sections.get(name)
+            if section is not None:
+                researched = time.strftime('%Y-%m-%d', time.localtime(section.researched_at))
+                parts.append(f"## {name} (researched {researched})\n\n{section.content.strip()}")
+        return '\n\n'.join(parts)
+
+
+def description_hash(task_config: Dict[str, Any]) -> str:
+    return hashlib.sha256(str(task_config.get('description', '')).encode('utf-8')).hexdigest()[:16]
+
+
+def stale_sections(
+    stored: Optional[StoredReport],
+    tasks_config: Dict[str, Dict[str, Any]],
+    section_names: Iterable[str],
+    now: Optional[float] = None
+) -> List[str]:
+    """
+    The sections that need researching again.
+
+    A section is stale when it was never stored, its task description has
+    changed since, or it is older than the ``refresh_after_hours`` of its
+    task in ``config/tasks.yaml``. Sections without that setting stay
+    current until a full run replaces them.
+    """
+    now = time.time() if now is None else now
+    stale = []
+    for name in section_names:
+        task_config = tasks_config[name]
+        section = stored.sections.get(name) if stored else None
+        if section is None or section.description_hash != description_hash(task_config):
+            stale.append(name)
+            continue
+        max_age_hours = task_config.get('refresh_after_hours')
+        if max_age_hours is not None and now - section.researched_at > float(max_age_hours) * 3600:
+            stale.append(name)
+    return stale
+
+
+class SectionStore:
+    """
+    Keeps each company's latest report with its sections as JSON under
+    ``directory``, one file per normalized company name.
+    """
+
+    def __init__(self, directory: str = 'output/sections'):
+        self.directory = Path(directory)
+        self._lock = Lock()
+
+    def load(self, company_name: str) -> Optional[StoredReport]:
+        path = self._path(company_name)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            data['sections'] = {
+                name: StoredSection(**section) for name, section in data.get('sections', {}).items()
+            }
+            return StoredReport(**data)
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def save(
+        self,
+        company_name: str,
+        report: str,
+        sections: Dict[str, str],
+        tasks_config: Dict[str, Dict[str, Any]],
+        now: Optional[float] = None
+    ) -> StoredReport:
+        """
+        Record a new report and the sections researched for it.
+
+        Sections not in ``sections`` keep their earlier content and
+        timestamp, since the report was merged from them.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            stored = self.load(company_name)
+            merged = dict(stored.sections) if stored else {}
+            for name, content in sections.items():
+                merged[name] = StoredSection(content, now, description_hash(tasks_config[name]))
+            stored = StoredReport(company_name, report, now, merged)
+
+            path = self._path(company_name)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so readers never see a partial file
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(asdict(stored), f)
+            os.replace(tmp_path, path)
+        return stored
+
+    def _path(self, company_name: str) -> Path:
+        key = normalize_company_key(company_name)
+        return self.directory / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]}.json"
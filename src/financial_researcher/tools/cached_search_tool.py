@@ -0,0 +1,239 @@
+from crewai.tools import BaseTool
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, Optional, Type
+from pydantic import BaseModel, Field, PrivateAttr
+import json
+import os
+import sqlite3
+import time
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query so trivially different strings share a cache entry."""
+    return ' '.join(query.casefold().split())
+
+
+class SearchCacheStore:
+    """
+    SQLite store for search results with a per-entry expiry time.
+
+    Expired entries are deleted when the store opens and every
+    ``purge_every`` writes, so the file stays bounded by what is live.
+    """
+
+    def __init__(self, path: str, purge_every: int = 100):
+        self.path = path
+        self.purge_every = purge_every
+        self._writes = 0
+        if path != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS search_cache (
+                key TEXT PRIMARY KEY,
+                query TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_search_cache_expires ON search_cache (expires_at)"
+        )
+        self._conn.commit()
+        self.purge_expired()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached result for a key, or None if missing or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM search_cache WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, query: str, result: Any, ttl_seconds: float):
+        """Store a result that expires ``ttl_seconds`` from now."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?, ?, ?)",
+                (key, query, json.dumps(result), now, now + ttl_seconds)
+            )
+            self._writes += 1
+            if self._writes % self.purge_every == 0:
+                self._conn.execute("DELETE FROM search_cache WHERE expires_at <= ?", (now,))
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """Delete expired entries. Returns the number removed."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM search_cache WHERE expires_at <= ?", (time.time(),)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def count(self) -> int:
+        """Number of stored entries, expired or not."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class StubSearchBackend:
+    """
+    Offline search backend for tests and benchmarks.
+
+    Returns canned results in the same shape as SerperDevTool, after an
+    optional artificial delay.
+    """
+
+    def __init__(self, results: Optional[Dict[str, Any]] = None, latency_seconds: float = 0.0):
+        self.results = results or {}
+        self.latency_seconds = latency_seconds
+        self.calls = 0
+
+    def __call__(self, query: str) -> Any:
+        self.calls += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        if query in self.results:
+            return self.results[query]
+        return {
+            'searchParameters': {'q': query, 'type': 'search'},
+            'organic': [{
+                'title': f"Result for {query}",
+                'link': 'https://example.com',
+                'snippet': f"Stub search result for {query}.",
+                'position': 1
+            }],
+            'credits': 0
+        }
+
+
+class CachedSearchToolInput(BaseModel):
+    """Input schema for CachedSearchTool."""
+    search_query: str = Field(..., description="Mandatory search query you want to use to search the internet")
+
+
+class CachedSearchTool(BaseTool):
+    name: str = "Search the internet with Serper"
+    description: str = (
+        "A tool that can be used to search the internet with a search_query. "
+        "Results for repeated queries are served from a local cache."
+    )
+    args_schema: Type[BaseModel] = CachedSearchToolInput
+    cache_path: str = Field(
+        default_factory=lambda: os.environ.get('SEARCH_CACHE_PATH', 'output/cache/search_cache.sqlite3')
+    )
+    ttl_seconds: float = Field(
+        default_factory=lambda: float(os.environ.get('SEARCH_CACHE_TTL', '86400'))
+    )
+    backend: Optional[Callable[[str], Any]] = Field(default=None, exclude=True)
+
+    _store: Optional[SearchCacheStore] = PrivateAttr(default=None)
+    _store_lock: Lock = PrivateAttr(default_factory=Lock)
+    _counter_lock: Lock = PrivateAttr(default_factory=Lock)
+    _hits: int = PrivateAttr(default=0)
+    _misses: int = PrivateAttr(default=0)
+
+    @property
+    def store(self) -> SearchCacheStore:
+        """SQLite store, opened on first use."""
+        with self._store_lock:
+            if self._store is None:
+                self._store = SearchCacheStore(self.cache_path)
+            return self._store
+
+    @property
+    def hits(self) -> int:
+        with self._counter_lock:
+            return self._hits
+
+    @property
+    def misses(self) -> int:
+        with self._counter_lock:
+            return self._misses
+
+    def _run(self, search_query: str) -> Any:
+        return self.search(search_query)
+
+    def search(self, search_query: str, ttl_seconds: Optional[float] = None) -> Any:
+        """Return results for a query from the cache, or from the backend on a miss."""
+        key = normalize_query(search_query)
+        if not key:
+            raise ValueError("search_query is required")
+
+        cached = self.store.get(key)
+        if cached is not None:
+            with self._counter_lock:
+                self._hits += 1
+            return cached
+
+        with self._counter_lock:
+            self._misses += 1
+        result = self._get_backend()(search_query)
+        self.store.put(key, search_query, result, self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        return result
+
+    def prefetch(self, queries: Iterable[str], max_workers: int = 4) -> int:
+        """
+        Warm the cache for several queries concurrently.
+
+        Queries that are already cached are skipped. Returns the number of
+        queries fetched from the backend.
+        """
+        pending = {}
+        for query in queries:
+            key = normalize_query(query)
+            if key and key not in pending and self.store.get(key) is None:
+                pending[key] = query
+
+        if not pending:
+            return 0
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(self.search, pending.values()))
+        return len(pending)
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters and the number of stored entries."""
+        entries = self.store.count()
+        # Crew threads count concurrently; read both counters at one moment
+        with self._counter_lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'entries': entries,
+            }
+
+    def _get_backend(self) -> Callable[[str], Any]:
+        if self.backend is None:
+            # Imported lazily so offline runs with a stub backend need no API key
+            from crewai_tools import SerperDevTool
+            serper = SerperDevTool()
+            self.backend = lambda query: serper.run(search_query=query)
+        return self.backend
+
+
+@lru_cache(maxsize=None)
+def shared_search_tool() -> CachedSearchTool:
+    """
+    One search tool for every crew in the process.
+
+    Its SQLite connection and Serper client are opened once instead of
+    per agent, and its hit/miss counters cover every job.
+    """
+    return CachedSearchTool()
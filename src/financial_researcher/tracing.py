@@ -0,0 +1,279 @@
+"""Per-job span trees of crew runs, with Chrome trace and OTLP JSON export."""
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional
+
+
+SERVICE_NAME = 'financial_researcher'
+
+# Formats served by /trace and written next to each other under the trace directory
+TRACE_FORMATS = ('tree', 'chrome', 'otlp')
+
+
+@dataclass
+class Span:
+    """One timed step of a job: the job itself, a task, an agent's turn at a task, or a tool or LLM call."""
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    kind: str
+    start: float
+    end: Optional[float] = None
+    status: str = 'ok'
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+
+class JobTrace:
+    """
+    The span tree of one job's crew run.
+
+    Spans that are still open are looked up by a caller-chosen key, e.g.
+    ``('task', task_id)``, so the crew event handlers can end them and hang
+    children under them. Times are Unix timestamps in seconds.
+    """
+
+    def __init__(self, job_id: str, company_name: str, start: Optional[float] = None):
+        self.job_id = job_id
+        self.trace_id = uuid.uuid4().hex
+        self._spans: List[Span] = []
+        self._open: Dict[Hashable, Span] = {}
+        self._lock = threading.Lock()
+        self.root = self._new_span(None, 'job', 'job', start, {'job_id': job_id, 'company': company_name})
+
+    def _new_span(self, parent: Optional[Span], name: str, kind: str,
+                  start: Optional[float], attributes: Dict[str, Any]) -> Span:
+        span = Span(
+            uuid.uuid4().hex[:16],
+            parent.span_id if parent else None,
+            name,
+            kind,
+            time.time() if start is None else start,
+            attributes=attributes,
+        )
+        self._spans.append(span)
+        return span
+
+    def start_span(self, key: Hashable, name: str, kind: str, parent_keys=(),
+                   start: Optional[float] = None, **attributes) -> Span:
+        """
+        Open a span under the first open span named by ``parent_keys``,
+        or under the job.
+        """
+        with self._lock:
+            parent = next((self._open[k] for k in parent_keys if k in self._open), self.root)
+            span = self._open[key] = self._new_span(parent, name, kind, start, attributes)
+            return span
+
+    def end_span(self, key: Hashable, end: Optional[float] = None, status: str = 'ok',
+                 **attributes) -> Optional[Span]:
+        """Close the open span for ``key``; None if there is none."""
+        with self._lock:
+            span = self._open.pop(key, None)
+            if span is not None:
+                span.end = time.time() if end is None else end
+                span.status = status
+                span.attributes.update(attributes)
+            return span
+
+    def finish(self, status: str = 'ok', end: Optional[float] = None):
+        """End the job span, and any span left open, e.g. by a failed run."""
+        end = time.time() if end is None else end
+        with self._lock:
+            for span in self._open.values():
+                span.end = end
+                span.status = 'cancelled'
+            self._open.clear()
+            self.root.end = end
+            self.root.status = status
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        The trace as a flat list of spans, oldest first.
+
+        Open spans are reported as running up to now. Job, task and agent
+        spans carry the tokens of the LLM calls under them.
+        """
+        now = time.time()
+        with self._lock:
+            spans = [
+                {
+                    'span_id': span.span_id,
+                    'parent_id': span.parent_id,
+                    'name': span.name,
+                    'kind': span.kind,
+                    'start': span.start,
+                    'end': span.end,
+                    'duration_ms': round(((span.end or now) - span.start) * 1000, 1),
+                    'status': span.status if span.end is not None else 'running',
+                    'attributes': dict(span.attributes),
+                }
+                for span in self._spans
+            ]
+
+        by_id = {span['span_id']: span for span in spans}
+        for span in spans:
+            if span['kind'] != 'llm':
+                continue
+            for name in ('prompt_tokens', 'completion_tokens'):
+                tokens = span['attributes'].get(name)
+                if not tokens:
+                    continue
+                parent = by_id.get(span['parent_id'])
+                while parent is not None:
+                    parent['attributes'][name] = parent['attributes'].get(name, 0) + tokens
+                    parent = by_id.get(parent['parent_id'])
+
+        spans.sort(key=lambda span: span['start'])
+        return {'job_id': self.job_id, 'trace_id': self.trace_id, 'spans': spans}
+
+
+def to_chrome_trace(trace: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    A trace from ``JobTrace.to_dict`` in the Chrome trace event format,
+    for chrome://tracing or https://ui.perfetto.dev.
+
+    Each task and everything under it gets its own row, since tasks of a
+    fan-out run overlap.
+    """
+    spans = trace['spans']
+    by_id = {span['span_id']: span for span in spans}
+    rows: Dict[str, int] = {}
+
+    def row_of(span: Dict[str, Any]) -> int:
+        # The row of the span's top-level task; the job itself is row 0
+        while span['parent_id'] is not None and by_id[span['parent_id']]['parent_id'] is not None:
+            span = by_id[span['parent_id']]
+        if span['parent_id'] is None:
+            return 0
+        return rows.setdefault(span['span_id'], len(rows) + 1)
+
+    events = []
+    for span in spans:
+        events.append({
+            'name': span['name'],
+            'cat': span['kind'],
+            'ph': 'X',
+            'ts': round(span['start'] * 1e6),
+            'dur': round(span['duration_ms'] * 1000),
+            'pid': 1,
+            'tid': row_of(span),
+            'args': dict(span['attributes'], status=span['status']),
+        })
+    events.append({'name': 'process_name', 'ph': 'M', 'pid': 1, 'args': {'name': f"job {trace['job_id']}"}})
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def to_otlp(trace: Dict[str, Any]) -> Dict[str, Any]:
+    """A trace from ``JobTrace.to_dict`` as an OTLP/JSON ``ExportTraceServiceRequest``."""
+    otlp_spans = []
+    for span in trace['spans']:
+        end = span['end'] if span['end'] is not None else span['start'] + span['duration_ms'] / 1000
+        otlp_span = {
+            'traceId': trace['trace_id'],
+            'spanId': span['span_id'],
+            'name': span['name'],
+            'kind': 1,  # SPAN_KIND_INTERNAL
+            'startTimeUnixNano': str(int(span['start'] * 1e9)),
+            'endTimeUnixNano': str(int(end * 1e9)),
+            'attributes': [
+                {'key': key, 'value': _otlp_value(value)}
+                for key, value in dict(span['attributes'], kind=span['kind']).items()
+                if value is not None
+            ],
+            # STATUS_CODE_OK or STATUS_CODE_ERROR
+            'status': {'code': 1 if span['status'] in ('ok', 'running') else 2},
+        }
+        if span['parent_id']:
+            otlp_span['parentSpanId'] = span['parent_id']
+        otlp_spans.append(otlp_span)
+
+    return {'resourceSpans': [{
+        'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': SERVICE_NAME}}]},
+        'scopeSpans': [{'scope': {'name': SERVICE_NAME}, 'spans': otlp_spans}],
+    }]}
+
+
+EXPORTERS = {
+    'tree': lambda trace: trace,
+    'chrome': to_chrome_trace,
+    'otlp': to_otlp,
+}
+
+
+class TraceStore:
+    """
+    Traces of running jobs in memory, and of finished ones as files.
+
+    A finished trace is written to ``directory`` in every format, as
+    ``<job_id>.json``, ``<job_id>.chrome.json`` and ``<job_id>.otlp.json``,
+    so it can be served by any process and loaded into trace viewers.
+    Without a directory finished traces are not kept.
+    """
+
+    def __init__(self, directory: Optional[str] = 'output/traces'):
+        self.directory = Path(directory) if directory else None
+        self._active: Dict[str, JobTrace] = {}
+        self._lock = threading.Lock()
+
+    def begin(self, trace: JobTrace):
+        """Make a running job's trace available to ``get``."""
+        with self._lock:
+            self._active[trace.job_id] = trace
+
+    def save(self, trace: JobTrace):
+        """Write a finished trace in every format and stop serving it from memory."""
+        try:
+            if self.directory is not None:
+                data = trace.to_dict()
+                self.directory.mkdir(parents=True, exist_ok=True)
+                for trace_format, export in EXPORTERS.items():
+                    path = self._path(trace.job_id, trace_format)
+                    # Write then rename so readers never see a partial file
+                    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+                    with open(tmp_path, 'w', encoding='utf-8') as f:
+                        json.dump(export(data), f)
+                    os.replace(tmp_path, path)
+        except OSError:
+            pass  # A missing trace must never fail the job
+        finally:
+            with self._lock:
+                self._active.pop(trace.job_id, None)
+
+    def get(self, job_id: str, trace_format: str = 'tree') -> Optional[Dict[str, Any]]:
+        """A job's trace in ``trace_format``, or None if none is recorded."""
+        with self._lock:
+            trace = self._active.get(job_id)
+        if trace is not None:
+            return EXPORTERS[trace_format](trace.to_dict())
+
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(job_id, trace_format), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _path(self, job_id: str, trace_format: str) -> Path:
+        suffix = '.json' if trace_format == 'tree' else f'.{trace_format}.json'
+        # Job IDs are UUIDs; anything else must not escape the directory
+        return self.directory / f"{uuid.UUID(job_id)}{suffix}"
+
+
+# Shared by the crew runner that records traces and the web servers that serve them
+trace_store = TraceStore(os.environ.get('TRACE_DIR', 'output/traces') or None)
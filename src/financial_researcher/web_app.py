@@ -1,17 +1,32 @@
 """Flask web application for Financial Researcher."""
 import os
-import threading
-from pathlib import Path
-from flask import Flask, render_template, request, jsonify, Response, stream_with_context
-import markdown2
 import time
 
-from financial_researcher.job_manager import JobManager, JobState
-from financial_researcher.crew_runner import run_crew_with_logging
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
+
+from financial_researcher import research_service
+from financial_researcher.research_service import (
+    SSE_KEEPALIVE,
+    BatchStream,
+    batch_manager,
+    job_manager,
+    report_cache,
+    scheduler,
+)
 
 
 app = Flask(__name__)
-job_manager = JobManager()
+
+# Servers that import ``app`` directly, e.g. gunicorn, never call run_web_app
+app.before_request(research_service.start_services)
+
+
+def _service_response(result: research_service.ServiceResponse):
+    """Convert a research_service result into a Flask response."""
+    body, status, headers = result
+    response = Response(body) if isinstance(body, bytes) else jsonify(body)
+    response.headers.update(headers)
+    return response, status
 
 
 @app.route('/')
@@ -23,32 +38,26 @@ def index():
 @app.route('/research', methods=['POST'])
 def start_research():
     """Start a new research job."""
-    data = request.get_json()
-    
-    if not data or 'company' not in data:
-        return jsonify({'error': 'Company name is required'}), 400
-    
-    company_name = data['company'].strip()
-    
-    if not company_name:
-        return jsonify({'error': 'Company name cannot be empty'}), 400
-    
-    # Validate company name (basic sanitization)
-    if len(company_name) > 100:
-        return jsonify({'error': 'Company name too long (max 100 characters)'}), 400
-    
-    # Create job
-    job_id = job_manager.create_job(company_name)
-    
-    # Start crew execution in background thread
-    thread = threading.Thread(
-        target=run_crew_with_logging,
-        args=(company_name, job_manager, job_id),
-        daemon=True
-    )
-    thread.start()
-    
-    return jsonify({'job_id': job_id, 'company': company_name}), 202
+    data = request.get_json(silent=True)
+    return _service_response(research_service.submit_research(data))
+
+
+@app.route('/cancel/<job_id>', methods=['POST'])
+def cancel_job(job_id: str):
+    """Cancel a queued or running job."""
+    return _service_response(research_service.cancel_job(job_id))
+
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics."""
+    return _service_response(research_service.get_metrics())
+
+
+@app.route('/trace/<job_id>')
+def trace(job_id: str):
+    """A job's span tree; ?format=chrome or ?format=otlp for trace viewers."""
+    return _service_response(research_service.get_trace(job_id, request.args.get('format')))
 
 
 @app.route('/stream/<job_id>')
@@ -60,38 +69,27 @@ def stream_job(job_id: str):
         return jsonify({'error': 'Job not found'}), 404
     
     def generate():
-        """Generate SSE events for job progress."""
-        last_event_index = 0
+        """Generate SSE events for job progress, woken by the job's event bus."""
+        stream = research_service.open_job_stream(
+            job_id, request.headers.get('Last-Event-ID'), request.args.get('coalesce')
+        )
         
-        while True:
-            job = job_manager.get_job(job_id)
-            if not job:
-                yield f"event: error\ndata: Job not found\n\n"
-                break
-            
-            # Send new structured events
-            new_events = job_manager.get_events(job_id, since_index=last_event_index)
-            for event in new_events:
-                import json
-                event_type = event.get('type', 'log')
-                event_data = json.dumps(event.get('data', {}))
-                yield f"event: {event_type}\ndata: {event_data}\n\n"
-            last_event_index = len(job.events)
-            
-            # Send status updates
-            yield f"event: status\ndata: {job.state.value}\n\n"
-            
-            # Check if job is complete
-            if job.state == JobState.COMPLETED:
-                yield f"event: complete\ndata: {job.report_path}\n\n"
-                break
-            elif job.state == JobState.FAILED:
-                error_msg = job.error_message or "Unknown error"
-                yield f"event: error\ndata: {error_msg}\n\n"
-                break
-            
-            # Wait before next check
-            time.sleep(0.5)
+        # Subscribe before the first read so no event can slip in between
+        subscription = job_manager.event_bus.subscribe(job_id)
+        try:
+            while True:
+                yield from stream.poll()
+                if stream.done:
+                    break
+                
+                # Sleep until the job changes; a comment frame keeps proxies from timing out
+                if not subscription.wait(timeout=research_service.SSE_HEARTBEAT_SECONDS):
+                    yield SSE_KEEPALIVE
+                elif stream.coalesce:
+                    # Let the rest of a burst arrive so it goes out as one frame
+                    time.sleep(research_service.SSE_COALESCE_SECONDS)
+        finally:
+            subscription.close()
     
     return Response(
         stream_with_context(generate()),
@@ -103,38 +101,56 @@ def stream_job(job_id: str):
     )
 
 
+@app.route('/batch', methods=['POST'])
+def start_batch():
+    """Start researching a list of companies."""
+    data = request.get_json(silent=True)
+    return _service_response(research_service.submit_batch(data))
+
+
+@app.route('/batch/<batch_id>')
+def get_batch(batch_id: str):
+    """Progress and report paths of a batch."""
+    return _service_response(research_service.get_batch(batch_id))
+
+
+@app.route('/batch/<batch_id>/stream')
+def stream_batch(batch_id: str):
+    """Server-Sent Events endpoint for the combined progress of a batch."""
+    if not batch_manager.get(batch_id):
+        return jsonify({'error': 'Batch not found'}), 404
+
+    def generate():
+        stream = BatchStream(batch_manager, batch_id)
+        subscription = batch_manager.event_bus.subscribe(batch_id)
+        try:
+            while True:
+                yield from stream.poll()
+                if stream.done:
+                    break
+                if not subscription.wait(timeout=research_service.SSE_HEARTBEAT_SECONDS):
+                    yield SSE_KEEPALIVE
+        finally:
+            subscription.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
 @app.route('/report/<job_id>')
 def get_report(job_id: str):
     """Get the final report as HTML."""
-    job = job_manager.get_job(job_id)
-    
-    if not job:
-        return jsonify({'error': 'Job not found'}), 404
-    
-    if job.state != JobState.COMPLETED:
-        return jsonify({'error': 'Job not completed yet'}), 400
-    
-    if not job.report_path:
-        return jsonify({'error': 'Report not available'}), 404
-    
-    # Read markdown file
-    report_file = Path(job.report_path)
-    if not report_file.exists():
-        return jsonify({'error': 'Report file not found'}), 404
-    
-    try:
-        with open(report_file, 'r', encoding='utf-8') as f:
-            markdown_content = f.read()
-        
-        # Convert markdown to HTML
-        html_content = markdown2.markdown(
-            markdown_content,
-            extras=['tables', 'fenced-code-blocks', 'header-ids']
-        )
-        
-        return jsonify({'html': html_content, 'company': job.company_name})
-    except Exception as e:
-        return jsonify({'error': f'Error reading report: {str(e)}'}), 500
+    return _service_response(research_service.get_report(
+        job_id,
+        accept_encoding=request.headers.get('Accept-Encoding'),
+        if_none_match=request.headers.get('If-None-Match')
+    ))
 
 
 @app.errorhandler(404)
@@ -151,6 +167,9 @@ def internal_error(error):
 
 def run_web_app(host='127.0.0.1', port=5000, debug=False):
     """Run the Flask web application."""
+    # With the reloader this process only watches files; its child serves
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        research_service.start_services()
     print(f"Starting Financial Researcher Web Interface...")
     print(f"Open your browser to: http://{host}:{port}")
     app.run(host=host, port=port, debug=debug)